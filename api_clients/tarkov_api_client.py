@@ -5,6 +5,9 @@ import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from utils.metrics import timed_call
+from utils.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +59,8 @@ class TarkovAPIClient:
             "timestamp": datetime.now()
         }
     
+    @traced("tarkov_api.graphql")
+    @timed_call("tarkov_api", failed=lambda data: data is None)
     async def _make_graphql_request(self, query: str) -> Optional[Dict]:
         """Make GraphQL request to tarkov.dev API."""
         try:
@@ -238,6 +243,17 @@ class TarkovAPIClient:
                 shortName
                 avg24hPrice
                 types
+                buyFor {{
+                    vendor {{
+                        name
+                        normalizedName
+                    }}
+                    priceRUB
+                    requirements {{
+                        type
+                        value
+                    }}
+                }}
                 sellFor {{
                     vendor {{
                         name
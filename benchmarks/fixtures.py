@@ -0,0 +1,314 @@
+"""tarkov.dev response fixtures for the benchmark suite.
+
+Fixtures hold the `data` part of every GraphQL response the bot needs,
+per language where the API localizes:
+
+    {
+        "weapons": {"en": [...], "ru": [...]},
+        "mods": {"en": [...], "ru": [...]},
+        "tasks": {"en": [...], "ru": [...]},
+        "traders": [...],
+        "weapon_details": {"<item id>": {...}},
+    }
+
+Recorded responses (benchmarks/record_fixtures.py) are stored in
+benchmarks/fixtures/tarkov_dev.json and used when present. Without them
+a synthetic set with the same shapes is generated from a fixed seed, so
+runs on any machine replay identical data.
+"""
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES_PATH = os.path.join(FIXTURES_DIR, "tarkov_dev.json")
+
+SYNTHETIC_SEED = 20240601
+
+TRADERS = ["Prapor", "Therapist", "Skier", "Peacekeeper", "Mechanic", "Ragman", "Jaeger"]
+
+CATEGORIES = [
+    "Assault rifle", "Assault rifle", "Assault carbine", "SMG", "Handgun",
+    "Marksman rifle", "Sniper rifle", "Shotgun", "Machinegun",
+]
+
+CALIBERS = {
+    "Assault rifle": ["Caliber556x45NATO", "Caliber545x39", "Caliber762x39"],
+    "Assault carbine": ["Caliber762x39", "Caliber9x39"],
+    "SMG": ["Caliber9x19PARA", "Caliber46x30"],
+    "Handgun": ["Caliber9x19PARA", "Caliber9x18PM"],
+    "Marksman rifle": ["Caliber762x51", "Caliber762x54R"],
+    "Sniper rifle": ["Caliber762x54R", "Caliber86x70"],
+    "Shotgun": ["Caliber12g"],
+    "Machinegun": ["Caliber762x54R", "Caliber545x39"],
+}
+
+# Weapons with these names get quests and tier ratings in the bot
+NAMED_WEAPONS = [
+    "M4A1", "HK 416A5", "SCAR-L", "MCX", "SVD", "AK-74N", "AK-74M", "AKM", "MP5", "MPX",
+    "SR-25", "AK-105", "SKS", "MP-153", "Saiga-12", "PP-19-01", "Mosin", "VPO-215", "TOZ-106",
+]
+
+# (slot nameId, slot name, mod type, required)
+SLOTS = [
+    ("mod_magazine", "Magazine", "magazine", True),
+    ("mod_pistol_grip", "Pistol grip", "pistol-grip", True),
+    ("mod_stock", "Stock", "stock", False),
+    ("mod_barrel", "Barrel", "barrel", True),
+    ("mod_handguard", "Handguard", "handguard", False),
+    ("mod_muzzle", "Muzzle", "muzzle", False),
+    ("mod_sight_rear", "Rear sight", "sight", False),
+    ("mod_scope", "Scope", "sight", False),
+    ("mod_tactical", "Tactical", "tactical", False),
+    ("mod_charge", "Charging handle", "charge", False),
+]
+
+RU_SUFFIX = " (рус)"
+
+
+def _item_id(rng: random.Random) -> str:
+    return "%024x" % rng.getrandbits(96)
+
+
+def _ru(item: Dict, fields=("name", "shortName")) -> Dict:
+    """Shallow copy with localized names."""
+    copy = dict(item)
+    for field in fields:
+        if copy.get(field):
+            copy[field] = copy[field] + RU_SUFFIX
+    return copy
+
+
+def _generate_mods(rng: random.Random, per_type: int) -> Dict[str, List[Dict]]:
+    """Mods grouped by mod type, in weapon-slot (allowedItems) shape."""
+    mods = {}
+    for mod_type in sorted({slot[2] for slot in SLOTS}):
+        items = []
+        for i in range(per_type):
+            price = int(rng.lognormvariate(9.5, 0.9))
+            offers = []
+            for trader in rng.sample(TRADERS, rng.randint(0, 2)):
+                offers.append({
+                    "vendor": {"name": trader},
+                    "priceRUB": int(price * rng.uniform(0.8, 1.2)),
+                    "requirements": [{"type": "loyaltyLevel", "value": rng.randint(1, 4)}],
+                })
+            offers.append({"vendor": {"name": "Flea Market"}, "priceRUB": price, "requirements": []})
+            if mod_type == "magazine":
+                properties = {"capacity": rng.choice([10, 20, 30, 45, 60]), "ergonomics": rng.randint(-8, 0)}
+            else:
+                properties = {"ergonomics": rng.randint(-5, 15), "recoilModifier": rng.randint(-12, 3)}
+            name = f"{mod_type.replace('-', ' ').title()} {i + 1}"
+            items.append({
+                "id": _item_id(rng),
+                "name": name,
+                "shortName": name,
+                "avg24hPrice": price if rng.random() > 0.05 else None,
+                "buyFor": offers,
+                "properties": properties,
+            })
+        mods[mod_type] = items
+    return mods
+
+
+def _generate_weapons(rng: random.Random, count: int, mods: Dict[str, List[Dict]]):
+    """Weapons (list query shape) and weapon details keyed by ID."""
+    weapons = []
+    details = {}
+    for i in range(count):
+        name = NAMED_WEAPONS[i] if i < len(NAMED_WEAPONS) else f"Weapon {i + 1}"
+        category = CATEGORIES[i % len(CATEGORIES)]
+        slots = []
+        preset_items = []
+        for name_id, slot_name, mod_type, required in SLOTS:
+            if not required and rng.random() < 0.25:
+                continue
+            allowed = rng.sample(mods[mod_type], min(len(mods[mod_type]), rng.randint(8, 30)))
+            excluded = [{"id": allowed[-1]["id"]}] if rng.random() < 0.2 else []
+            slots.append({
+                "id": _item_id(rng),
+                "name": slot_name,
+                "nameId": name_id,
+                "required": required,
+                "filters": {
+                    "allowedCategories": [{"id": _item_id(rng), "name": mod_type}],
+                    "allowedItems": allowed,
+                    "excludedItems": excluded,
+                },
+            })
+            if required:
+                preset_items.append({"count": 1, "item": allowed[0]})
+
+        weapon_id = _item_id(rng)
+        properties = {
+            "caliber": rng.choice(CALIBERS[category]),
+            "ergonomics": rng.randint(25, 65),
+            "recoilVertical": rng.randint(40, 450),
+            "recoilHorizontal": rng.randint(120, 520),
+            "fireRate": rng.choice([30, 450, 600, 650, 800, 900]),
+            "defaultWidth": rng.randint(2, 5),
+            "defaultHeight": rng.randint(1, 2),
+            "slots": slots,
+        }
+        preset_id = _item_id(rng)
+        weapon = {
+            "id": weapon_id,
+            "name": f"{name} {category.lower()}",
+            "shortName": name,
+            "normalizedName": name.lower().replace(" ", "-"),
+            "types": ["gun", "wearable"],
+            "avg24hPrice": int(rng.lognormvariate(11.2, 0.6)),
+            "category": {"id": _item_id(rng), "name": category},
+            "properties": dict(properties, defaultPreset={"id": preset_id}),
+        }
+        weapons.append(weapon)
+        details[weapon_id] = dict(
+            weapon,
+            category={"name": category},
+            properties=dict(
+                properties,
+                defaultPreset={"id": preset_id, "name": f"{name} Default", "containsItems": preset_items},
+            ),
+        )
+    return weapons, details
+
+
+def _mods_list(mods: Dict[str, List[Dict]]) -> List[Dict]:
+    """Mods in `items(types: [mods])` query shape."""
+    items = []
+    for mod_type, group in mods.items():
+        for mod in group:
+            sell_for = [
+                {
+                    "vendor": {"name": offer["vendor"]["name"], "normalizedName": offer["vendor"]["name"].lower()},
+                    "price": offer["priceRUB"],
+                    "currency": "RUB",
+                    "priceRUB": offer["priceRUB"],
+                }
+                for offer in mod["buyFor"]
+            ]
+            buy_for = [
+                {
+                    "vendor": {"name": offer["vendor"]["name"], "normalizedName": offer["vendor"]["name"].lower()},
+                    "priceRUB": offer["priceRUB"],
+                    "requirements": offer["requirements"],
+                }
+                for offer in mod["buyFor"]
+            ]
+            items.append({
+                "id": mod["id"],
+                "name": mod["name"],
+                "shortName": mod["shortName"],
+                "avg24hPrice": mod["avg24hPrice"],
+                "types": ["mods", mod_type],
+                "buyFor": buy_for,
+                "sellFor": sell_for,
+            })
+    return items
+
+
+def _generate_tasks(rng: random.Random, weapons: List[Dict], count: int) -> List[Dict]:
+    """Tasks including Mechanic weapon build quests."""
+    tasks = []
+    build_weapons = [w for w in weapons if w["shortName"] in ("M4A1", "AKM", "MP5", "SR-25", "AK-105")]
+    for i in range(count):
+        is_build = i < 12
+        trader = "Mechanic" if is_build else rng.choice(TRADERS)
+        if is_build:
+            weapon = build_weapons[i % len(build_weapons)]
+            name = f"Gunsmith - Part {i + 1}"
+            objectives = [{
+                "id": _item_id(rng),
+                "type": "buildWeapon",
+                "description": f"Modify a {weapon['shortName']} to comply with the given specifications",
+                "optional": False,
+                "item": {"id": weapon["id"], "name": weapon["name"]},
+                "attributes": [
+                    {"name": "ergonomics", "requirement": {"compareMethod": ">=", "value": rng.randint(40, 70)}},
+                    {"name": "recoil", "requirement": {"compareMethod": "<=", "value": rng.randint(150, 400)}},
+                    {"name": "width", "requirement": {"compareMethod": "<=", "value": 5}},
+                ],
+            }]
+        else:
+            name = f"Task {i + 1}"
+            objectives = [{
+                "id": _item_id(rng),
+                "type": rng.choice(["shoot", "giveItem", "visit", "findItem"]),
+                "description": f"Complete objective {i + 1}",
+                "optional": False,
+            }]
+        tasks.append({
+            "id": _item_id(rng),
+            "name": name,
+            "normalizedName": name.lower().replace(" ", "-"),
+            "trader": {"name": trader, "normalizedName": trader.lower()},
+            "map": None if is_build else {"name": "Customs", "normalizedName": "customs"},
+            "experience": rng.randint(1000, 20000),
+            "minPlayerLevel": rng.randint(1, 40),
+            "taskRequirements": [{"task": {"id": tasks[-1]["id"], "name": tasks[-1]["name"]}}] if tasks and is_build else [],
+            "objectives": objectives,
+        })
+    return tasks
+
+
+def generate_fixtures(seed: int = SYNTHETIC_SEED, weapons: int = 80, mods_per_type: int = 60) -> Dict:
+    """
+    Generate synthetic fixtures in tarkov.dev response shapes.
+
+    Args:
+        seed: Random seed (same seed, same fixtures)
+        weapons: Number of weapons
+        mods_per_type: Number of mods of each mod type
+    """
+    rng = random.Random(seed)
+    mods = _generate_mods(rng, mods_per_type)
+    weapon_list, details = _generate_weapons(rng, weapons, mods)
+    mod_list = _mods_list(mods)
+    tasks = _generate_tasks(rng, weapon_list, 40)
+    traders = [
+        {
+            "id": _item_id(rng),
+            "name": name,
+            "normalizedName": name.lower(),
+            "resetTime": "2024-06-01T12:00:00.000Z",
+            "levels": [
+                {"level": level, "requiredPlayerLevel": (level - 1) * 15, "requiredReputation": (level - 1) * 0.2}
+                for level in range(1, 5)
+            ],
+        }
+        for name in TRADERS
+    ]
+    return {
+        "weapons": {"en": weapon_list, "ru": [_ru(w) for w in weapon_list]},
+        "mods": {"en": mod_list, "ru": [_ru(m) for m in mod_list]},
+        "tasks": {"en": tasks, "ru": [_ru(t, ("name",)) for t in tasks]},
+        "traders": traders,
+        "weapon_details": details,
+    }
+
+
+def load_fixtures(path: Optional[str] = None) -> Dict:
+    """
+    Load recorded fixtures, or generate the synthetic set if none are recorded.
+
+    Returns:
+        Fixtures dict with an extra "source" key ("recorded" or "synthetic")
+    """
+    path = path or FIXTURES_PATH
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            fixtures = json.load(f)
+        fixtures["source"] = "recorded"
+    else:
+        fixtures = generate_fixtures()
+        fixtures["source"] = "synthetic"
+    return fixtures
+
+
+def fixtures_digest(fixtures: Dict) -> str:
+    """Short content hash; results are only comparable for equal digests."""
+    data = {key: value for key, value in fixtures.items() if key != "source"}
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
@@ -0,0 +1,215 @@
+"""Measurement, result files and run comparison for the benchmark suite."""
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiosqlite
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Columns added by scripts/migrate_db.py, which only migrates the main database
+WEAPON_COLUMNS = ("velocity", "default_width", "default_height")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    index = max(0, math.ceil(fraction * len(samples)) - 1)
+    return samples[index]
+
+
+async def measure(
+    name: str,
+    func: Callable[[int], Awaitable],
+    iterations: int,
+    warmup: int = 1,
+    setup: Optional[Callable[[int], Awaitable]] = None
+) -> Dict:
+    """
+    Time an async benchmark case.
+
+    Latency is measured without tracemalloc; peak memory comes from one
+    extra traced run, so tracing overhead doesn't skew the timings.
+
+    Args:
+        name: Case name
+        func: Coroutine function called with the iteration number
+        iterations: Timed iterations
+        warmup: Untimed iterations before measuring
+        setup: Untimed coroutine function run before every iteration
+
+    Returns:
+        Result dict (times in ms, peak memory in KiB)
+    """
+    for i in range(warmup):
+        if setup:
+            await setup(i)
+        await func(i)
+
+    samples = []
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(iterations):
+        if setup:
+            await setup(i)
+        start = time.perf_counter()
+        await func(i)
+        samples.append(time.perf_counter() - start)
+    wall = time.perf_counter() - started
+
+    if setup:
+        await setup(iterations)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await func(iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "name": name,
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 4),
+        "mean_ms": round(total / iterations * 1000, 4),
+        "min_ms": round(samples[0] * 1000, 4),
+        # Timed calls only; setup time between them is excluded
+        "ops_per_sec": round(iterations / total, 2) if total else None,
+        "wall_s": round(wall, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+async def prepare_database(path: str):
+    """Create a database with the full current schema at path."""
+    from database import Database
+    from scripts.migrate_add_tarkov_ids import migrate_database
+
+    await Database(path).init_db()
+    async with aiosqlite.connect(path) as conn:
+        async with conn.execute("PRAGMA table_info(weapons)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        for column in WEAPON_COLUMNS:
+            if column not in existing:
+                await conn.execute(f"ALTER TABLE weapons ADD COLUMN {column} INTEGER")
+        await conn.commit()
+    # The migration script reports progress with print()
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate_database(path)
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(fixtures_source: str, fixtures_digest: str, options: Dict) -> Dict:
+    """Environment of a run, stored next to the results."""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "fixtures_source": fixtures_source,
+        "fixtures_digest": fixtures_digest,
+        "options": options,
+    }
+
+
+def save_results(meta: Dict, results: List[Dict], path: Optional[str] = None) -> str:
+    """
+    Write a run to JSON.
+
+    Returns:
+        Path of the written file (benchmarks/results/<time>_<commit>.json by default)
+    """
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{meta.get('commit') or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    """Read a run written by save_results()."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_results(results: List[Dict]):
+    """Print a results table."""
+    print(f"  {'Сценарий':<44} {'p50 мс':>10} {'p95 мс':>10} {'оп/с':>10} {'пик КиБ':>10}")
+    for result in results:
+        print(
+            f"  {result['name']:<44} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+            f"{result['ops_per_sec'] or 0:>10.1f} {result['peak_kib']:>10.1f}"
+        )
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "—"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def fixtures_mismatch(old: Dict, new_digest: str) -> Optional[str]:
+    """Error message if an earlier run used other fixtures, else None."""
+    old_digest = old["meta"].get("fixtures_digest")
+    if old_digest == new_digest:
+        return None
+    return (f"❌ Фикстуры отличаются ({old_digest} в {old['meta'].get('commit')}, сейчас {new_digest}), "
+            f"результаты несопоставимы. Запустите с теми же --fixtures")
+
+
+def compare(old: Dict, new: Dict) -> bool:
+    """
+    Print per-case changes between two runs (negative time delta = faster).
+
+    Returns:
+        False without printing deltas if the runs used different fixtures
+    """
+    old_meta, new_meta = old["meta"], new["meta"]
+    mismatch = fixtures_mismatch(old, new_meta.get("fixtures_digest"))
+    if mismatch:
+        print(f"\n{mismatch}")
+        return False
+    print(f"\nСравнение с {old_meta.get('commit')} ({old_meta.get('timestamp')}):")
+    if old_meta.get("python") != new_meta.get("python") or old_meta.get("platform") != new_meta.get("platform"):
+        print("  ⚠️ Другое окружение (Python/платформа)")
+
+    previous = {result["name"]: result for result in old["results"]}
+    print(f"  {'Сценарий':<44} {'p50':>10} {'p95':>10} {'оп/с':>10} {'пик':>10}")
+    for result in new["results"]:
+        before = previous.get(result["name"])
+        if before is None:
+            print(f"  {result['name']:<44} {'новый':>10}")
+            continue
+        print(
+            f"  {result['name']:<44} "
+            f"{_delta(before['p50_ms'], result['p50_ms']):>10} "
+            f"{_delta(before['p95_ms'], result['p95_ms']):>10} "
+            f"{_delta(before['ops_per_sec'], result['ops_per_sec']):>10} "
+            f"{_delta(before['peak_kib'], result['peak_kib']):>10}"
+        )
+    return True
@@ -0,0 +1,87 @@
+"""Record tarkov.dev responses as benchmark fixtures.
+
+Needs network access. Fetches weapons, mods and tasks (ru/en), traders
+and weapon details through TarkovAPIClient and writes them to
+benchmarks/fixtures/tarkov_dev.json, which benchmarks/run.py then
+replays instead of the synthetic set. Re-record deliberately: a new
+recording changes the fixtures digest, and results from before and
+after it are not comparable.
+
+Usage:
+    python benchmarks/record_fixtures.py [--details N] [--output path]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_clients import TarkovAPIClient
+from benchmarks.fixtures import FIXTURES_PATH, fixtures_digest
+
+
+def _quest_weapon_ids(tasks):
+    """Weapons referenced by buildWeapon objectives."""
+    ids = []
+    for task in tasks:
+        for objective in task.get("objectives", []):
+            item = objective.get("item") or {}
+            if objective.get("type") == "buildWeapon" and item.get("id"):
+                ids.append(item["id"])
+    return ids
+
+
+async def record(details_limit: Optional[int], output: str):
+    client = TarkovAPIClient()
+    try:
+        fixtures = {"weapons": {}, "mods": {}, "tasks": {}}
+        for lang in ("en", "ru"):
+            print(f"📥 Оружие, модули, задания ({lang})...")
+            fixtures["weapons"][lang] = await client.get_all_weapons(lang=lang)
+            fixtures["mods"][lang] = await client.get_all_mods(lang=lang)
+            fixtures["tasks"][lang] = await client.get_all_tasks(lang=lang)
+        fixtures["traders"] = await client.get_all_traders()
+
+        if not fixtures["weapons"]["en"] or not fixtures["mods"]["en"]:
+            print("❌ API не вернул данные, фикстуры не записаны")
+            return 1
+
+        # Quest weapons first, then the most expensive ones (random builds pick from those)
+        weapons = sorted(fixtures["weapons"]["en"], key=lambda w: w.get("avg24hPrice") or 0, reverse=True)
+        weapon_ids = list(dict.fromkeys(
+            _quest_weapon_ids(fixtures["tasks"]["en"]) + [w["id"] for w in weapons]
+        ))[:details_limit]
+
+        print(f"📥 Детали {len(weapon_ids)} оружия...")
+        fixtures["weapon_details"] = {}
+        for weapon_id in weapon_ids:
+            details = await client.get_weapon_details(weapon_id)
+            if details:
+                fixtures["weapon_details"][weapon_id] = details
+    finally:
+        await client.close()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f, ensure_ascii=False)
+
+    print(f"✅ Записано в {output}")
+    print(f"   Оружие: {len(fixtures['weapons']['en'])}, модули: {len(fixtures['mods']['en'])}, "
+          f"задания: {len(fixtures['tasks']['en'])}, детали: {len(fixtures['weapon_details'])}")
+    print(f"   Дайджест: {fixtures_digest(fixtures)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record tarkov.dev responses for offline benchmarks")
+    parser.add_argument("--details", type=int, help="weapons to fetch details for (default: all)")
+    parser.add_argument("--output", default=FIXTURES_PATH, help="fixtures file")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(record(args.details, args.output)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Offline benchmark suite: replays tarkov.dev fixtures through a local stub.
+
+Every case runs the real service code against a temporary SQLite
+database and a TarkovAPIClient pointed at benchmarks/stub_server.py, so
+results don't depend on the network or on tarkov.dev data changing.
+
+Usage:
+    python benchmarks/run.py                     # full run, saved to benchmarks/results/
+    python benchmarks/run.py --quick             # fewer iterations
+    python benchmarks/run.py --only build_generator --compare benchmarks/results/<run>.json
+    python benchmarks/run.py --latency-ms 80     # simulate network round trips
+
+Results are only comparable between runs with the same fixtures digest
+(printed in the header and stored in every results file); --compare
+refuses to run against a results file with another digest.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_clients import TarkovAPIClient
+from benchmarks.fixtures import fixtures_digest, load_fixtures
+from benchmarks.harness import (
+    compare, fixtures_mismatch, load_results, measure, prepare_database, print_results, run_metadata,
+    save_results
+)
+from benchmarks.stub_server import StubTarkovServer
+from database import Build, BuildCategory, Database
+from services import SyncService
+from services.build_generator import BuildGenerator, BuildGeneratorConfig
+from services.compatibility_checker import CompatibilityChecker
+from services.context_builder import ContextBuilder
+from services.quest_build_service import QuestBuildService
+from services.tier_evaluator import TierEvaluator
+from utils.card_renderer import BuildCardCache, get_card_template
+
+DEFAULT_ITERATIONS = 200
+QUICK_ITERATIONS = 20
+
+TRADER_LEVELS = {
+    "Prapor": 4, "Therapist": 4, "Skier": 4, "Peacekeeper": 4,
+    "Mechanic": 4, "Ragman": 4, "Jaeger": 4,
+}
+
+SEARCH_QUERIES = [
+    ("m4a1", "en"), ("ак-74", "ru"), ("svd", "en"), ("mp5", "en"),
+    ("sr 25", "en"), ("сайга", "ru"), ("mcx", "en"), ("akm", "ru"),
+]
+
+
+class BenchContext:
+    """Shared state for benchmark cases: stub server, synced database, warm client."""
+
+    def __init__(self, fixtures: Dict, server: StubTarkovServer, workdir: str):
+        self.fixtures = fixtures
+        self.server = server
+        self.workdir = workdir
+        self.db = Database(os.path.join(workdir, "bench.db"))
+        self.api = TarkovAPIClient(api_url=server.url)
+        self._clients: List[TarkovAPIClient] = [self.api]
+        self._databases = 0
+
+    def new_client(self) -> TarkovAPIClient:
+        """Client with an empty cache (closed in close())."""
+        client = TarkovAPIClient(api_url=self.server.url)
+        self._clients.append(client)
+        return client
+
+    async def new_database(self) -> Database:
+        """Empty database with the full schema."""
+        self._databases += 1
+        path = os.path.join(self.workdir, f"fresh_{self._databases}.db")
+        await prepare_database(path)
+        return Database(path)
+
+    async def setup(self):
+        """Create and sync the shared database."""
+        await prepare_database(self.db.db_path)
+        await SyncService(self.db, self.api).sync_all()
+
+    async def close(self):
+        for client in self._clients:
+            await client.close()
+
+
+async def bench_build_generator(ctx: BenchContext, iterations: int) -> List[Dict]:
+    config = BuildGeneratorConfig(budget=300000, trader_levels=TRADER_LEVELS)
+    warm = BuildGenerator(ctx.api, CompatibilityChecker(ctx.api), TierEvaluator())
+
+    async def generate_warm(i):
+        random.seed(i)
+        await warm.generate_random_build(config)
+
+    cold = {}
+
+    async def reset(i):
+        client = ctx.new_client()
+        cold["generator"] = BuildGenerator(client, CompatibilityChecker(client), TierEvaluator())
+
+    async def generate_cold(i):
+        random.seed(i)
+        await cold["generator"].generate_random_build(config)
+
+    return [
+        await measure("build_generator.generate_random_build", generate_warm, iterations),
+        await measure("build_generator.generate_random_build[cold]", generate_cold, iterations, setup=reset),
+    ]
+
+
+async def bench_quest_builds(ctx: BenchContext, iterations: int) -> List[Dict]:
+    service = QuestBuildService(ctx.api)
+    requirements = [
+        parsed
+        for task in ctx.fixtures["tasks"]["en"]
+        for objective in task.get("objectives", [])
+        for parsed in [service.parse_quest_requirements(objective)]
+        if parsed is not None
+    ]
+    if not requirements:
+        return []
+
+    async def generate(i):
+        await service.generate_quest_build(requirements[i % len(requirements)])
+
+    return [await measure("quest_build_service.generate_quest_build", generate, iterations)]
+
+
+async def bench_search(ctx: BenchContext, iterations: int) -> List[Dict]:
+    async def search(i):
+        query, language = SEARCH_QUERIES[i % len(SEARCH_QUERIES)]
+        await ctx.db.search_weapons(query, language)
+
+    return [await measure("database.search_weapons", search, iterations)]
+
+
+async def bench_sync(ctx: BenchContext, iterations: int) -> List[Dict]:
+    state = {}
+
+    async def reset(i):
+        state["service"] = SyncService(await ctx.new_database(), ctx.new_client())
+
+    async def sync(i):
+        await state["service"].sync_all()
+
+    # Each iteration writes a full database
+    return [await measure("sync_service.sync_all", sync, max(3, iterations // 10), setup=reset)]
+
+
+async def bench_cards(ctx: BenchContext, iterations: int) -> List[Dict]:
+    weapons = await ctx.db.get_all_weapons()
+    module_ids = list(range(1, 13))
+    modules = await ctx.db.get_modules_by_ids(module_ids)
+    cards = [
+        (
+            Build(
+                id=weapon.id, weapon_id=weapon.id, category=BuildCategory.META,
+                name_ru=f"Сборка {weapon.name_ru}", name_en=f"{weapon.name_en} build",
+                total_cost=250000, min_loyalty_level=2, modules=module_ids,
+            ),
+            weapon,
+            modules,
+        )
+        for weapon in weapons
+    ]
+    if not cards:
+        return []
+
+    templates = {language: get_card_template(language) for language in ("ru", "en")}
+    cache = BuildCardCache()
+
+    async def render(i):
+        build, weapon, card_modules = cards[i % len(cards)]
+        templates["ru" if i % 2 else "en"].render(build, weapon, card_modules)
+
+    async def render_cached(i):
+        build, weapon, card_modules = cards[i % len(cards)]
+        cache.render(build, weapon, card_modules, "ru" if i % 2 else "en")
+
+    # Card rendering takes microseconds; more iterations keep percentiles stable
+    return [
+        await measure("card_renderer.render", render, iterations * 10),
+        await measure("card_renderer.render[cached]", render_cached, iterations * 10, warmup=2 * len(cards)),
+    ]
+
+
+async def bench_context(ctx: BenchContext, iterations: int) -> List[Dict]:
+    builder = ContextBuilder(ctx.api, ctx.db)
+    weapon_ids = [weapon["id"] for weapon in ctx.fixtures["weapons"]["en"]]
+
+    async def modules_context(i):
+        await builder.build_modules_context(weapon_ids[i % len(weapon_ids)], "ru")
+
+    async def weapon_context(i):
+        await builder.build_weapon_context(language="ru" if i % 2 else "en")
+
+    return [
+        await measure("context_builder.build_modules_context", modules_context, iterations),
+        await measure("context_builder.build_weapon_context", weapon_context, iterations),
+    ]
+
+
+CASES = {
+    "build_generator": bench_build_generator,
+    "quest_build_service": bench_quest_builds,
+    "database": bench_search,
+    "sync_service": bench_sync,
+    "card_renderer": bench_cards,
+    "context_builder": bench_context,
+}
+
+
+async def run(args) -> int:
+    fixtures = load_fixtures(args.fixtures)
+    digest = fixtures_digest(fixtures)
+    iterations = args.iterations or (QUICK_ITERATIONS if args.quick else DEFAULT_ITERATIONS)
+    cases = {name: case for name, case in CASES.items() if not args.only or any(o in name for o in args.only)}
+    if not cases:
+        print(f"❌ Нет сценариев для --only {' '.join(args.only)}. Доступны: {', '.join(CASES)}")
+        return 1
+
+    # Refuse before measuring anything: deltas against other fixtures are meaningless
+    baseline = load_results(args.compare) if args.compare else None
+    mismatch = fixtures_mismatch(baseline, digest) if baseline else None
+    if mismatch:
+        print(mismatch)
+        return 1
+
+    meta = run_metadata(fixtures["source"], digest, {
+        "iterations": iterations,
+        "latency_ms": args.latency_ms,
+        "cases": list(cases),
+    })
+    print(f"📊 Бенчмарки: коммит {meta['commit']}{' (есть изменения)' if meta['dirty'] else ''}, "
+          f"Python {meta['python']}")
+    print(f"   Фикстуры: {fixtures['source']} ({digest}), "
+          f"{len(fixtures['weapons']['en'])} оружия, {len(fixtures['mods']['en'])} модулей")
+    print(f"   Итераций: {iterations}, задержка сети: {args.latency_ms} мс\n")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        async with StubTarkovServer(fixtures, latency=args.latency_ms / 1000) as server:
+            ctx = BenchContext(fixtures, server, workdir)
+            try:
+                await ctx.setup()
+                for name, case in cases.items():
+                    print(f"⏱️ {name}...")
+                    results.extend(await case(ctx, iterations))
+            finally:
+                await ctx.close()
+            unsupported = server.requests.get("unsupported")
+            if unsupported:
+                print(f"⚠️ Запросов без фикстур: {unsupported}")
+
+    print()
+    print_results(results)
+    path = save_results(meta, results, args.output)
+    print(f"\n💾 Результаты: {path}")
+
+    if baseline and not compare(baseline, {"meta": meta, "results": results}):
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against recorded tarkov.dev fixtures")
+    parser.add_argument("--iterations", type=int, help=f"timed iterations per case (default {DEFAULT_ITERATIONS})")
+    parser.add_argument("--quick", action="store_true", help=f"{QUICK_ITERATIONS} iterations per case")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help=f"run matching cases: {', '.join(CASES)}")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every stub response")
+    parser.add_argument("--fixtures", help="fixtures JSON (default: recorded file, else synthetic)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", metavar="RESULTS", help="results file of an earlier run (same fixtures only)")
+    args = parser.parse_args()
+
+    # Services log every generation step, and unmet quest requirements as warnings;
+    # writing those out would be part of the measured time
+    logging.basicConfig(level=logging.ERROR, format="%(levelname)s %(name)s: %(message)s")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Local stand-in for the tarkov.dev GraphQL endpoint.
+
+Answers the queries TarkovAPIClient sends with fixture data, so the
+real client code (HTTP session, JSON decoding, caching) is exercised
+without network access.
+"""
+import asyncio
+import json
+import re
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+ITEM_DETAILS = re.compile(r'item\(id:\s*"([^"]+)"\)')
+TASKS = re.compile(r"tasks\(lang:\s*(\w+)\)")
+TRADERS = re.compile(r"\btraders\s*\{")
+WEAPONS = re.compile(r"items\(lang:\s*(\w+),\s*types:\s*\[gun\]")
+MODS = re.compile(r"items\(lang:\s*(\w+),[^)]*types:\s*\[mods\]")
+ALL_ITEMS = re.compile(r"\bitems\s*\{")
+SEARCH_ITEMS = re.compile(r"\bitems\(")
+
+
+class StubTarkovServer:
+    """Serves fixtures on http://127.0.0.1:<port>/graphql.
+
+    Usage:
+        async with StubTarkovServer(fixtures) as server:
+            client = TarkovAPIClient(api_url=server.url)
+    """
+
+    def __init__(self, fixtures: Dict, latency: float = 0.0, port: int = 0):
+        """
+        Initialize stub server.
+
+        Args:
+            fixtures: Fixtures from benchmarks.fixtures.load_fixtures()
+            latency: Seconds added to every response (simulated network)
+            port: TCP port (0 picks a free one)
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.port = port
+        self.requests: Counter = Counter()
+        # (route, encoded response) per query text, so the stub's JSON encoding isn't measured
+        self._bodies: Dict[str, Tuple[str, bytes]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/graphql"
+
+    def resolve(self, query: str) -> Tuple[str, Optional[Dict]]:
+        """Map a GraphQL query to (route name, response data); data is None if unsupported."""
+        fixtures = self.fixtures
+        match = ITEM_DETAILS.search(query)
+        if match:
+            return "item", {"item": fixtures["weapon_details"].get(match.group(1))}
+        match = TASKS.search(query)
+        if match:
+            return "tasks", {"tasks": fixtures["tasks"].get(match.group(1), fixtures["tasks"]["en"])}
+        if TRADERS.search(query):
+            return "traders", {"traders": fixtures["traders"]}
+        match = WEAPONS.search(query)
+        if match:
+            return "weapons", {"items": fixtures["weapons"].get(match.group(1), fixtures["weapons"]["en"])}
+        match = MODS.search(query)
+        if match:
+            return "mods", {"items": fixtures["mods"].get(match.group(1), fixtures["mods"]["en"])}
+        if ALL_ITEMS.search(query):
+            items = fixtures["weapons"]["en"] + fixtures["mods"]["en"]
+            return "prices", {"items": [
+                {"id": item["id"], "name": item["name"], "avg24hPrice": item.get("avg24hPrice"),
+                 "lastLowPrice": item.get("avg24hPrice")}
+                for item in items
+            ]}
+        if SEARCH_ITEMS.search(query):
+            return "search", {"items": fixtures["weapons"]["en"]}
+        return "unsupported", None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        query = payload.get("query", "")
+        cached = self._bodies.get(query)
+        if cached is None:
+            route, data = self.resolve(query)
+            response = {"data": data} if data is not None else {"errors": [{"message": "Query not in fixtures"}]}
+            cached = self._bodies[query] = (route, json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        route, body = cached
+        self.requests[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self):
+        """Start serving."""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/graphql", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StubTarkovServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
@@ -2,20 +2,31 @@
 import aiosqlite
 import json
 import logging
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from .models import (
     Weapon, Module, Build, Quest, Trader, User, UserBuild,
     BuildCategory, WeaponCategory, TierRating
 )
+from .user_cache import UserCache
+from .leaderboard import BuildLeaderboard
 
 logger = logging.getLogger(__name__)
 
+# Stay below SQLite's default host parameter limit (999) in IN (...) queries
+MAX_IN_PARAMS = 900
+
 
 class Database:
     """Database manager for SQLite operations."""
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, user_cache_size: int = 50000):
         self.db_path = db_path
+        # Users are read on almost every update; writes go through this class
+        # and update the cached objects (write-through)
+        self.user_cache = UserCache(max_entries=user_cache_size)
+        # Top public builds; likes are written through, other changes reload it
+        self.community_top = BuildLeaderboard()
     
     async def init_db(self):
         """Initialize database tables."""
@@ -123,11 +134,110 @@ class Database:
                 )
             """)
             
+            # Community ranking: filter + sort columns, so keyset pages are index range scans
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_builds_public_rank
+                ON user_builds (is_public, likes DESC, created_at DESC, id DESC)
+            """)
+            
+            # Who liked which community build (likes counters are derived from it)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS build_likes (
+                    user_id INTEGER NOT NULL,
+                    build_id INTEGER NOT NULL,
+                    created_at INTEGER NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_build_likes_user_build
+                ON build_likes (user_id, build_id)
+            """)
+            
+            # Active users per day (one row per user per day, written in batches)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS user_activity_days (
+                    day INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    PRIMARY KEY (day, user_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # Append-only activity log: event types are stored once, events by ID
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS activity_event_types (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS activity_events (
+                    ts INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    event_id INTEGER NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_activity_events_ts ON activity_events (ts)
+            """)
+            
+            # Daily rollup of the activity log (raw events are pruned after a while)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS activity_daily_events (
+                    day INTEGER NOT NULL,
+                    event_id INTEGER NOT NULL,
+                    events INTEGER NOT NULL,
+                    users INTEGER NOT NULL,
+                    PRIMARY KEY (day, event_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # Builds are listed and counted per category
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_builds_category ON builds (category)
+            """)
+            
+            # Language breakdown of admin statistics is counted from this index alone
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_users_language ON users (language)
+            """)
+            
+            # Broadcast jobs with resumable progress checkpoint
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS broadcasts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    audience TEXT NOT NULL,
+                    text_content TEXT,
+                    media_type TEXT,
+                    media_file_id TEXT,
+                    admin_chat_id INTEGER NOT NULL,
+                    progress_message_id INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    last_user_id INTEGER DEFAULT 0,
+                    sent_count INTEGER DEFAULT 0,
+                    failed_count INTEGER DEFAULT 0,
+                    blocked_count INTEGER DEFAULT 0,
+                    created_at INTEGER NOT NULL,
+                    finished_at INTEGER
+                )
+            """)
+            
+            # Users who blocked the bot or deleted their account (skipped by broadcasts)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS blocked_users (
+                    user_id INTEGER PRIMARY KEY,
+                    blocked_at INTEGER NOT NULL
+                )
+            """)
+            
             await db.commit()
     
     # User operations
     async def get_user(self, user_id: int) -> Optional[User]:
-        """Get user by ID."""
+        """Get user by ID (served from the in-memory user cache when possible)."""
+        cached = self.user_cache.get(user_id)
+        if cached is not UserCache.MISSING:
+            return cached
+        
         async with aiosqlite.connect(self.db_path) as db:
             async with db.execute(
                 "SELECT user_id, language, favorite_builds, trader_levels FROM users WHERE user_id = ?",
@@ -137,7 +247,10 @@ class Database:
                 if row:
                     favorites = json.loads(row[2]) if row[2] else []
                     trader_levels = json.loads(row[3]) if row[3] else None
-                    return User(user_id=row[0], language=row[1], favorite_builds=favorites, trader_levels=trader_levels)
+                    user = User(user_id=row[0], language=row[1], favorite_builds=favorites, trader_levels=trader_levels)
+                    self.user_cache.set(user)
+                    return user
+                self.user_cache.set_absent(user_id)
                 return None
     
     async def create_user(self, user_id: int, language: str = "ru") -> User:
@@ -155,8 +268,11 @@ class Database:
                 logger.info(f"Created new user: {user_id}")
             except Exception as e:
                 logger.error(f"Error creating user {user_id}: {e}")
+                self.user_cache.invalidate(user_id)
                 raise
-        return User(user_id=user_id, language=language, favorite_builds=[])
+        user = User(user_id=user_id, language=language, favorite_builds=[], trader_levels=dict(DEFAULT_TRADER_LEVELS))
+        self.user_cache.set(user)
+        return user
     
     async def update_user_language(self, user_id: int, language: str):
         """Update user's language preference."""
@@ -166,6 +282,8 @@ class Database:
                 (language, user_id)
             )
             await db.commit()
+        
+        self.user_cache.update(user_id, language=language)
     
     async def update_trader_levels(self, user_id: int, trader_levels: dict):
         """Update user's trader loyalty levels."""
@@ -175,6 +293,14 @@ class Database:
                 (json.dumps(trader_levels), user_id)
             )
             await db.commit()
+        
+        self.user_cache.update(user_id, trader_levels=dict(trader_levels))
+    
+    async def unblock_user(self, user_id: int):
+        """Remove user from broadcast block list (user started the bot again)."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("DELETE FROM blocked_users WHERE user_id = ?", (user_id,))
+            await db.commit()
     
     async def get_or_create_user(self, user_id: int) -> User:
         """Get existing user or create new one."""
@@ -213,71 +339,72 @@ class Database:
                     )
                 return None
     
+    async def get_weapons_by_ids(self, weapon_ids: List[int]) -> List[Weapon]:
+        """Get multiple weapons by their IDs (one query per MAX_IN_PARAMS ids)."""
+        if not weapon_ids:
+            return []
+        
+        weapon_ids = list(weapon_ids)
+        weapons = []
+        async with aiosqlite.connect(self.db_path) as db:
+            for start in range(0, len(weapon_ids), MAX_IN_PARAMS):
+                chunk = weapon_ids[start:start + MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"""SELECT id, name_ru, name_en, category, tier_rating, base_price, flea_price,
+                       caliber, ergonomics, recoil_vertical, recoil_horizontal, fire_rate, effective_range, tarkov_id 
+                       FROM weapons WHERE id IN ({placeholders})""",
+                    chunk
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        weapon = self._row_to_weapon(row)
+                        weapon.tarkov_id = row[13]
+                        weapons.append(weapon)
+        return weapons
+    
     async def search_weapons(self, query: str, language: str = "ru") -> List[Weapon]:
-        """Search weapons by name with fuzzy matching."""
-        from rapidfuzz import fuzz, process
+        """
+        Search weapons by name: substring matches first, fuzzy matches fill up.
+        
+        SQLite LIKE only folds ASCII case, so when it finds fewer than 5
+        weapons the names in the user's language are fuzzy matched (case-
+        insensitive, Cyrillic too). Aliases and transliteration live in the
+        in-memory index used by WeaponService.search_weapons.
+        """
+        from rapidfuzz import fuzz, process, utils
         
-        # Безопасная проверка языка для предотвращения SQL injection
         if language not in ("ru", "en"):
             language = "ru"
         
+        columns = """id, name_ru, name_en, category, tier_rating, base_price, flea_price,
+                   caliber, ergonomics, recoil_vertical, recoil_horizontal, fire_rate, effective_range"""
         async with aiosqlite.connect(self.db_path) as db:
-            # First try exact/partial matches
             async with db.execute(
-                """SELECT id, name_ru, name_en, category, tier_rating, base_price, flea_price,
-                   caliber, ergonomics, recoil_vertical, recoil_horizontal, fire_rate, effective_range,
-                   velocity, default_width, default_height
-                   FROM weapons 
-                   WHERE name_ru LIKE ? OR name_en LIKE ? 
-                   LIMIT 15""",
+                f"""SELECT {columns}
+                   FROM weapons
+                   WHERE name_ru LIKE ? OR name_en LIKE ?
+                   ORDER BY name_en
+                   LIMIT 10""",
                 (f"%{query}%", f"%{query}%")
             ) as cursor:
-                exact_rows = await cursor.fetchall()
+                results = [self._row_to_weapon(row) for row in await cursor.fetchall()]
             
-            # If we have good exact matches, return them
-            if len(exact_rows) >= 5:
-                return [self._row_to_weapon(row) for row in exact_rows[:10]]
+            if len(results) >= 5:
+                return results
             
-            # Otherwise, get all weapons for fuzzy matching
-            async with db.execute(
-                """SELECT id, name_ru, name_en, category, tier_rating, base_price, flea_price,
-                   caliber, ergonomics, recoil_vertical, recoil_horizontal, fire_rate, effective_range,
-                   velocity, default_width, default_height
-                   FROM weapons"""
-            ) as cursor:
-                all_rows = await cursor.fetchall()
-            
-            # Prepare data for fuzzy matching
-            weapons_data = []
-            for row in all_rows:
-                weapon = self._row_to_weapon(row)
-                search_name = weapon.name_ru if language == "ru" else weapon.name_en
-                weapons_data.append((weapon, search_name))
-            
-            # Perform fuzzy matching
-            weapon_names = [data[1] for data in weapons_data]
-            matches = process.extract(query, weapon_names, scorer=fuzz.partial_ratio, limit=10)
-            
-            # Filter matches with score > 60 and combine with exact matches
-            fuzzy_results = []
-            seen_ids = set()
-            
-            # Add exact matches first
-            for row in exact_rows:
-                weapon = self._row_to_weapon(row)
-                fuzzy_results.append(weapon)
-                seen_ids.add(weapon.id)
-            
-            # Add fuzzy matches
-            for match_name, score, _ in matches:
-                if score > 60:  # Minimum similarity threshold
-                    for weapon, name in weapons_data:
-                        if name == match_name and weapon.id not in seen_ids:
-                            fuzzy_results.append(weapon)
-                            seen_ids.add(weapon.id)
-                            break
-            
-            return fuzzy_results[:10]
+            async with db.execute(f"SELECT {columns} FROM weapons") as cursor:
+                weapons = [self._row_to_weapon(row) for row in await cursor.fetchall()]
+        
+        names = [weapon.name_ru if language == "ru" else weapon.name_en for weapon in weapons]
+        matches = process.extract(
+            query, names, scorer=fuzz.partial_ratio, processor=utils.default_process, limit=10
+        )
+        seen_ids = {weapon.id for weapon in results}
+        for _, score, index in matches:
+            if score > 60 and weapons[index].id not in seen_ids:
+                results.append(weapons[index])
+                seen_ids.add(weapons[index].id)
+        return results[:10]
     
     def _row_to_weapon(self, row) -> Weapon:
         """Convert database row to Weapon object."""
@@ -387,15 +514,16 @@ class Database:
             ) as cursor:
                 rows = await cursor.fetchall()
                 builds = [self._row_to_build(row) for row in rows]
-                
-                # Filter builds that have modules available from the trader
-                filtered_builds = []
-                for build in builds:
-                    modules = await self.get_modules_by_ids(build.modules)
-                    if all(m.trader == trader and m.loyalty_level <= loyalty_level for m in modules):
-                        filtered_builds.append(build)
-                
-                return filtered_builds
+        
+        # Keep builds whose modules are all sold by this trader up to loyalty_level
+        # (modules of all builds are loaded in one batch)
+        module_ids = {module_id for build in builds for module_id in build.modules}
+        trader = trader.lower()
+        unavailable = {
+            m.id for m in await self.get_modules_by_ids(module_ids)
+            if (m.trader or "").lower() != trader or (m.loyalty_level or 1) > loyalty_level
+        }
+        return [build for build in builds if unavailable.isdisjoint(build.modules)]
     
     def _row_to_build(self, row) -> Build:
         """Convert database row to Build object."""
@@ -436,32 +564,37 @@ class Database:
                 return None
     
     async def get_modules_by_ids(self, module_ids: List[int]) -> List[Module]:
-        """Get multiple modules by their IDs."""
+        """Get multiple modules by their IDs (one query per MAX_IN_PARAMS ids)."""
         if not module_ids:
             return []
         
+        module_ids = list(module_ids)
+        modules = []
         async with aiosqlite.connect(self.db_path) as db:
-            placeholders = ",".join("?" * len(module_ids))
-            async with db.execute(
-                f"SELECT id, name_ru, name_en, price, trader, loyalty_level, slot_type, flea_price, tarkov_id, slot_name FROM modules WHERE id IN ({placeholders})",
-                module_ids
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [
-                    Module(
-                        id=row[0],
-                        name_ru=row[1],
-                        name_en=row[2],
-                        price=row[3],
-                        tarkov_id=row[8],
-                        slot_name=row[9],
-                        trader=row[4],
-                        loyalty_level=row[5],
-                        slot_type=row[6],
-                        flea_price=row[7]
+            for start in range(0, len(module_ids), MAX_IN_PARAMS):
+                chunk = module_ids[start:start + MAX_IN_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"SELECT id, name_ru, name_en, price, trader, loyalty_level, slot_type, flea_price, tarkov_id, slot_name FROM modules WHERE id IN ({placeholders})",
+                    chunk
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                    modules.extend(
+                        Module(
+                            id=row[0],
+                            name_ru=row[1],
+                            name_en=row[2],
+                            price=row[3],
+                            tarkov_id=row[8],
+                            slot_name=row[9],
+                            trader=row[4],
+                            loyalty_level=row[5],
+                            slot_type=row[6],
+                            flea_price=row[7]
+                        )
+                        for row in rows
                     )
-                    for row in rows
-                ]
+        return modules
     
     # Trader operations
     async def get_all_traders(self) -> List[Trader]:
@@ -505,7 +638,9 @@ class Database:
                  user_build.is_public)
             )
             await db.commit()
-            return cursor.lastrowid
+        if user_build.is_public:
+            self.community_top.invalidate()
+        return cursor.lastrowid
     
     async def get_user_build_by_id(self, build_id: int) -> Optional[UserBuild]:
         """Get user build by ID."""
@@ -534,15 +669,48 @@ class Database:
                 rows = await cursor.fetchall()
                 return [self._row_to_user_build(row) for row in rows]
     
-    async def get_public_builds(self, limit: int = 50, offset: int = 0) -> List[UserBuild]:
-        """Get public builds from the community."""
+    async def get_public_builds(self, limit: int = 50, after: Optional[Tuple[int, str, int]] = None) -> List[UserBuild]:
+        """
+        Get public builds from the community, most liked first.
+        
+        Pages inside the cached top ranking are served from memory, deeper
+        pages use keyset pagination, so every page costs the same.
+        
+        Args:
+            limit: Page size
+            after: (likes, created_at, id) of the last build of the previous page
+                (None for first page); the values as shown, so the page doesn't
+                shift if that build is liked, deleted or made private meanwhile
+            
+        Returns:
+            Builds with weapon names filled in
+        """
+        if not self.community_top.is_loaded:
+            self.community_top.load(await self._query_public_builds(self.community_top.size))
+        
+        page = self.community_top.page(limit, after)
+        if page is not None:
+            return page
+        return await self._query_public_builds(limit, after)
+    
+    async def _query_public_builds(self, limit: int, after: Optional[Tuple[int, str, int]] = None) -> List[UserBuild]:
+        """Query a page of public builds (keyset pagination, weapons joined)."""
+        keyset = ""
+        params = []
+        if after is not None:
+            keyset = "AND (ub.likes, ub.created_at, ub.id) < (?, ?, ?)"
+            params.extend(after)
+        params.append(limit)
+        
         async with aiosqlite.connect(self.db_path) as db:
             async with db.execute(
-                """SELECT id, user_id, weapon_id, name, modules, total_cost, tier_rating,
-                   ergonomics, recoil_vertical, recoil_horizontal, is_public, 
-                   created_at, likes FROM user_builds 
-                   WHERE is_public = 1 ORDER BY likes DESC, created_at DESC LIMIT ? OFFSET ?""",
-                (limit, offset)
+                f"""SELECT ub.id, ub.user_id, ub.weapon_id, ub.name, ub.modules, ub.total_cost, ub.tier_rating,
+                   ub.ergonomics, ub.recoil_vertical, ub.recoil_horizontal, ub.is_public, 
+                   ub.created_at, ub.likes, w.name_ru, w.name_en
+                   FROM user_builds ub LEFT JOIN weapons w ON w.id = ub.weapon_id
+                   WHERE ub.is_public = 1 {keyset}
+                   ORDER BY ub.likes DESC, ub.created_at DESC, ub.id DESC LIMIT ?""",
+                params
             ) as cursor:
                 rows = await cursor.fetchall()
                 return [self._row_to_user_build(row) for row in rows]
@@ -555,24 +723,98 @@ class Database:
                 (is_public, build_id)
             )
             await db.commit()
+        self.community_top.invalidate()
     
     async def delete_user_build(self, build_id: int, user_id: int):
         """Delete a user build (only by owner)."""
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+            cursor = await db.execute(
                 "DELETE FROM user_builds WHERE id = ? AND user_id = ?",
                 (build_id, user_id)
             )
+            if cursor.rowcount > 0:
+                await db.execute("DELETE FROM build_likes WHERE build_id = ?", (build_id,))
             await db.commit()
+        self.community_top.invalidate()
     
     async def increment_build_likes(self, build_id: int):
-        """Increment likes for a build."""
+        """Increment likes for a build (without recording who liked it)."""
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE user_builds SET likes = likes + 1 WHERE id = ?",
+            async with db.execute(
+                "UPDATE user_builds SET likes = likes + 1 WHERE id = ? RETURNING likes, is_public",
                 (build_id,)
-            )
+            ) as cursor:
+                row = await cursor.fetchone()
             await db.commit()
+        
+        self._update_community_top(build_id, 1, row)
+    
+    async def add_build_likes(self, likes: List[Tuple[int, int]]) -> Dict[int, int]:
+        """
+        Record likes in the build_likes ledger and bump counters, in one transaction.
+        
+        Duplicates (already in the ledger) are ignored by the unique index,
+        so counters only grow by likes that were actually recorded.
+        
+        Args:
+            likes: (user_id, build_id) pairs
+            
+        Returns:
+            Number of new likes per build ID
+        """
+        if not likes:
+            return {}
+        
+        now = int(time.time())
+        added: Dict[int, int] = {}
+        rows = {}
+        async with aiosqlite.connect(self.db_path) as db:
+            for user_id, build_id in likes:
+                cursor = await db.execute(
+                    "INSERT OR IGNORE INTO build_likes (user_id, build_id, created_at) VALUES (?, ?, ?)",
+                    (user_id, build_id, now)
+                )
+                if cursor.rowcount > 0:
+                    added[build_id] = added.get(build_id, 0) + 1
+            
+            for build_id, count in added.items():
+                async with db.execute(
+                    "UPDATE user_builds SET likes = likes + ? WHERE id = ? RETURNING likes, is_public",
+                    (count, build_id)
+                ) as cursor:
+                    rows[build_id] = await cursor.fetchone()
+            await db.commit()
+        
+        for build_id, count in added.items():
+            self._update_community_top(build_id, count, rows[build_id])
+        return added
+    
+    async def has_build_like(self, user_id: int, build_id: int) -> bool:
+        """Check the ledger for a like."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT 1 FROM build_likes WHERE user_id = ? AND build_id = ?",
+                (user_id, build_id)
+            ) as cursor:
+                return await cursor.fetchone() is not None
+    
+    async def get_build_like_keys(self) -> List[Tuple[int, int]]:
+        """Get all (user_id, build_id) pairs of the ledger."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("SELECT user_id, build_id FROM build_likes") as cursor:
+                return [(row[0], row[1]) for row in await cursor.fetchall()]
+    
+    def _update_community_top(self, build_id: int, count: int, row):
+        """
+        Apply new likes to the cached ranking.
+        
+        Moves a cached build up in place, or reloads the ranking if a build
+        from outside it may have entered the top.
+        """
+        if self.community_top.like(build_id, count):
+            return
+        if row and row[1] and self.community_top.qualifies(row[0]):
+            self.community_top.invalidate()
     
     def _row_to_user_build(self, row) -> UserBuild:
         """Convert database row to UserBuild object."""
@@ -589,5 +831,7 @@ class Database:
             recoil_horizontal=row[9],
             is_public=bool(row[10]),
             created_at=row[11],
-            likes=row[12]
+            likes=row[12],
+            weapon_name_ru=row[13] if len(row) > 13 else None,
+            weapon_name_en=row[14] if len(row) > 14 else None
         )
@@ -0,0 +1,147 @@
+"""Persistent aiogram FSM storage backed by SQLite."""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage that survives bot restarts.
+
+    States and data are stored as JSON in the fsm_states table. Sessions not
+    touched for ttl_seconds are treated as abandoned: reads ignore them and
+    they are purged periodically, so storage stays bounded. Data must be
+    JSON-serializable, keep it to ids and indices.
+    """
+
+    # How often expired sessions are purged (seconds)
+    PURGE_INTERVAL = 60 * 60
+
+    def __init__(self, db_path: str, ttl_seconds: int = 24 * 60 * 60):
+        """
+        Initialize SQLite FSM storage.
+
+        Args:
+            db_path: Path to SQLite database (":memory:" works for tests)
+            ttl_seconds: Lifetime of an untouched session
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._last_purge = 0.0
+
+    async def _get_connection(self) -> aiosqlite.Connection:
+        """Open connection and create table on first use."""
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.db_path)
+            await self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS fsm_states (
+                    key TEXT PRIMARY KEY,
+                    state TEXT,
+                    data TEXT,
+                    updated_at INTEGER NOT NULL
+                )
+            """)
+            await self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _make_key(key: StorageKey) -> str:
+        """Build string key from aiogram StorageKey."""
+        return ":".join(str(part) for part in (
+            key.bot_id, key.chat_id, key.user_id, key.thread_id,
+            key.business_connection_id, key.destiny
+        ))
+
+    async def _read(self, key: StorageKey) -> Optional[tuple]:
+        """Read (state, data) row if the session hasn't expired."""
+        async with self._lock:
+            conn = await self._get_connection()
+            async with conn.execute(
+                "SELECT state, data FROM fsm_states WHERE key = ? AND updated_at > ?",
+                (self._make_key(key), int(time.time()) - self.ttl_seconds)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def _write(self, key: StorageKey, **fields):
+        """Upsert state and/or data column and refresh session timestamp."""
+        now = int(time.time())
+        str_key = self._make_key(key)
+
+        async with self._lock:
+            conn = await self._get_connection()
+            # An expired session starts from scratch
+            await conn.execute(
+                "DELETE FROM fsm_states WHERE key = ? AND updated_at <= ?",
+                (str_key, now - self.ttl_seconds)
+            )
+            await conn.execute(
+                "INSERT OR IGNORE INTO fsm_states (key, state, data, updated_at) VALUES (?, NULL, '{}', ?)",
+                (str_key, now)
+            )
+            for column, value in fields.items():
+                await conn.execute(
+                    f"UPDATE fsm_states SET {column} = ?, updated_at = ? WHERE key = ?",
+                    (value, now, str_key)
+                )
+            # Empty sessions don't need a row
+            await conn.execute(
+                "DELETE FROM fsm_states WHERE key = ? AND state IS NULL AND data = '{}'",
+                (str_key,)
+            )
+
+            if now - self._last_purge > self.PURGE_INTERVAL:
+                self._last_purge = now
+                cursor = await conn.execute(
+                    "DELETE FROM fsm_states WHERE updated_at <= ?",
+                    (now - self.ttl_seconds,)
+                )
+                if cursor.rowcount:
+                    logger.info(f"🧹 Purged {cursor.rowcount} expired FSM sessions")
+
+            await conn.commit()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        """Set state for key."""
+        state_name = state.state if isinstance(state, State) else state
+        await self._write(key, state=state_name)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        """Get current state for key."""
+        row = await self._read(key)
+        return row[0] if row else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        """Replace data for key."""
+        await self._write(key, data=json.dumps(dict(data), ensure_ascii=False))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        """Get current data for key."""
+        row = await self._read(key)
+        if not row or not row[1]:
+            return {}
+        return json.loads(row[1])
+
+    async def count_sessions(self) -> int:
+        """Get number of live (not expired) sessions."""
+        async with self._lock:
+            conn = await self._get_connection()
+            async with conn.execute(
+                "SELECT COUNT(*) FROM fsm_states WHERE updated_at > ?",
+                (int(time.time()) - self.ttl_seconds,)
+            ) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def close(self) -> None:
+        """Close database connection."""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
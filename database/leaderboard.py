@@ -0,0 +1,105 @@
+"""Cached top-N ranking of public community builds."""
+from typing import List, Optional, Tuple
+
+from .models import UserBuild
+
+
+def rank_key(build: UserBuild) -> Tuple:
+    """Sort key of the community ranking (likes, then newest, then id)."""
+    return (build.likes, build.created_at or "", build.id)
+
+
+class BuildLeaderboard:
+    """Top public builds in ranking order, kept in memory.
+
+    Loaded once from the database; Database keeps it in sync on writes:
+    likes move a cached build up in place, visibility changes and deletes
+    drop the ranking so it's reloaded on the next read. Pages inside the
+    cached range don't touch the database.
+    """
+
+    def __init__(self, size: int = 100):
+        """
+        Initialize leaderboard.
+
+        Args:
+            size: Number of top builds kept in memory
+        """
+        self.size = size
+        self._builds: Optional[List[UserBuild]] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Check if ranking is loaded."""
+        return self._builds is not None
+
+    @property
+    def is_complete(self) -> bool:
+        """Check if the cached ranking holds every public build."""
+        return self._builds is not None and len(self._builds) < self.size
+
+    def load(self, builds: List[UserBuild]):
+        """Replace ranking with top builds loaded from the database (ranking order)."""
+        self._builds = list(builds[:self.size])
+
+    def invalidate(self):
+        """Drop ranking; reloaded on next read."""
+        self._builds = None
+
+    def page(self, limit: int, after: Optional[Tuple] = None) -> Optional[List[UserBuild]]:
+        """
+        Get up to limit builds ranked below the after cursor.
+
+        Args:
+            limit: Page size
+            after: rank_key() of the last build of the previous page
+
+        Returns:
+            Builds, or None if the page reaches past the cached range
+        """
+        if self._builds is None:
+            return None
+
+        start = 0
+        if after is not None:
+            start = next(
+                (position for position, build in enumerate(self._builds) if rank_key(build) < after),
+                len(self._builds)
+            )
+
+        if start + limit > len(self._builds) and not self.is_complete:
+            return None
+        return self._builds[start:start + limit]
+
+    def like(self, build_id: int, count: int = 1) -> bool:
+        """
+        Add likes to a cached build and move it up the ranking.
+
+        Returns:
+            False if the build is not cached
+        """
+        position = self._position(build_id) if self._builds is not None else None
+        if position is None:
+            return False
+
+        builds = self._builds
+        build = builds[position]
+        build.likes += count
+        key = rank_key(build)
+        while position > 0 and rank_key(builds[position - 1]) < key:
+            builds[position] = builds[position - 1]
+            position -= 1
+        builds[position] = build
+        return True
+
+    def qualifies(self, likes: int) -> bool:
+        """Check if a build with this many likes could enter the cached ranking."""
+        if self._builds is None or self.is_complete:
+            return True
+        return likes >= self._builds[-1].likes
+
+    def _position(self, build_id: int) -> Optional[int]:
+        for position, build in enumerate(self._builds):
+            if build.id == build_id:
+                return position
+        return None
@@ -104,6 +104,9 @@ class UserBuild:
     is_public: bool = False
     created_at: Optional[str] = None
     likes: int = 0
+    # Filled by queries that join the weapons table (community list)
+    weapon_name_ru: Optional[str] = None
+    weapon_name_en: Optional[str] = None
     
     def __post_init__(self):
         if self.modules is None:
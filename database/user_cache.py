@@ -0,0 +1,103 @@
+"""Bounded in-memory cache of user profiles."""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from .models import User
+
+
+class UserCache:
+    """LRU cache of User objects in front of the users table.
+
+    Database writes the cached objects through on every user update, so a
+    cached profile is never stale within this process. Users known to be
+    absent are cached too (for negative_ttl_seconds), so the first-contact
+    get-then-insert doesn't hit the table twice.
+    """
+
+    # Returned by get() when the cache knows nothing about the user
+    MISSING = object()
+
+    def __init__(self, max_entries: int = 50000, negative_ttl_seconds: int = 300):
+        """
+        Initialize user cache.
+
+        Args:
+            max_entries: Maximum number of cached users
+            negative_ttl_seconds: How long "user doesn't exist" is remembered
+        """
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # user_id -> User, or expiry timestamp for known-absent users
+        self._entries: "OrderedDict[int, Union[User, float]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int) -> Union[User, None, object]:
+        """
+        Look up user.
+
+        Returns:
+            User if cached, None if the user is known not to exist,
+            UserCache.MISSING if the database has to be queried
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return self.MISSING
+
+        if isinstance(entry, User):
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry
+
+        if entry > time.monotonic():
+            self.negative_hits += 1
+            return None
+
+        del self._entries[user_id]
+        self.misses += 1
+        return self.MISSING
+
+    def set(self, user: User):
+        """Cache loaded or newly created user."""
+        self._store(user.user_id, user)
+
+    def set_absent(self, user_id: int):
+        """Remember that the user doesn't exist yet."""
+        self._store(user_id, time.monotonic() + self.negative_ttl_seconds)
+
+    def update(self, user_id: int, **fields):
+        """Write changed fields through to the cached user (if cached)."""
+        entry = self._entries.get(user_id)
+        if isinstance(entry, User):
+            for name, value in fields.items():
+                setattr(entry, name, value)
+
+    def invalidate(self, user_id: int):
+        """Drop user from cache."""
+        self._entries.pop(user_id, None)
+
+    def _store(self, user_id: int, entry: Union[User, float]):
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Get cache size and hit/miss counters."""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else None,
+        }
@@ -1,5 +1,5 @@
 """Handlers package for EFT Helper bot."""
 from . import common, search, builds, loyalty, tier_list, settings
-from . import dynamic_builds, budget_constructor, quest_builds, meta_builds_handler
+from . import dynamic_builds, budget_constructor, quest_builds, meta_builds_handler, inline
 
-__all__ = ["common", "search", "builds", "loyalty", "tier_list", "settings", "dynamic_builds", "budget_constructor", "quest_builds", "meta_builds_handler"]
+__all__ = ["common", "search", "builds", "loyalty", "tier_list", "settings", "dynamic_builds", "budget_constructor", "quest_builds", "meta_builds_handler", "inline"]
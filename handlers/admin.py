@@ -1,11 +1,12 @@
 """Admin panel handlers for statistics and broadcasting."""
 from aiogram import Router, F
 from aiogram.filters import Command
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from utils.admin import is_admin
-from services.admin_service import AdminService
+from keyboards import get_admin_keyboard
 from localization import get_text
 import logging
 
@@ -21,16 +22,6 @@ class BroadcastStates(StatesGroup):
     preview = State()
 
 
-def get_admin_keyboard() -> InlineKeyboardMarkup:
-    """Get admin panel main keyboard."""
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📊 Статистика", callback_data="admin:stats")],
-        [InlineKeyboardButton(text="📢 Создать рассылку", callback_data="admin:broadcast")],
-        [InlineKeyboardButton(text="❌ Закрыть", callback_data="admin:close")]
-    ])
-    return keyboard
-
-
 def get_broadcast_type_keyboard() -> InlineKeyboardMarkup:
     """Get broadcast type selection keyboard."""
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -105,8 +96,8 @@ async def show_admin_panel(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_text(text, reply_markup=get_admin_keyboard(), parse_mode="HTML")
 
 
-@router.callback_query(F.data == "admin:stats")
-async def show_statistics(callback: CallbackQuery, db):
+@router.callback_query(F.data.in_({"admin:stats", "admin:stats:refresh"}))
+async def show_statistics(callback: CallbackQuery, db, admin_service):
     """Show bot statistics."""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ У вас нет доступа", show_alert=True)
@@ -114,15 +105,20 @@ async def show_statistics(callback: CallbackQuery, db):
     
     await callback.answer("📊 Загрузка статистики...")
     
-    admin_service = AdminService(db)
-    stats = await admin_service.get_statistics()
+    stats = await admin_service.get_statistics(force=callback.data == "admin:stats:refresh")
+    
+    retention = (
+        f"{stats['weekly_retention'] * 100:.1f}%" if stats['weekly_retention'] is not None else "—"
+    )
     
     text = (
-        "📊 <b>Статистика бота</b>\n\n"
+        "📊 <b>Статистика бота</b>\n"
+        f"<i>обновлено {stats['age']} с назад</i>\n\n"
         f"👥 <b>Пользователи:</b>\n"
         f"├ Всего: {stats['total_users']}\n"
-        f"├ Активных (24ч): {stats['active_users_24h']}\n"
-        f"└ Активных (7д): {stats['active_users_7d']}\n\n"
+        f"├ Активных сегодня (DAU): {stats['dau']}\n"
+        f"├ Активных за 7 дней (WAU): {stats['wau']}\n"
+        f"└ Вернулись с прошлой недели: {retention}\n\n"
         f"🔫 <b>Контент:</b>\n"
         f"├ Оружие: {stats['total_weapons']}\n"
         f"├ Модули: {stats['total_modules']}\n"
@@ -136,11 +132,41 @@ async def show_statistics(callback: CallbackQuery, db):
         percentage = (count / stats['total_users'] * 100) if stats['total_users'] > 0 else 0
         text += f"├ {lang.upper()}: {count} ({percentage:.1f}%)\n"
     
+    text += "\n📈 <b>Активность по дням:</b>\n"
+    for day, count in stats['activity_history']:
+        text += f"├ {day}: {count}\n"
+    
+    if stats['feature_usage']:
+        text += "\n🧭 <b>Функции за 7 дней:</b>\n"
+        for event, count in stats['feature_usage'][:10]:
+            text += f"├ {event}: {count}\n"
+    
+    # Unsaved generated builds held in memory
+    from handlers.dynamic_builds import build_sessions
+    session_stats = build_sessions.get_stats()
+    text += (
+        f"\n🧠 <b>Сессии сборок:</b> {session_stats['sessions']} "
+        f"({session_stats['bytes'] / 1024:.1f} KB)\n"
+    )
+    
+    # Cached user profiles
+    user_cache_stats = db.user_cache.get_stats()
+    text += f"👤 <b>Кэш профилей:</b> {user_cache_stats['entries']}"
+    if user_cache_stats['hit_rate'] is not None:
+        text += f" (попаданий {user_cache_stats['hit_rate'] * 100:.1f}%)"
+    text += "\n"
+    
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data="admin:stats:refresh")],
         [InlineKeyboardButton(text="🔙 Назад", callback_data="admin:panel")]
     ])
     
-    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        # Refresh within the same second renders identical text
+        if "message is not modified" not in str(e):
+            raise
 
 
 @router.callback_query(F.data == "admin:broadcast")
@@ -350,65 +376,37 @@ async def show_broadcast_preview(message: Message, data: dict):
 
 
 @router.callback_query(F.data == "preview:send", BroadcastStates.preview)
-async def send_broadcast(callback: CallbackQuery, state: FSMContext, db):
-    """Send broadcast to users."""
+async def send_broadcast(callback: CallbackQuery, state: FSMContext, db, broadcast_service=None):
+    """Start background broadcast job."""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ У вас нет доступа", show_alert=True)
         return
     
     data = await state.get_data()
-    audience = data.get("audience")
-    text_content = data.get("text_content", "")
     has_media = data.get("has_media", False)
-    media_type = data.get("media_type")
-    media_file_id = data.get("media_file_id")
     
-    # Get user list
-    admin_service = AdminService(db)
-    if audience == "all":
-        user_ids = await admin_service.get_all_user_ids()
-    else:  # active
-        user_ids = await admin_service.get_active_user_ids(days=7)
+    if broadcast_service is None:
+        from services.broadcast_service import BroadcastService
+        broadcast_service = BroadcastService(callback.bot, db)
     
-    await callback.message.edit_text(
-        f"📤 <b>Отправка рассылки...</b>\n\nПользователей: {len(user_ids)}",
+    progress_message = await callback.message.edit_text(
+        "📤 <b>Отправка рассылки...</b>\n\nПодготовка списка получателей...",
         parse_mode="HTML"
     )
     
-    # Send to users
-    from aiogram import Bot
-    bot: Bot = callback.bot
-    
-    success_count = 0
-    failed_count = 0
-    
-    for user_id in user_ids:
-        try:
-            if has_media and media_file_id:
-                if media_type == "photo":
-                    await bot.send_photo(user_id, photo=media_file_id, caption=text_content, parse_mode="HTML")
-                elif media_type == "video":
-                    await bot.send_video(user_id, video=media_file_id, caption=text_content, parse_mode="HTML")
-                elif media_type == "document":
-                    await bot.send_document(user_id, document=media_file_id, caption=text_content, parse_mode="HTML")
-            else:
-                await bot.send_message(user_id, text=text_content, parse_mode="HTML")
-            
-            success_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send broadcast to {user_id}: {e}")
-            failed_count += 1
-    
-    await state.clear()
-    
-    result_text = (
-        f"✅ <b>Рассылка завершена!</b>\n\n"
-        f"📊 Результаты:\n"
-        f"├ Отправлено: {success_count}\n"
-        f"└ Ошибок: {failed_count}"
+    # Sending runs in background, progress message is edited by the job
+    job_id = await broadcast_service.create_job(
+        audience=data.get("audience"),
+        text_content=data.get("text_content", ""),
+        media_type=data.get("media_type") if has_media else None,
+        media_file_id=data.get("media_file_id") if has_media else None,
+        admin_chat_id=callback.message.chat.id,
+        progress_message_id=progress_message.message_id
     )
+    broadcast_service.start(job_id)
     
-    await callback.message.edit_text(result_text, reply_markup=get_admin_keyboard(), parse_mode="HTML")
+    await state.clear()
+    await callback.answer(f"📢 Рассылка #{job_id} запущена")
 
 
 @router.callback_query(F.data == "preview:edit_text", BroadcastStates.preview)
@@ -3,6 +3,7 @@ import logging
 import random
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from database import User
 from localization import get_text
 
 logger = logging.getLogger(__name__)
@@ -11,10 +12,8 @@ router = Router()
 
 
 @router.message(F.text.in_([get_text("budget_build_menu", "ru"), get_text("budget_build_menu", "en")]))
-async def start_budget_build_from_menu(message: Message, user_service):
+async def start_budget_build_from_menu(message: Message, user: User):
     """Start budget build from main menu - ask for weapon type or any."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     text = "💰 " + (
         "Выберите тип оружия или любое:"
         if user.language == "ru" else
@@ -53,9 +52,8 @@ async def start_budget_build_from_menu(message: Message, user_service):
 
 
 @router.callback_query(F.data.startswith("budget_menu_weapon:"))
-async def budget_weapon_selected_choose_budget(callback: CallbackQuery, user_service):
+async def budget_weapon_selected_choose_budget(callback: CallbackQuery, user: User):
     """Weapon type selected, ask for budget."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_category = callback.data.split(":")[1]
     
     text = "💰 " + ("Выберите бюджет для сборки:" if user.language == "ru" else "Select budget for build:")
@@ -84,14 +82,13 @@ async def budget_weapon_selected_choose_budget(callback: CallbackQuery, user_ser
 
 
 @router.callback_query(F.data.startswith("gen_budget_menu:"))
-async def generate_budget_build_from_menu(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_budget_build_from_menu(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate budget build from main menu."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category = parts[1]
     budget = int(parts[2])
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -133,10 +130,10 @@ async def generate_budget_build_from_menu(callback: CallbackQuery, user_service,
             "target_tier": target_tier
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="custom_request",
             context=context,
-            user_id=user.id,
+            user_id=user.user_id,
             language=user.language
         )
         
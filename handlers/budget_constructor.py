@@ -3,10 +3,10 @@ import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
-from database import Database
+from database import Database, User
 from localization import get_text
-from handlers.dynamic_builds import DynamicBuildStates, temp_build_data, format_generated_build
-from services import BuildGenerator, BuildGeneratorConfig, CompatibilityChecker, TierEvaluator
+from handlers.dynamic_builds import DynamicBuildStates, build_sessions, make_build_session, format_generated_build
+from services import BuildGenerator, BuildGeneratorConfig, TierEvaluator
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +14,8 @@ router = Router()
 
 
 @router.callback_query(F.data.startswith("build:budget:"))
-async def start_budget_build_for_weapon(callback: CallbackQuery, db: Database, user_service, state: FSMContext):
+async def start_budget_build_for_weapon(callback: CallbackQuery, db: Database, state: FSMContext, user: User):
     """Start budget build generation for specific weapon."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
     # Get weapon from database
@@ -45,10 +44,11 @@ async def start_budget_build_for_weapon(callback: CallbackQuery, db: Database, u
 
 
 @router.message(DynamicBuildStates.waiting_for_weapon_budget)
-async def process_weapon_budget(message: Message, db: Database, user_service, state: FSMContext, api_client):
+async def process_weapon_budget(
+    message: Message, db: Database, state: FSMContext, api_client,
+    build_generator: BuildGenerator, tier_evaluator: TierEvaluator, user: User
+):
     """Process budget input and generate build for specific weapon."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Validate budget
     try:
         budget = int(message.text.strip().replace(",", "").replace(" ", ""))
@@ -105,11 +105,6 @@ async def process_weapon_budget(message: Message, db: Database, user_service, st
         
         weapon_api_id = api_weapon.get("id")
         
-        # Initialize services
-        compatibility = CompatibilityChecker(api_client)
-        tier_eval = TierEvaluator()
-        generator = BuildGenerator(api_client, compatibility, tier_eval)
-        
         # Get user's trader levels
         trader_levels = user.trader_levels or {
             "prapor": 1, "therapist": 1, "fence": 1, "skier": 1,
@@ -127,7 +122,7 @@ async def process_weapon_budget(message: Message, db: Database, user_service, st
         )
         
         # Generate build for specific weapon
-        build = await generator.generate_build_for_weapon(weapon_api_id, config, language=user.language)
+        build = await build_generator.generate_build_for_weapon(weapon_api_id, config, language=user.language)
         
         if not build:
             error_text = (
@@ -140,13 +135,10 @@ async def process_weapon_budget(message: Message, db: Database, user_service, st
             return
         
         # Store build data temporarily
-        temp_build_data[user.user_id] = {
-            "build": build,
-            "budget": budget
-        }
+        build_sessions.set(user.user_id, make_build_session(build, budget))
         
         # Format build display
-        text = await format_generated_build(build, budget, user.language, tier_eval)
+        text = await format_generated_build(build, budget, user.language, tier_evaluator)
         
         # Action buttons
         buttons = [
@@ -179,9 +171,11 @@ async def process_weapon_budget(message: Message, db: Database, user_service, st
 
 
 @router.callback_query(F.data.startswith("regenerate_weapon_build:"))
-async def regenerate_weapon_build(callback: CallbackQuery, db: Database, user_service, api_client):
+async def regenerate_weapon_build(
+    callback: CallbackQuery, db: Database, api_client,
+    build_generator: BuildGenerator, tier_evaluator: TierEvaluator, user: User
+):
     """Regenerate a build for specific weapon with same budget."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
     budget = int(parts[2])
@@ -219,11 +213,6 @@ async def regenerate_weapon_build(callback: CallbackQuery, db: Database, user_se
         
         weapon_api_id = api_weapon.get("id")
         
-        # Initialize services
-        compatibility = CompatibilityChecker(api_client)
-        tier_eval = TierEvaluator()
-        generator = BuildGenerator(api_client, compatibility, tier_eval)
-        
         # Get user's trader levels
         trader_levels = user.trader_levels or {
             "prapor": 1, "therapist": 1, "fence": 1, "skier": 1,
@@ -241,7 +230,7 @@ async def regenerate_weapon_build(callback: CallbackQuery, db: Database, user_se
         )
         
         # Generate build
-        build = await generator.generate_build_for_weapon(weapon_api_id, config, language=user.language)
+        build = await build_generator.generate_build_for_weapon(weapon_api_id, config, language=user.language)
         
         if not build:
             await callback.message.edit_text(get_text("error", user.language))
@@ -249,13 +238,10 @@ async def regenerate_weapon_build(callback: CallbackQuery, db: Database, user_se
             return
         
         # Store build data temporarily
-        temp_build_data[user.user_id] = {
-            "build": build,
-            "budget": budget
-        }
+        build_sessions.set(user.user_id, make_build_session(build, budget))
         
         # Format build display
-        text = await format_generated_build(build, budget, user.language, tier_eval)
+        text = await format_generated_build(build, budget, user.language, tier_evaluator)
         
         # Action buttons
         buttons = [
@@ -288,9 +274,8 @@ async def regenerate_weapon_build(callback: CallbackQuery, db: Database, user_se
 
 
 @router.callback_query(F.data.startswith("build:constructor:"))
-async def start_constructor(callback: CallbackQuery, db: Database, user_service, state: FSMContext, api_client):
+async def start_constructor(callback: CallbackQuery, db: Database, state: FSMContext, api_client, user: User):
     """Start build constructor for specific weapon."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
     # Get weapon from database
@@ -340,12 +325,12 @@ async def start_constructor(callback: CallbackQuery, db: Database, user_service,
             await callback.answer()
             return
         
-        # Store constructor data in state
+        # Store only ids and indices in state; slots are resolved from the
+        # API client's cached weapon details on every step
         await state.update_data(
             constructor_weapon_id=weapon_id,
-            constructor_weapon_api_id=api_weapon.get("id"),
+            constructor_weapon_api_id=weapon.tarkov_id,
             constructor_weapon_name=weapon_name,
-            constructor_slots=slots,
             constructor_current_slot=0,
             constructor_selected_modules={}
         )
@@ -360,10 +345,20 @@ async def start_constructor(callback: CallbackQuery, db: Database, user_service,
         await callback.answer()
 
 
+async def get_constructor_slots(api_client, weapon_api_id: str) -> list:
+    """Get weapon slots from the shared (cached) API weapon details."""
+    if not weapon_api_id:
+        return []
+    weapon_details = await api_client.get_weapon_details(weapon_api_id)
+    if not weapon_details:
+        return []
+    return weapon_details.get("properties", {}).get("slots", [])
+
+
 async def show_slot_selection(message, state: FSMContext, language: str, api_client):
     """Show module selection for current slot."""
     data = await state.get_data()
-    slots = data.get("constructor_slots", [])
+    slots = await get_constructor_slots(api_client, data.get("constructor_weapon_api_id"))
     current_slot_idx = data.get("constructor_current_slot", 0)
     weapon_name = data.get("constructor_weapon_name", "")
     selected_modules = data.get("constructor_selected_modules", {})
@@ -433,9 +428,8 @@ async def show_slot_selection(message, state: FSMContext, language: str, api_cli
 
 
 @router.callback_query(F.data.startswith("constructor_select:"))
-async def constructor_select_module(callback: CallbackQuery, state: FSMContext, api_client, user_service):
+async def constructor_select_module(callback: CallbackQuery, state: FSMContext, api_client, user: User):
     """Handle module selection in constructor."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     slot_idx = int(parts[1])
     module_id = parts[2]
@@ -456,9 +450,8 @@ async def constructor_select_module(callback: CallbackQuery, state: FSMContext,
 
 
 @router.callback_query(F.data.startswith("constructor_skip:"))
-async def constructor_skip_slot(callback: CallbackQuery, state: FSMContext, api_client, user_service):
+async def constructor_skip_slot(callback: CallbackQuery, state: FSMContext, api_client, user: User):
     """Skip current slot in constructor."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     slot_idx = int(callback.data.split(":")[1])
     
     # Move to next slot without selecting module
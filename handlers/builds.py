@@ -3,10 +3,10 @@ import logging
 import random
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from database import Database, BuildCategory
+from database import Database, BuildCategory, User
 from localization import get_text
 from keyboards import get_builds_list_keyboard
-from utils.formatters import format_build_card
+from utils.formatters import load_build_card
 from utils.localization_helpers import localize_trader_name
 
 logger = logging.getLogger(__name__)
@@ -16,24 +16,19 @@ router = Router()
 
 
 @router.message(F.text.in_([get_text("random_build", "ru"), get_text("random_build", "en")]))
-async def show_random_build(message: Message, user_service, ai_gen_service=None, random_build_service=None):
+async def show_random_build(message: Message, user: User, db: Database, ai_generation_service=None, random_build_service=None):
     """Generate random build with AI using tier variety (v5.3)."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Use AI generation if available
-    if ai_gen_service:
+    if ai_generation_service:
         try:
             # Select random tier
-            from services.ai_generation_service import AIGenerationService
-            selected_tier = ai_gen_service._select_random_tier()
+            selected_tier = ai_generation_service._select_random_tier()
             
             # Show loading with tier info
             loading_text = get_text("random_build_with_tier", user.language, tier=selected_tier)
             loading_msg = await message.answer(loading_text)
             
             # Get random weapon from database
-            from database import Database
-            db = Database()
             all_weapons = await db.get_all_weapons()
             
             if not all_weapons:
@@ -52,10 +47,10 @@ async def show_random_build(message: Message, user_service, ai_gen_service=None,
                 "target_tier": selected_tier,
             }
             
-            build_data = await ai_gen_service.generate_build_with_ai(
+            build_data = await ai_generation_service.generate_build_with_ai(
                 intent="random_build",
                 context=context,
-                user_id=user.id,
+                user_id=user.user_id,
                 language=user.language
             )
             
@@ -109,10 +104,8 @@ async def show_random_build(message: Message, user_service, ai_gen_service=None,
 
 
 @router.message(F.text.in_([get_text("truly_random_build", "ru"), get_text("truly_random_build", "en")]))
-async def show_truly_random_build(message: Message, user_service, random_build_service):
+async def show_truly_random_build(message: Message, random_build_service, user: User):
     """Show truly random build with compatibility checks."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Show loading message
     loading_msg = await message.answer(get_text("generating_truly_random", user.language))
     
@@ -137,11 +130,10 @@ async def show_truly_random_build(message: Message, user_service, random_build_s
 
 
 @router.message(F.text.in_([get_text("quest_builds", "ru"), get_text("quest_builds", "en")]))
-async def show_quest_builds(message: Message, user_service, api_client):
+async def show_quest_builds(message: Message, api_client, user: User):
     """Show quest-related builds with interactive buttons."""
     from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
     
-    user = await user_service.get_or_create_user(message.from_user.id)
     
     # Show loading message
     loading_msg = await message.answer(get_text("loading_quests", user.language))
@@ -215,11 +207,10 @@ async def show_quest_builds(message: Message, user_service, api_client):
 
 
 @router.message(F.text.in_([get_text("all_quest_builds", "ru"), get_text("all_quest_builds", "en")]))
-async def show_all_quest_builds(message: Message, user_service, api_client):
+async def show_all_quest_builds(message: Message, api_client, user: User):
     """Show all quest builds."""
     from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
     
-    user = await user_service.get_or_create_user(message.from_user.id)
     
     # Show loading message
     loading_msg = await message.answer(get_text("loading_quests", user.language))
@@ -279,9 +270,8 @@ async def show_all_quest_builds(message: Message, user_service, api_client):
 
 
 @router.callback_query(F.data.startswith("build:"))
-async def show_build_by_type(callback: CallbackQuery, db: Database):
+async def show_build_by_type(callback: CallbackQuery, db: Database, user: User):
     """Show build by type and weapon."""
-    user = await db.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     build_type = parts[1]
     weapon_id = int(parts[2])
@@ -326,19 +316,16 @@ async def show_build_by_type(callback: CallbackQuery, db: Database):
     # Pick first build for non-random types
     build = builds[0]
     
-    # Format and show build card
-    weapon = await db.get_weapon_by_id(build.weapon_id)
-    modules = await db.get_modules_by_ids(build.modules)
+    # Format and show build card (weapon and modules are loaded on cache miss only)
+    build_text = await load_build_card(db, build, user.language)
     
     # Check if weapon exists
-    if not weapon:
+    if build_text is None:
         error_text = get_text("weapon_not_found", user.language)
         await callback.message.edit_text(error_text)
         await callback.answer()
         return
     
-    build_text = await format_build_card(build, weapon, modules, user.language)
-    
     keyboard_buttons = [
         [
             InlineKeyboardButton(
@@ -354,11 +341,10 @@ async def show_build_by_type(callback: CallbackQuery, db: Database):
 
 
 @router.callback_query(F.data.startswith("quest_detail:"))
-async def show_quest_detail(callback: CallbackQuery, user_service, api_client, build_service, db: Database):
+async def show_quest_detail(callback: CallbackQuery, api_client, build_service, db: Database, user: User):
     """Show quest details and recommended build."""
     from utils.formatters import format_build_card
     
-    user = await user_service.get_or_create_user(callback.from_user.id)
     quest_id = callback.data.split(":")[1]
     
     # Get weapon build tasks from API to find the specific one with user's language
@@ -450,9 +436,8 @@ async def show_quest_detail(callback: CallbackQuery, user_service, api_client, b
 
 
 @router.callback_query(F.data.startswith("show_build:"))
-async def show_specific_build(callback: CallbackQuery, db: Database):
+async def show_specific_build(callback: CallbackQuery, db: Database, user: User):
     """Show specific build by ID."""
-    user = await db.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     build = await db.get_build_by_id(build_id)
@@ -461,17 +446,14 @@ async def show_specific_build(callback: CallbackQuery, db: Database):
         await callback.answer(get_text("error", user.language))
         return
     
-    # Format and show build card
-    weapon = await db.get_weapon_by_id(build.weapon_id)
-    modules = await db.get_modules_by_ids(build.modules)
+    # Format and show build card (weapon and modules are loaded on cache miss only)
+    build_text = await load_build_card(db, build, user.language)
     
     # Check if weapon exists
-    if not weapon:
+    if build_text is None:
         error_text = get_text("weapon_not_found", user.language)
         await callback.message.edit_text(error_text)
         await callback.answer()
         return
-    
-    build_text = await format_build_card(build, weapon, modules, user.language)
     await callback.message.edit_text(build_text, parse_mode="Markdown")
     await callback.answer()
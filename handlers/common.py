@@ -1,10 +1,8 @@
 """Common handlers for the EFT Helper bot."""
-import os
-import tempfile
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
-from database import Database
+from database import Database, User
 from localization import get_text
 from keyboards import get_main_menu_keyboard, get_language_selection_keyboard
 
@@ -24,6 +22,9 @@ async def cmd_start(message: Message, db: Database):
         keyboard = get_language_selection_keyboard()
         await message.answer(text, reply_markup=keyboard)
     else:
+        # Existing user came back - deliver broadcasts again if they had blocked the bot
+        await db.unblock_user(message.from_user.id)
+        
         # Existing user - show main menu
         welcome_text = get_text("welcome", user.language)
         keyboard = get_main_menu_keyboard(user.language)
@@ -31,10 +32,8 @@ async def cmd_start(message: Message, db: Database):
 
 
 @router.message(F.text.in_([get_text("main_menu", "ru"), get_text("main_menu", "en")]))
-async def show_main_menu(message: Message, user_service):
+async def show_main_menu(message: Message, user: User):
     """Show main menu."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     menu_text = get_text("welcome", user.language)
     keyboard = get_main_menu_keyboard(user.language)
     
@@ -72,11 +71,8 @@ async def handle_language_selection(callback: CallbackQuery, db: Database):
     get_text("loyalty_build_menu", "ru"), get_text("loyalty_build_menu", "en"),
     get_text("budget_build_menu", "ru"), get_text("budget_build_menu", "en"),
 ]))
-async def handle_text_message(message: Message, user_service, ai_assistant=None):
+async def handle_text_message(message: Message, user: User, ai_assistant=None):
     """Handle all non-menu text messages and route to AI assistant."""
-    # Get or create user
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Route to AI assistant if available
     if ai_assistant:
         try:
@@ -99,11 +95,8 @@ async def handle_text_message(message: Message, user_service, ai_assistant=None)
 
 
 @router.message(F.voice)
-async def handle_voice_message(message: Message, user_service, ai_assistant=None):
+async def handle_voice_message(message: Message, user: User, ai_assistant=None):
     """Handle voice messages."""
-    # Get or create user
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Check if AI assistant is available
     if not ai_assistant:
         await message.answer(get_text("voice_not_supported", user.language))
@@ -114,27 +107,14 @@ async def handle_voice_message(message: Message, user_service, ai_assistant=None
         processing_msg = await message.answer(get_text("voice_processing", user.language))
         await message.bot.send_chat_action(message.chat.id, "typing")
         
-        # Download voice file
-        voice_file = await message.bot.get_file(message.voice.file_id)
+        # Process voice message (assistant downloads the file unless it is cached)
+        response = await ai_assistant.handle_voice(message, user.language)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as temp_file:
-            temp_path = temp_file.name
-            await message.bot.download_file(voice_file.file_path, temp_path)
+        # Delete processing message
+        await processing_msg.delete()
         
-        try:
-            # Process voice message
-            response = await ai_assistant.handle_voice(message, temp_path, user.language)
-            
-            # Delete processing message
-            await processing_msg.delete()
-            
-            # Send response
-            await message.answer(response, parse_mode="Markdown")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        # Send response
+        await message.answer(response, parse_mode="Markdown")
     
     except Exception as e:
         import logging
@@ -1,43 +1,46 @@
 """Community builds handler for v3.0."""
 import logging
+from typing import List, Tuple
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from database import Database, UserBuild
+from database import Database, UserBuild, User
+from database.leaderboard import rank_key
 from localization import get_text
+from services import LikeService
+from utils.card_renderer import build_card_cache
+from utils.formatters import load_user_build_body
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
+COMMUNITY_PAGE_SIZE = 20
+
 
 class CommunityStates(StatesGroup):
     """States for community builds interaction."""
     viewing_builds = State()
 
 
-@router.message(F.text.in_([get_text("community_builds", "ru"), get_text("community_builds", "en")]))
-async def show_community_builds(message: Message, db: Database, user_service):
-    """Show community builds list."""
-    user = await user_service.get_or_create_user(message.from_user.id)
+def build_community_page(builds: List[UserBuild], language: str) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Format one page of the community list.
     
-    # Get public builds
-    builds = await db.get_public_builds(limit=20)
+    Args:
+        builds: Up to COMMUNITY_PAGE_SIZE + 1 builds (the extra one only signals a next page)
+        language: User language
+    """
+    text = f"**{get_text('community_builds_title', language)}**\n\n"
+    text += get_text("community_builds_desc", language) + "\n\n"
     
-    if not builds:
-        await message.answer(get_text("no_community_builds", user.language))
-        return
-    
-    text = f"**{get_text('community_builds_title', user.language)}**\n\n"
-    text += get_text("community_builds_desc", user.language) + "\n\n"
+    page = builds[:COMMUNITY_PAGE_SIZE]
     
-    # Create inline keyboard with build buttons
+    # Create inline keyboard with build buttons (weapon names come joined with the page)
     buttons = []
-    for build in builds:
-        # Get weapon name
-        weapon = await db.get_weapon_by_id(build.weapon_id)
-        weapon_name = weapon.name_ru if user.language == "ru" else weapon.name_en if weapon else "Unknown"
+    for build in page:
+        weapon_name = (build.weapon_name_ru if language == "ru" else build.weapon_name_en) or "Unknown"
         
         button_text = f"{build.tier_rating.value} | {build.name} ({weapon_name}) | 👍 {build.likes}"
         buttons.append([InlineKeyboardButton(
@@ -45,15 +48,50 @@ async def show_community_builds(message: Message, db: Database, user_service):
             callback_data=f"community_build:{build.id}"
         )])
     
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+    if len(builds) > COMMUNITY_PAGE_SIZE:
+        buttons.append([InlineKeyboardButton(
+            text=get_text("next_page", language),
+            callback_data="community_page:{}:{}:{}".format(*rank_key(page[-1]))
+        )])
+    
+    return text, InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+@router.message(F.text.in_([get_text("community_builds", "ru"), get_text("community_builds", "en")]))
+async def show_community_builds(message: Message, db: Database, user: User):
+    """Show community builds list."""
+    # Get public builds (first page)
+    builds = await db.get_public_builds(limit=COMMUNITY_PAGE_SIZE + 1)
+    
+    if not builds:
+        await message.answer(get_text("no_community_builds", user.language))
+        return
+    
+    text, keyboard = build_community_page(builds, user.language)
     await message.answer(text, reply_markup=keyboard, parse_mode="Markdown")
 
 
+@router.callback_query(F.data.startswith("community_page:"))
+async def show_community_page(callback: CallbackQuery, db: Database, user: User):
+    """Show next page of community builds (keyset cursor = likes:created_at:id of last build)."""
+    # created_at contains colons itself
+    _, likes, rest = callback.data.split(":", 2)
+    created_at, build_id = rest.rsplit(":", 1)
+    after = (int(likes), created_at, int(build_id))
+    
+    builds = await db.get_public_builds(limit=COMMUNITY_PAGE_SIZE + 1, after=after)
+    if not builds:
+        await callback.answer(get_text("no_community_builds", user.language))
+        return
+    
+    text, keyboard = build_community_page(builds, user.language)
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
+    await callback.answer()
+
+
 @router.message(F.text.in_([get_text("my_builds", "ru"), get_text("my_builds", "en")]))
-async def show_my_builds(message: Message, db: Database, user_service):
+async def show_my_builds(message: Message, db: Database, user: User):
     """Show user's saved builds."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     # Get user's builds
     builds = await db.get_user_builds(user.user_id, limit=50)
     
@@ -82,9 +120,8 @@ async def show_my_builds(message: Message, db: Database, user_service):
 
 
 @router.callback_query(F.data.startswith("community_build:"))
-async def show_community_build_detail(callback: CallbackQuery, db: Database, user_service):
+async def show_community_build_detail(callback: CallbackQuery, db: Database, user: User):
     """Show detailed view of a community build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     build = await db.get_user_build_by_id(build_id)
@@ -102,21 +139,8 @@ async def show_community_build_detail(callback: CallbackQuery, db: Database, use
     text += f"{get_text('build_by_user', user.language, user_id=build.user_id)}\n"
     text += f"{get_text('build_likes', user.language, count=build.likes)}\n\n"
     
-    # Stats
-    text += f"{get_text('build_stats', user.language)}\n"
-    if build.ergonomics:
-        text += get_text("build_ergonomics", user.language, value=build.ergonomics) + "\n"
-    if build.recoil_vertical:
-        text += get_text("build_recoil_v", user.language, value=build.recoil_vertical) + "\n"
-    text += f"\n💰 {get_text('build_total_cost', user.language, cost=build.total_cost)}\n"
-    
-    # Modules
-    if build.modules:
-        modules = await db.get_modules_by_ids(build.modules)
-        text += f"\n{get_text('build_modules_list', user.language)}\n"
-        for module in modules[:10]:  # Limit to 10 modules
-            module_name = module.name_ru if user.language == "ru" else module.name_en
-            text += f"  • {module_name}\n"
+    # Stats and modules (cached per build)
+    text += await load_user_build_body(db, build, user.language)
     
     # Action buttons
     buttons = [
@@ -144,9 +168,8 @@ async def show_community_build_detail(callback: CallbackQuery, db: Database, use
 
 
 @router.callback_query(F.data.startswith("my_build:"))
-async def show_my_build_detail(callback: CallbackQuery, db: Database, user_service):
+async def show_my_build_detail(callback: CallbackQuery, db: Database, user: User):
     """Show detailed view of user's own build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     build = await db.get_user_build_by_id(build_id)
@@ -165,21 +188,8 @@ async def show_my_build_detail(callback: CallbackQuery, db: Database, user_servi
     text += f"Status: {'Public' if build.is_public else 'Private'}\n"
     text += f"{get_text('build_likes', user.language, count=build.likes)}\n\n"
     
-    # Stats
-    text += f"{get_text('build_stats', user.language)}\n"
-    if build.ergonomics:
-        text += get_text("build_ergonomics", user.language, value=build.ergonomics) + "\n"
-    if build.recoil_vertical:
-        text += get_text("build_recoil_v", user.language, value=build.recoil_vertical) + "\n"
-    text += f"\n💰 {get_text('build_total_cost', user.language, cost=build.total_cost)}\n"
-    
-    # Modules
-    if build.modules:
-        modules = await db.get_modules_by_ids(build.modules)
-        text += f"\n{get_text('build_modules_list', user.language)}\n"
-        for module in modules[:10]:
-            module_name = module.name_ru if user.language == "ru" else module.name_en
-            text += f"  • {module_name}\n"
+    # Stats and modules (cached per build)
+    text += await load_user_build_body(db, build, user.language)
     
     # Action buttons
     visibility_text = get_text("make_public", user.language) if not build.is_public else get_text("make_private", user.language)
@@ -210,19 +220,19 @@ async def show_my_build_detail(callback: CallbackQuery, db: Database, user_servi
 
 
 @router.callback_query(F.data.startswith("like_build:"))
-async def like_build(callback: CallbackQuery, db: Database, user_service):
-    """Like a community build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
+async def like_build(callback: CallbackQuery, like_service: LikeService, user: User):
+    """Like a community build (once per user, counters are updated in batches)."""
     build_id = int(callback.data.split(":")[1])
     
-    await db.increment_build_likes(build_id)
-    await callback.answer(get_text("build_liked", user.language))
+    if await like_service.like(user.user_id, build_id):
+        await callback.answer(get_text("build_liked", user.language))
+    else:
+        await callback.answer(get_text("build_already_liked", user.language))
 
 
 @router.callback_query(F.data.startswith("copy_build:"))
-async def copy_build(callback: CallbackQuery, db: Database, user_service):
+async def copy_build(callback: CallbackQuery, db: Database, user: User):
     """Copy a community build to user's collection."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     # Get the original build
@@ -252,9 +262,8 @@ async def copy_build(callback: CallbackQuery, db: Database, user_service):
 
 
 @router.callback_query(F.data.startswith("toggle_visibility:"))
-async def toggle_build_visibility(callback: CallbackQuery, db: Database, user_service):
+async def toggle_build_visibility(callback: CallbackQuery, db: Database, user: User):
     """Toggle build public/private status."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     build = await db.get_user_build_by_id(build_id)
@@ -270,13 +279,12 @@ async def toggle_build_visibility(callback: CallbackQuery, db: Database, user_se
     await callback.answer(message)
     
     # Refresh the display
-    await show_my_build_detail(callback, db, user_service)
+    await show_my_build_detail(callback, db, user)
 
 
 @router.callback_query(F.data.startswith("delete_build_confirm:"))
-async def confirm_delete_build(callback: CallbackQuery, user_service):
+async def confirm_delete_build(callback: CallbackQuery, user: User):
     """Confirm build deletion."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = callback.data.split(":")[1]
     
     text = get_text("confirm_delete", user.language)
@@ -299,30 +307,31 @@ async def confirm_delete_build(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("delete_build_yes:"))
-async def delete_build(callback: CallbackQuery, db: Database, user_service):
+async def delete_build(callback: CallbackQuery, db: Database, user: User):
     """Delete a build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     build_id = int(callback.data.split(":")[1])
     
     await db.delete_user_build(build_id, user.user_id)
+    # Drop the cached view of the deleted build
+    build_card_cache.invalidate(("user_build", build_id))
     
     await callback.message.edit_text(get_text("build_deleted", user.language))
     await callback.answer()
 
 
 @router.callback_query(F.data == "back_to_community")
-async def back_to_community(callback: CallbackQuery, db: Database, user_service):
+async def back_to_community(callback: CallbackQuery, db: Database, user: User):
     """Go back to community builds list."""
     # Simulate message to reuse the handler
     callback.message.text = get_text("community_builds", "ru")
-    await show_community_builds(callback.message, db, user_service)
+    await show_community_builds(callback.message, db, user)
     await callback.answer()
 
 
 @router.callback_query(F.data == "back_to_my_builds")
-async def back_to_my_builds(callback: CallbackQuery, db: Database, user_service):
+async def back_to_my_builds(callback: CallbackQuery, db: Database, user: User):
     """Go back to my builds list."""
     # Simulate message to reuse the handler
     callback.message.text = get_text("my_builds", "ru")
-    await show_my_builds(callback.message, db, user_service)
+    await show_my_builds(callback.message, db, user)
     await callback.answer()
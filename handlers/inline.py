@@ -0,0 +1,117 @@
+"""Inline mode handlers for the EFT Helper bot (@bot ak74)."""
+import asyncio
+import html
+import logging
+from typing import Dict
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from database import Weapon
+from localization import get_text
+from utils.constants import CATEGORY_EMOJIS, TIER_EMOJIS
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+# Results per page (Telegram allows up to 50)
+INLINE_PAGE_SIZE = 20
+# Wait this long for the user to stop typing before searching (seconds)
+INLINE_DEBOUNCE = 0.15
+# Results depend only on the query text and language
+INLINE_CACHE_TIME = 300
+
+# Latest inline query id per user; older lookups are dropped
+_latest_queries: Dict[int, str] = {}
+
+
+def _format_weapon_card(weapon: Weapon, language: str) -> str:
+    """Format weapon card (HTML) sent to the chat when an inline result is chosen."""
+    name = weapon.name_ru if language == "ru" else weapon.name_en
+    category = get_text(weapon.category.value, language)
+    emoji = CATEGORY_EMOJIS.get(weapon.category.value, "🔫")
+
+    lines = [f"{emoji} <b>{html.escape(name)}</b>", f"📂 {category}"]
+    if weapon.tier_rating:
+        tier = weapon.tier_rating.value
+        lines.append(get_text("inline_tier", language, emoji=TIER_EMOJIS.get(tier, ""), tier=tier))
+    if weapon.caliber:
+        lines.append(get_text("inline_caliber", language, value=html.escape(weapon.caliber)))
+    if weapon.ergonomics is not None:
+        lines.append(get_text("inline_ergonomics", language, value=weapon.ergonomics))
+    if weapon.recoil_vertical is not None:
+        lines.append(get_text(
+            "inline_recoil", language,
+            vertical=weapon.recoil_vertical, horizontal=weapon.recoil_horizontal or 0
+        ))
+    if weapon.fire_rate:
+        lines.append(get_text("inline_fire_rate", language, value=weapon.fire_rate))
+    if weapon.flea_price:
+        lines.append(get_text("inline_flea_price", language, price=f"{weapon.flea_price:,}"))
+
+    return "\n".join(lines)
+
+
+def _weapon_description(weapon: Weapon, language: str) -> str:
+    """Short one-line description for the inline result list."""
+    parts = [get_text(weapon.category.value, language)]
+    if weapon.caliber:
+        parts.append(weapon.caliber)
+    if weapon.tier_rating:
+        parts.append(f"Tier {weapon.tier_rating.value}")
+    return " • ".join(parts)
+
+
+@router.inline_query()
+async def inline_weapon_search(inline_query: InlineQuery, weapon_service):
+    """
+    Answer inline weapon search from the in-memory search index.
+
+    Requires inline mode to be enabled for the bot in @BotFather (/setinline).
+    """
+    user_id = inline_query.from_user.id
+    query = inline_query.query.strip()
+    # Language from Telegram client settings: avoids a DB round trip per keystroke
+    language = "ru" if (inline_query.from_user.language_code or "ru").startswith("ru") else "en"
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+
+    if not query:
+        await inline_query.answer([], cache_time=INLINE_CACHE_TIME, is_personal=True)
+        return
+
+    # Debounce: only the latest query of a fast typer is searched and answered
+    _latest_queries[user_id] = inline_query.id
+    if offset == 0:
+        await asyncio.sleep(INLINE_DEBOUNCE)
+        if _latest_queries.get(user_id) != inline_query.id:
+            return
+
+    try:
+        if not weapon_service.search_index.is_built:
+            await weapon_service.rebuild_search_index()
+
+        # Fetch one extra result to know if there is a next page
+        weapons = weapon_service.search_index.search(query, limit=INLINE_PAGE_SIZE + 1, offset=offset)
+    finally:
+        if _latest_queries.get(user_id) == inline_query.id:
+            del _latest_queries[user_id]
+
+    has_more = len(weapons) > INLINE_PAGE_SIZE
+    results = [
+        InlineQueryResultArticle(
+            id=str(weapon.id),
+            title=weapon.name_ru if language == "ru" else weapon.name_en,
+            description=_weapon_description(weapon, language),
+            input_message_content=InputTextMessageContent(
+                message_text=_format_weapon_card(weapon, language),
+                parse_mode="HTML"
+            )
+        )
+        for weapon in weapons[:INLINE_PAGE_SIZE]
+    ]
+
+    await inline_query.answer(
+        results,
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=str(offset + INLINE_PAGE_SIZE) if has_more else ""
+    )
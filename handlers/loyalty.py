@@ -4,10 +4,11 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from database import Database
+from database import Database, User
 from database.models import WeaponCategory
 from localization import get_text
 from keyboards import get_builds_list_keyboard
+from services import BuildGenerator, BuildGeneratorConfig
 from utils.constants import TRADER_EMOJIS
 
 logger = logging.getLogger(__name__)
@@ -23,10 +24,8 @@ router = Router()
 
 
 @router.message(F.text.in_([get_text("loyalty_build_menu", "ru"), get_text("loyalty_build_menu", "en")]))
-async def start_loyalty_build_from_menu(message: Message, user_service):
+async def start_loyalty_build_from_menu(message: Message, user: User):
     """Start loyalty build from main menu - ask for weapon or any."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     text = "🤝 " + (
         "Выберите тип оружия или пропустите:"
         if user.language == "ru" else
@@ -75,11 +74,10 @@ async def start_loyalty_build_from_menu(message: Message, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu_weapon:"))
-async def loyalty_weapon_selected_start_traders(callback: CallbackQuery, user_service):
+async def loyalty_weapon_selected_start_traders(callback: CallbackQuery, user: User):
     """Weapon type selected, start trader loyalty selection."""
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
     
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_category = callback.data.split(":")[1]
     
     trader_name = "Прапор" if user.language == "ru" else "Prapor"
@@ -105,11 +103,10 @@ async def loyalty_weapon_selected_start_traders(callback: CallbackQuery, user_se
 
 # Continue with other traders similar to search.py but with weapon_category in callback data
 @router.callback_query(F.data.startswith("loyalty_menu:prapor:"))
-async def loyalty_menu_select_therapist(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_therapist(callback: CallbackQuery, user: User):
     """Select Therapist loyalty level."""
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
     
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category = parts[2]
     prapor_ll = int(parts[3])
@@ -137,9 +134,8 @@ async def loyalty_menu_select_therapist(callback: CallbackQuery, user_service):
 
 # Similar handlers for remaining traders with weapon_category in callback data
 @router.callback_query(F.data.startswith("loyalty_menu:therapist:"))
-async def loyalty_menu_select_fence(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_fence(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll = parts[2], int(parts[3]), int(parts[4])
     
@@ -157,9 +153,8 @@ async def loyalty_menu_select_fence(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:fence:"))
-async def loyalty_menu_select_skier(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_skier(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5])
     
@@ -174,9 +169,8 @@ async def loyalty_menu_select_skier(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:skier:"))
-async def loyalty_menu_select_mechanic(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_mechanic(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6])
     
@@ -191,9 +185,8 @@ async def loyalty_menu_select_mechanic(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:mechanic:"))
-async def loyalty_menu_select_ragman(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_ragman(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7])
     
@@ -208,9 +201,8 @@ async def loyalty_menu_select_ragman(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:ragman:"))
-async def loyalty_menu_select_jaeger(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_jaeger(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll, ragman_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7]), int(parts[8])
     
@@ -225,9 +217,8 @@ async def loyalty_menu_select_jaeger(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:jaeger:"))
-async def loyalty_menu_select_ref(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_ref(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll, ragman_ll, jaeger_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7]), int(parts[8]), int(parts[9])
     
@@ -242,9 +233,8 @@ async def loyalty_menu_select_ref(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu:ref:"))
-async def loyalty_menu_select_budget(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_budget(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll, ragman_ll, jaeger_ll, ref_ll = parts[2], int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7]), int(parts[8]), int(parts[9]), int(parts[10])
     
@@ -260,9 +250,8 @@ async def loyalty_menu_select_budget(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty_menu_budget:"))
-async def loyalty_menu_select_flea(callback: CallbackQuery, user_service):
+async def loyalty_menu_select_flea(callback: CallbackQuery, user: User):
     from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll, ragman_ll, jaeger_ll, ref_ll, budget = parts[1], int(parts[2]), int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7]), int(parts[8]), int(parts[9]), int(parts[10])
     
@@ -279,13 +268,12 @@ async def loyalty_menu_select_flea(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("gen_loyalty_menu_final:"))
-async def generate_loyalty_build_from_menu(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_loyalty_build_from_menu(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate loyalty build from main menu with weapon category selection."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_category, prapor_ll, therapist_ll, fence_ll, skier_ll, mechanic_ll, ragman_ll, jaeger_ll, ref_ll, budget, use_flea = parts[1], int(parts[2]), int(parts[3]), int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7]), int(parts[8]), int(parts[9]), int(parts[10]), bool(int(parts[11]))
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -316,7 +304,7 @@ async def generate_loyalty_build_from_menu(callback: CallbackQuery, user_service
     try:
         context = {"weapon_id": weapon.tarkov_id, "weapon_name": weapon_name, "trader_levels": trader_levels, "budget": budget if budget > 0 else None, "use_flea_market": use_flea, "target_tier": "B"}
         
-        build_data = await ai_gen_service.generate_build_with_ai(intent="custom_request", context=context, user_id=user.id, language=user.language)
+        build_data = await ai_generation_service.generate_build_with_ai(intent="custom_request", context=context, user_id=user.user_id, language=user.language)
         
         if not build_data or not build_data.get("text"):
             await callback.message.edit_text("❌ Не удалось сгенерировать сборку" if user.language == "ru" else "❌ Failed to generate build")
@@ -367,9 +355,8 @@ def get_loyalty_setup_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
 
 
 @router.callback_query(F.data.startswith("set_loyalty:"))
-async def select_trader_level(callback: CallbackQuery, db: Database):
+async def select_trader_level(callback: CallbackQuery, user: User):
     """Handle trader selection for level setting."""
-    user = await db.get_or_create_user(callback.from_user.id)
     trader = callback.data.split(":")[1]
     
     trader_name = get_text(trader, language=user.language)
@@ -402,9 +389,8 @@ async def select_trader_level(callback: CallbackQuery, db: Database):
 
 
 @router.callback_query(F.data.startswith("update_loyalty:"))
-async def update_trader_loyalty(callback: CallbackQuery, db: Database):
+async def update_trader_loyalty(callback: CallbackQuery, db: Database, user: User):
     """Update trader loyalty level."""
-    user = await db.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     trader = parts[1]
     level = int(parts[2])
@@ -432,10 +418,8 @@ async def update_trader_loyalty(callback: CallbackQuery, db: Database):
 
 
 @router.callback_query(F.data == "show_loyalty_builds")
-async def start_loyalty_filters(callback: CallbackQuery, db: Database):
+async def start_loyalty_filters(callback: CallbackQuery, user: User):
     """Start loyalty build filtering - select category."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     text = get_text("select_weapon_category", language=user.language)
     
     # Create category selection keyboard
@@ -468,10 +452,8 @@ async def start_loyalty_filters(callback: CallbackQuery, db: Database):
 
 
 @router.callback_query(F.data == "reset_loyalty")
-async def reset_loyalty_levels(callback: CallbackQuery, db: Database):
+async def reset_loyalty_levels(callback: CallbackQuery, db: Database, user: User):
     """Reset all trader loyalty levels to 1."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     default_levels = {trader: 1 for trader in user.trader_levels.keys()}
     await db.update_trader_levels(callback.from_user.id, default_levels)
     
@@ -491,9 +473,8 @@ async def reset_loyalty_levels(callback: CallbackQuery, db: Database):
 
 
 @router.callback_query(F.data.startswith("loyalty_category:"))
-async def select_category_for_loyalty(callback: CallbackQuery, db: Database, state: FSMContext):
+async def select_category_for_loyalty(callback: CallbackQuery, state: FSMContext, user: User):
     """Handle category selection and ask for budget."""
-    user = await db.get_or_create_user(callback.from_user.id)
     category = callback.data.split(":")[1]
     
     # Store category in state
@@ -521,10 +502,8 @@ async def select_category_for_loyalty(callback: CallbackQuery, db: Database, sta
 
 
 @router.message(LoyaltyBuildStates.waiting_for_budget)
-async def process_budget_input(message: Message, db: Database, state: FSMContext):
+async def process_budget_input(message: Message, state: FSMContext, user: User):
     """Process budget input."""
-    user = await db.get_or_create_user(message.from_user.id)
-    
     budget = None
     if message.text and message.text.strip().isdigit():
         budget = int(message.text.strip())
@@ -559,10 +538,8 @@ async def process_budget_input(message: Message, db: Database, state: FSMContext
 
 
 @router.callback_query(F.data == "loyalty_skip_budget", LoyaltyBuildStates.waiting_for_budget)
-async def skip_budget_input(callback: CallbackQuery, db: Database, state: FSMContext):
+async def skip_budget_input(callback: CallbackQuery, state: FSMContext, user: User):
     """Skip budget filter."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     await callback.answer(get_text("no_budget_limit", language=user.language))
     
     # Store unlimited budget and ask for flea market choice
@@ -591,10 +568,8 @@ async def skip_budget_input(callback: CallbackQuery, db: Database, state: FSMCon
 
 
 @router.callback_query(F.data.startswith("loyalty_flea:"), LoyaltyBuildStates.waiting_for_flea_choice)
-async def process_flea_choice(callback: CallbackQuery, db: Database, state: FSMContext):
+async def process_flea_choice(callback: CallbackQuery, state: FSMContext, build_generator: BuildGenerator, user: User):
     """Process flea market choice and generate build."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     # Parse flea choice
     use_flea = callback.data.split(":")[1] == "yes"
     
@@ -608,27 +583,21 @@ async def process_flea_choice(callback: CallbackQuery, db: Database, state: FSMC
     
     # Delete old message and generate build
     await callback.message.delete()
-    await show_filtered_loyalty_builds(callback.message, db, user, category, budget, use_flea)
+    await show_filtered_loyalty_builds(callback.message, build_generator, user, category, budget, use_flea)
     await callback.answer()
 
 
-async def show_filtered_loyalty_builds(message, db: Database, user, category: str, max_budget: int = None, use_flea: bool = False):
+async def show_filtered_loyalty_builds(
+    message, build_generator: BuildGenerator, user, category: str,
+    max_budget: int = None, use_flea: bool = False
+):
     """Generate build via API with loyalty, category, and budget constraints."""
-    from api_clients import TarkovAPIClient
-    from services import BuildGenerator, BuildGeneratorConfig, CompatibilityChecker, TierEvaluator
-    
     logger.info(f"Generating loyalty build: category={category}, budget={max_budget}")
     logger.info(f"User trader levels: {user.trader_levels}")
     
     # Show loading message
     loading_msg = await message.answer(get_text("generating_build", user.language))
     
-    # Initialize services
-    api_client = TarkovAPIClient()
-    compatibility = CompatibilityChecker(api_client)
-    tier_eval = TierEvaluator()
-    generator = BuildGenerator(api_client, compatibility, tier_eval)
-    
     # Map category to weapon type string for API
     # Use Russian names if user language is Russian, English otherwise
     weapon_type = None
@@ -667,7 +636,7 @@ async def show_filtered_loyalty_builds(message, db: Database, user, category: st
     
     # Generate build
     try:
-        build = await generator.generate_random_build(config, language=user.language)
+        build = await build_generator.generate_random_build(config, language=user.language)
         
         if not build:
             await loading_msg.edit_text(get_text("no_builds_found", user.language))
@@ -675,7 +644,7 @@ async def show_filtered_loyalty_builds(message, db: Database, user, category: st
         
         # Format and display build
         from handlers.dynamic_builds import format_generated_build
-        text = await format_generated_build(build, max_budget, user.language, tier_eval)
+        text = await format_generated_build(build, max_budget, user.language, build_generator.tier_eval)
         
         # Action buttons
         keyboard = InlineKeyboardMarkup(
@@ -704,10 +673,8 @@ async def show_filtered_loyalty_builds(message, db: Database, user, category: st
 
 
 @router.callback_query(F.data.startswith("loyalty_regenerate:"))
-async def regenerate_loyalty_build(callback: CallbackQuery, db: Database):
+async def regenerate_loyalty_build(callback: CallbackQuery, build_generator: BuildGenerator, user: User):
     """Regenerate build with same parameters."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     # Parse parameters from callback data
     parts = callback.data.split(":")
     category = parts[1]
@@ -716,17 +683,16 @@ async def regenerate_loyalty_build(callback: CallbackQuery, db: Database):
     
     # Delete old message and generate new build
     await callback.message.delete()
-    await show_filtered_loyalty_builds(callback.message, db, user, category, budget, use_flea)
+    await show_filtered_loyalty_builds(callback.message, build_generator, user, category, budget, use_flea)
     await callback.answer()
 
 
 @router.callback_query(F.data == "back_to_loyalty_setup")
-async def back_to_loyalty_setup(callback: CallbackQuery, db: Database, state: FSMContext):
+async def back_to_loyalty_setup(callback: CallbackQuery, state: FSMContext, user: User):
     """Go back to loyalty setup screen."""
     # Clear any active state
     await state.clear()
     
-    user = await db.get_or_create_user(callback.from_user.id)
     
     text = get_text("setup_loyalty_levels", language=user.language) + "\n\n"
     text += get_text("current_loyalty_levels", language=user.language) + "\n"
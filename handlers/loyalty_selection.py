@@ -2,6 +2,7 @@
 import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from database import User
 from localization import get_text
 
 logger = logging.getLogger(__name__)
@@ -37,10 +38,8 @@ def get_next_trader(trader_name: str):
 
 
 @router.callback_query(F.data.startswith("loy_sel:"))
-async def select_trader_loyalty(callback: CallbackQuery, user_service):
+async def select_trader_loyalty(callback: CallbackQuery, user: User):
     """Handle trader loyalty selection and move to next trader."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
-    
     # Parse: loy_sel:weapon_id:trader:level:existing_data
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
@@ -137,10 +136,8 @@ async def ask_loyalty_budget(callback: CallbackQuery, user, weapon_id: int, loya
 
 
 @router.callback_query(F.data.startswith("loy_budget:"))
-async def select_loyalty_budget(callback: CallbackQuery, user_service):
+async def select_loyalty_budget(callback: CallbackQuery, user: User):
     """Handle budget selection for loyalty build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
-    
     # Parse: loy_budget:weapon_id:loyalty_data:budget
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
@@ -174,10 +171,8 @@ async def ask_flea_market(callback: CallbackQuery, user, weapon_id: int, loyalty
 
 
 @router.callback_query(F.data.startswith("gen_loyalty_full:"))
-async def generate_full_loyalty_build(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_full_loyalty_build(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate build with full loyalty configuration."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
-    
     # Parse: gen_loyalty_full:weapon_id:loyalty_data:budget:flea
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
@@ -185,7 +180,7 @@ async def generate_full_loyalty_build(callback: CallbackQuery, user_service, wea
     budget = parts[3]
     use_flea = parts[4] == "yes"
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -228,10 +223,10 @@ async def generate_full_loyalty_build(callback: CallbackQuery, user_service, wea
             "target_tier": "B"  # Loyalty builds typically balanced
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="custom_request",
             context=context,
-            user_id=user.id,
+            user_id=user.user_id,
             language=user.language
         )
         
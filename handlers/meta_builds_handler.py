@@ -2,6 +2,7 @@
 import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from database import User
 from localization import get_text
 from database.meta_builds_data import META_BUILDS
 
@@ -11,10 +12,8 @@ router = Router()
 
 
 @router.callback_query(F.data.startswith("meta_build:"))
-async def generate_meta_build(callback: CallbackQuery, user_service, build_service):
+async def generate_meta_build(callback: CallbackQuery, build_service, user: User):
     """Generate meta build from weapon preset."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
-    
     # Parse callback data
     parts = callback.data.split(":")
     if len(parts) != 3:
@@ -121,11 +120,10 @@ async def generate_meta_build(callback: CallbackQuery, user_service, build_servi
 
 
 @router.callback_query(F.data == "back_to_meta_list")
-async def back_to_meta_list(callback: CallbackQuery, user_service):
+async def back_to_meta_list(callback: CallbackQuery, user: User):
     """Go back to meta builds list."""
     from database.meta_builds_data import get_all_meta_builds
     
-    user = await user_service.get_or_create_user(callback.from_user.id)
     
     # Get all meta builds
     all_builds = get_all_meta_builds()
@@ -2,6 +2,7 @@
 import logging
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from database import User
 from localization import get_text
 
 logger = logging.getLogger(__name__)
@@ -10,9 +11,8 @@ router = Router()
 
 
 @router.callback_query(F.data.startswith("build_quest:"))
-async def generate_quest_build(callback: CallbackQuery, user_service, api_client):
+async def generate_quest_build(callback: CallbackQuery, api_client, user: User):
     """Generate a build for quest requirements."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     quest_id = callback.data.split(":")[1]
     
     # Show loading message
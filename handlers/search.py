@@ -3,7 +3,7 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from database import Database, BuildCategory, WeaponCategory
+from database import Database, BuildCategory, WeaponCategory, User
 from localization import get_text
 from keyboards import (
     get_weapon_selection_keyboard,
@@ -19,6 +19,27 @@ class SearchStates(StatesGroup):
     waiting_for_weapon_name = State()
 
 
+def make_progress_editor(message: Message, min_interval: float = 1.5):
+    """
+    Create a callback that edits the message with streamed build text.
+    
+    Edits are throttled to avoid Telegram flood limits; partial text is sent
+    without parse mode since streamed Markdown may be unbalanced.
+    """
+    import time
+    last_edit = 0.0
+    
+    async def on_progress(text: str):
+        nonlocal last_edit
+        now = time.monotonic()
+        if now - last_edit < min_interval:
+            return
+        last_edit = now
+        await message.edit_text(text + " ▌")
+    
+    return on_progress
+
+
 def get_category_selection_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
     """Get weapon category selection keyboard."""
     categories = [
@@ -47,10 +68,8 @@ def get_category_selection_keyboard(language: str = "ru") -> InlineKeyboardMarku
 
 
 @router.message(F.text.in_([get_text("search_weapon", "ru"), get_text("search_weapon", "en")]))
-async def start_search(message: Message, state: FSMContext, user_service):
+async def start_search(message: Message, state: FSMContext, user: User):
     """Start weapon search - show category selection."""
-    user = await user_service.get_or_create_user(message.from_user.id)
-    
     text = get_text("select_category", language=user.language)
     keyboard = get_category_selection_keyboard(user.language)
     
@@ -58,15 +77,13 @@ async def start_search(message: Message, state: FSMContext, user_service):
 
 
 @router.callback_query(F.data.startswith("category:"))
-async def show_category_weapons(callback: CallbackQuery, user_service, weapon_service):
+async def show_category_weapons(callback: CallbackQuery, weapon_service, user: User):
     """Show weapons in selected category."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     category = callback.data.split(":")[1]
     
-    # Get all weapons from service in this category
-    from database import WeaponCategory
-    category_enum = WeaponCategory(category)
-    category_weapons = await weapon_service.get_weapons_by_category(category_enum)
+    # Precomputed category view, keyboard built once per category and language until next sync
+    catalog = await weapon_service.get_catalog()
+    category_weapons = catalog.by_category(category)
     
     if not category_weapons:
         await callback.message.edit_text(get_text("no_weapons_found", language=user.language))
@@ -74,26 +91,26 @@ async def show_category_weapons(callback: CallbackQuery, user_service, weapon_se
         return
     
     text = get_text("select_weapon", language=user.language)
-    keyboard = get_weapon_selection_keyboard(category_weapons, user.language)
+    keyboard = catalog.rendered(
+        ("category_keyboard", category, user.language),
+        lambda: get_weapon_selection_keyboard(category_weapons, user.language)
+    )
     
     await callback.message.edit_text(text, reply_markup=keyboard)
     await callback.answer()
 
 
 @router.callback_query(F.data == "search_by_name")
-async def search_by_name_prompt(callback: CallbackQuery, state: FSMContext, user_service):
+async def search_by_name_prompt(callback: CallbackQuery, state: FSMContext, user: User):
     """Prompt user to enter weapon name."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
-    
     await state.set_state(SearchStates.waiting_for_weapon_name)
     await callback.message.edit_text(get_text("enter_weapon_name", language=user.language))
     await callback.answer()
 
 
 @router.message(SearchStates.waiting_for_weapon_name)
-async def process_weapon_search(message: Message, state: FSMContext, user_service, weapon_service):
+async def process_weapon_search(message: Message, state: FSMContext, weapon_service, user: User):
     """Process weapon search query - supports both Russian and English names."""
-    user = await user_service.get_or_create_user(message.from_user.id)
     query = message.text.strip()
     
     # Search for weapons using service
@@ -120,9 +137,8 @@ async def process_weapon_search(message: Message, state: FSMContext, user_servic
 
 
 @router.callback_query(F.data.startswith("weapon:"))
-async def select_weapon(callback: CallbackQuery, user_service, weapon_service):
+async def select_weapon(callback: CallbackQuery, weapon_service, user: User):
     """Handle weapon selection."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[1])
     
     weapon = await weapon_service.get_weapon_by_id(weapon_id)
@@ -175,12 +191,11 @@ async def select_weapon(callback: CallbackQuery, user_service, weapon_service):
 
 
 @router.callback_query(F.data.startswith("build:meta:"))
-async def generate_meta_build_ai(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_meta_build_ai(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate AI meta build for weapon from search (v5.3)."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -204,11 +219,12 @@ async def generate_meta_build_ai(callback: CallbackQuery, user_service, weapon_s
             "target_tier": "A",  # Meta builds should be A or S tier
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="meta_build",
             context=context,
-            user_id=user.id,
-            language=user.language
+            user_id=user.user_id,
+            language=user.language,
+            on_progress=make_progress_editor(callback.message)
         )
         
         if not build_data or not build_data.get("text"):
@@ -236,12 +252,11 @@ async def generate_meta_build_ai(callback: CallbackQuery, user_service, weapon_s
 
 
 @router.callback_query(F.data.startswith("build:random:"))
-async def generate_random_build_for_weapon(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_random_build_for_weapon(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate random AI build for selected weapon."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -253,7 +268,7 @@ async def generate_random_build_for_weapon(callback: CallbackQuery, user_service
     weapon_name = weapon.name_ru if user.language == "ru" else weapon.name_en
     
     # Select random tier
-    selected_tier = ai_gen_service._select_random_tier()
+    selected_tier = ai_generation_service._select_random_tier()
     loading_text = get_text("random_build_with_tier", user.language, tier=selected_tier)
     await callback.message.edit_text(loading_text)
     
@@ -264,11 +279,12 @@ async def generate_random_build_for_weapon(callback: CallbackQuery, user_service
             "target_tier": selected_tier,
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="random_build",
             context=context,
-            user_id=user.id,
-            language=user.language
+            user_id=user.user_id,
+            language=user.language,
+            on_progress=make_progress_editor(callback.message)
         )
         
         if not build_data or not build_data.get("text"):
@@ -294,9 +310,8 @@ async def generate_random_build_for_weapon(callback: CallbackQuery, user_service
 
 
 @router.callback_query(F.data.startswith("build:loyalty:"))
-async def start_loyalty_build_prapor(callback: CallbackQuery, user_service):
+async def start_loyalty_build_prapor(callback: CallbackQuery, user: User):
     """Start loyalty build process - select Prapor level."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
     trader_name = "Прапор" if user.language == "ru" else "Prapor"
@@ -321,9 +336,8 @@ async def start_loyalty_build_prapor(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:prapor:"))
-async def select_therapist_loyalty(callback: CallbackQuery, user_service):
+async def select_therapist_loyalty(callback: CallbackQuery, user: User):
     """Select Therapist loyalty level."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -350,9 +364,8 @@ async def select_therapist_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:therapist:"))
-async def select_fence_loyalty(callback: CallbackQuery, user_service):
+async def select_fence_loyalty(callback: CallbackQuery, user: User):
     """Select Fence loyalty level (only 1 or 4)."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -382,9 +395,8 @@ async def select_fence_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:fence:"))
-async def select_skier_loyalty(callback: CallbackQuery, user_service):
+async def select_skier_loyalty(callback: CallbackQuery, user: User):
     """Select Skier loyalty level."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -413,9 +425,8 @@ async def select_skier_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:skier:"))
-async def select_mechanic_loyalty(callback: CallbackQuery, user_service):
+async def select_mechanic_loyalty(callback: CallbackQuery, user: User):
     """Select Mechanic loyalty level."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -445,9 +456,8 @@ async def select_mechanic_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:mechanic:"))
-async def select_ragman_loyalty(callback: CallbackQuery, user_service):
+async def select_ragman_loyalty(callback: CallbackQuery, user: User):
     """Select Ragman loyalty level."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -478,9 +488,8 @@ async def select_ragman_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:ragman:"))
-async def select_jaeger_loyalty(callback: CallbackQuery, user_service):
+async def select_jaeger_loyalty(callback: CallbackQuery, user: User):
     """Select Jaeger loyalty level (can be 0 = not available)."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -513,9 +522,8 @@ async def select_jaeger_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:jaeger:"))
-async def select_ref_loyalty(callback: CallbackQuery, user_service):
+async def select_ref_loyalty(callback: CallbackQuery, user: User):
     """Select Ref loyalty level (can be 0 = not available)."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -549,9 +557,8 @@ async def select_ref_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("loyalty:ref:"))
-async def select_budget_for_loyalty_build(callback: CallbackQuery, user_service):
+async def select_budget_for_loyalty_build(callback: CallbackQuery, user: User):
     """Ask for budget after all traders selected."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[2])
     prapor_ll = int(parts[3])
@@ -601,9 +608,8 @@ async def select_budget_for_loyalty_build(callback: CallbackQuery, user_service)
 
 
 @router.callback_query(F.data.startswith("loyalty_budget:"))
-async def select_flea_market_for_loyalty(callback: CallbackQuery, user_service):
+async def select_flea_market_for_loyalty(callback: CallbackQuery, user: User):
     """Ask if user wants to use flea market."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
     prapor_ll = int(parts[2])
@@ -639,9 +645,8 @@ async def select_flea_market_for_loyalty(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("gen_loyalty_final:"))
-async def generate_loyalty_build_final(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_loyalty_build_final(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate build based on all selected trader loyalty levels, budget, and flea market."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
     prapor_ll = int(parts[2])
@@ -655,7 +660,7 @@ async def generate_loyalty_build_final(callback: CallbackQuery, user_service, we
     budget = int(parts[10])
     use_flea = bool(int(parts[11]))
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -709,10 +714,10 @@ async def generate_loyalty_build_final(callback: CallbackQuery, user_service, we
             "target_tier": "B"  # Loyalty builds typically balanced
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="custom_request",
             context=context,
-            user_id=user.id,
+            user_id=user.user_id,
             language=user.language
         )
         
@@ -739,9 +744,8 @@ async def generate_loyalty_build_final(callback: CallbackQuery, user_service, we
 
 
 @router.callback_query(F.data.startswith("build:budget:"))
-async def select_budget_for_build(callback: CallbackQuery, user_service):
+async def select_budget_for_build(callback: CallbackQuery, user: User):
     """Show budget selection menu for dynamic build."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     weapon_id = int(callback.data.split(":")[2])
     
     text = "💰 " + ("Выберите бюджет для сборки:" if user.language == "ru" else "Select budget for build:")
@@ -770,14 +774,13 @@ async def select_budget_for_build(callback: CallbackQuery, user_service):
 
 
 @router.callback_query(F.data.startswith("gen_budget:"))
-async def generate_budget_build(callback: CallbackQuery, user_service, weapon_service, ai_gen_service=None):
+async def generate_budget_build(callback: CallbackQuery, weapon_service, user: User, ai_generation_service=None):
     """Generate build based on budget."""
-    user = await user_service.get_or_create_user(callback.from_user.id)
     parts = callback.data.split(":")
     weapon_id = int(parts[1])
     budget = int(parts[2])
     
-    if not ai_gen_service:
+    if not ai_generation_service:
         await callback.answer(get_text("ai_not_available", user.language), show_alert=True)
         return
     
@@ -808,10 +811,10 @@ async def generate_budget_build(callback: CallbackQuery, user_service, weapon_se
             "target_tier": target_tier
         }
         
-        build_data = await ai_gen_service.generate_build_with_ai(
+        build_data = await ai_generation_service.generate_build_with_ai(
             intent="custom_request",
             context=context,
-            user_id=user.id,
+            user_id=user.user_id,
             language=user.language
         )
         
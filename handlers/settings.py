@@ -2,7 +2,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from database import Database
+from database import Database, User
 from localization import get_text
 from keyboards import get_settings_keyboard, get_main_menu_keyboard
 
@@ -11,10 +11,8 @@ router = Router()
 
 
 @router.message(F.text.in_([get_text("settings", "ru"), get_text("settings", "en")]))
-async def show_settings(message: Message, db: Database):
+async def show_settings(message: Message, user: User):
     """Show settings menu."""
-    user = await db.get_or_create_user(message.from_user.id)
-    
     current_lang = "🇷🇺 Русский" if user.language == "ru" else "🇬🇧 English"
     text = get_text("settings_title", language=user.language) + "\n\n"
     text += get_text("current_language", language=user.language, language_name=current_lang) + "\n\n"
@@ -70,10 +68,8 @@ async def set_language_en(message: Message, db: Database):
 
 
 @router.message(F.text.in_([get_text("back", "ru"), get_text("back", "en")]))
-async def back_to_menu(message: Message, db: Database):
+async def back_to_menu(message: Message, user: User):
     """Go back to main menu."""
-    user = await db.get_or_create_user(message.from_user.id)
-    
     text = get_text("welcome", user.language)
     keyboard = get_main_menu_keyboard(user.language)
     
@@ -127,10 +123,8 @@ async def handle_settings_language_change(callback: CallbackQuery, db: Database)
 
 
 @router.callback_query(F.data == "back_to_menu")
-async def callback_back_to_menu(callback: CallbackQuery, db: Database):
+async def callback_back_to_menu(callback: CallbackQuery, user: User):
     """Handle back to menu callback."""
-    user = await db.get_or_create_user(callback.from_user.id)
-    
     text = get_text("welcome", user.language)
     keyboard = get_main_menu_keyboard(user.language)
     
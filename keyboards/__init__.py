@@ -7,7 +7,8 @@ from .inline import (
     get_traders_keyboard,
     get_loyalty_levels_keyboard,
     get_builds_list_keyboard,
-    get_tier_selection_keyboard
+    get_tier_selection_keyboard,
+    get_admin_keyboard
 )
 
 __all__ = [
@@ -20,4 +21,5 @@ __all__ = [
     "get_loyalty_levels_keyboard",
     "get_builds_list_keyboard",
     "get_tier_selection_keyboard",
+    "get_admin_keyboard",
 ]
@@ -192,3 +192,13 @@ def get_tier_selection_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
         ]
     )
     return keyboard
+
+
+def get_admin_keyboard() -> InlineKeyboardMarkup:
+    """Get admin panel main keyboard."""
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📊 Статистика", callback_data="admin:stats")],
+        [InlineKeyboardButton(text="📢 Создать рассылку", callback_data="admin:broadcast")],
+        [InlineKeyboardButton(text="❌ Закрыть", callback_data="admin:close")]
+    ])
+    return keyboard
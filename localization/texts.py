@@ -150,12 +150,14 @@ TEXTS = {
         "community_builds_title": "👥 Сборки сообщества",
         "community_builds_desc": "Просмотр и копирование сборок других игроков",
         "no_community_builds": "❌ Пока нет публичных сборок",
+        "next_page": "Далее ▶️",
         "build_by_user": "Автор: Пользователь #{user_id}",
         "build_likes": "👍 {count}",
         "like_build": "👍 Нравится",
         "copy_build": "📋 Копировать",
         "build_copied": "✅ Сборка скопирована в ваши сохранения!",
         "build_liked": "✅ Вам понравилась эта сборка!",
+        "build_already_liked": "ℹ️ Вы уже оценили эту сборку",
         "view_details": "📝 Детали",
         "make_public": "🌐 Опубликовать",
         "make_private": "🔒 Скрыть",
@@ -262,6 +264,7 @@ TEXTS = {
         "voice_not_supported": "❌ Голосовые сообщения пока не поддерживаются.",
         "voice_processing_error": "❌ Ошибка при обработке голосового сообщения.",
         "voice_processing": "🎤 Обрабатываю голосовое сообщение...",
+        "voice_busy": "⏳ Сейчас обрабатывается слишком много голосовых сообщений. Попробуйте через минуту.",
         
         # AI Assistant (v5.1)
         "ai_not_available": "❌ AI-ассистент временно недоступен. Используйте меню для навигации.",
@@ -282,6 +285,14 @@ TEXTS = {
         "generating_meta_build": "⚙️ Генерирую мета-сборку...",
         "meta_build_button": "🤖 Сгенерировать мета-сборку",
         "random_build_with_tier": "🎲 Генерирую случайную сборку (тир: {tier})...",
+        
+        # Inline search
+        "inline_tier": "{emoji} Тир {tier}",
+        "inline_caliber": "🎯 Калибр: {value}",
+        "inline_ergonomics": "✋ Эргономика: {value}",
+        "inline_recoil": "📊 Отдача (верт./гор.): {vertical} / {horizontal}",
+        "inline_fire_rate": "⚡ Скорострельность: {value} выстр/мин",
+        "inline_flea_price": "💰 Барахолка: {price} ₽",
     },
     "en": {
         # Main menu
@@ -314,6 +325,7 @@ TEXTS = {
         "voice_not_supported": "❌ Voice messages are not supported yet.",
         "voice_processing_error": "❌ Error processing voice message.",
         "voice_processing": "🎤 Processing voice message...",
+        "voice_busy": "⏳ Too many voice messages are being processed right now. Please try again in a minute.",
         
         # AI Assistant (v5.1)
         "ai_not_available": "❌ AI assistant is temporarily unavailable. Use menu for navigation.",
@@ -334,6 +346,27 @@ TEXTS = {
         "generating_meta_build": "⚙️ Generating meta build...",
         "meta_build_button": "🤖 Generate Meta Build",
         "random_build_with_tier": "🎲 Generating random build (tier: {tier})...",
+        
+        # Community builds
+        "next_page": "Next ▶️",
+        "build_already_liked": "ℹ️ You have already liked this build",
+        
+        # Categories
+        "assault_rifle": "Assault rifle",
+        "smg": "SMG",
+        "sniper": "Sniper rifle",
+        "dmr": "DMR",
+        "shotgun": "Shotgun",
+        "pistol": "Pistol",
+        "lmg": "Machine gun",
+        
+        # Inline search
+        "inline_tier": "{emoji} Tier {tier}",
+        "inline_caliber": "🎯 Caliber: {value}",
+        "inline_ergonomics": "✋ Ergonomics: {value}",
+        "inline_recoil": "📊 Recoil (vert./hor.): {vertical} / {horizontal}",
+        "inline_fire_rate": "⚡ Fire rate: {value} rpm",
+        "inline_flea_price": "💰 Flea market: {price} ₽",
     }
 }
 
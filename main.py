@@ -12,13 +12,12 @@ from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from database import Database
+from database.fsm_storage import SQLiteStorage
 from api_clients import TarkovAPIClient
-from services import WeaponService, BuildService, UserService, SyncService, AdminService
-from services.random_build_service import RandomBuildService
-from services import CompatibilityChecker, TierEvaluator, BuildGenerator
-from services import ContextBuilder, AIGenerationService, AIAssistant
+from services import ServiceContainer
+from services import ContextBuilder, AIGenerationService, AIAssistant, BroadcastService
 from handlers import common, search, builds, loyalty, tier_list, settings, budget
-from handlers import community_builds, dynamic_builds, admin, quest_builds
+from handlers import community_builds, dynamic_builds, admin, quest_builds, inline
 
 # Load environment variables
 load_dotenv()
@@ -50,34 +49,63 @@ class BotApplication:
         # API Client (centralized)
         self.api_client = TarkovAPIClient()
         
-        # Services (business logic layer)
-        self.weapon_service = WeaponService(self.db, self.api_client)
-        self.build_service = BuildService(self.db, self.api_client)
-        self.user_service = UserService(self.db)
-        self.sync_service = SyncService(self.db, self.api_client)
-        self.random_build_service = RandomBuildService(self.api_client)
-        self.admin_service = AdminService(self.db)
-        
-        # v3.0 Services
-        self.compatibility_checker = CompatibilityChecker(self.api_client)
-        self.tier_evaluator = TierEvaluator()
-        self.build_generator = BuildGenerator(self.api_client, self.compatibility_checker, self.tier_evaluator)
+        # Services (business logic layer): one instance per process,
+        # injected into every handler by the middleware
+        self.services = ServiceContainer(self.db, self.api_client)
+        self.sync_service = self.services.sync_service
+        self.build_generator = self.services.build_generator
         
         # News Service
         from services import NewsService
         self.news_service = NewsService()
+        self.services.register("news_service", self.news_service)
         
         # v5.1 AI Services
         ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         ollama_model = os.getenv("OLLAMA_MODEL", "qwen3:8b")
+        structured_output = os.getenv("OLLAMA_STRUCTURED_OUTPUT", "1").lower() not in ("0", "false", "no")
+        hybrid_generation = os.getenv("OLLAMA_HYBRID_BUILDS", "1").lower() not in ("0", "false", "no")
         self.context_builder = ContextBuilder(self.api_client, self.db)
-        self.ai_generation_service = AIGenerationService(self.api_client, self.db, ollama_url, ollama_model)
-        self.ai_assistant = AIAssistant(self.api_client, self.db, self.ai_generation_service, self.news_service)
+        self.ai_generation_service = AIGenerationService(
+            self.api_client, self.db, ollama_url, ollama_model, structured_output,
+            build_generator=self.build_generator,
+            hybrid_generation=hybrid_generation
+        )
+        
+        # Voice transcription worker pool (model preloaded in setup)
+        from utils.voice_transcriber import VoiceTranscriber
+        from utils.constants import VOICE_CACHE_TTL_HOURS
+        self.voice_transcriber = VoiceTranscriber(
+            model_size=os.getenv("WHISPER_MODEL", "tiny"),
+            workers=int(os.getenv("WHISPER_WORKERS", "1")),
+            max_queue=int(os.getenv("WHISPER_QUEUE_SIZE", "4")),
+            vad_filter=os.getenv("WHISPER_VAD", "1").lower() not in ("0", "false", "no"),
+            cache_ttl_seconds=VOICE_CACHE_TTL_HOURS * 60 * 60
+        )
+        self.ai_assistant = AIAssistant(
+            self.api_client, self.db, self.ai_generation_service, self.news_service,
+            voice_transcriber=self.voice_transcriber
+        )
+        self.services.register("context_builder", self.context_builder)
+        self.services.register("ai_generation_service", self.ai_generation_service)
+        self.services.register("ai_assistant", self.ai_assistant)
         
         # Bot and Dispatcher
         self.bot = Bot(token=self.bot_token)
-        self.storage = MemoryStorage()
+        # FSM storage: SQLite keeps in-progress flows across restarts
+        if os.getenv("FSM_STORAGE", "sqlite").lower() == "memory":
+            self.storage = MemoryStorage()
+        else:
+            self.storage = SQLiteStorage(
+                "data/eft_helper.db",
+                ttl_seconds=int(os.getenv("FSM_STATE_TTL_HOURS", "24")) * 60 * 60
+            )
         self.dp = Dispatcher(storage=self.storage)
+        self.services.fsm_storage = self.storage
+        
+        # Background broadcast engine (needs the bot instance)
+        self.broadcast_service = BroadcastService(self.bot, self.db)
+        self.services.register("broadcast_service", self.broadcast_service)
     
     async def setup(self):
         """Initialize database and prepare bot."""
@@ -85,6 +113,15 @@ class BotApplication:
         await self.db.init_db()
         logger.info("Database initialized successfully")
         
+        # Удаляем голосовые файлы, оставшиеся после прошлого запуска
+        from utils.constants import VOICE_TEMP_DIR
+        from utils.voice_transcriber import cleanup_temp_dir
+        cleanup_temp_dir(VOICE_TEMP_DIR, max_age_seconds=0)
+        
+        # Загружаем модель Whisper заранее, чтобы первое голосовое не ждало загрузки
+        if await self.voice_transcriber.preload():
+            logger.info("🎤 Whisper model ready")
+        
         # Автоматическое обновление цен при запуске
         await self.update_prices_on_startup()
     
@@ -101,6 +138,7 @@ class BotApplication:
         self.dp.include_router(tier_list.router)
         self.dp.include_router(settings.router)
         self.dp.include_router(admin.router)  # Admin panel
+        self.dp.include_router(inline.router)  # Inline weapon search
         
         logger.info("Handlers registered")
     
@@ -108,26 +146,25 @@ class BotApplication:
         """Register middleware to inject dependencies."""
         @self.dp.update.outer_middleware()
         async def inject_services(handler, event, data):
-            """Inject services into handlers."""
-            data["db"] = self.db
-            data["weapon_service"] = self.weapon_service
-            data["build_service"] = self.build_service
-            data["user_service"] = self.user_service
-            data["api_client"] = self.api_client
-            data["random_build_service"] = self.random_build_service
-            data["admin_service"] = self.admin_service
-            # v3.0 services
-            data["compatibility_checker"] = self.compatibility_checker
-            data["tier_evaluator"] = self.tier_evaluator
-            data["build_generator"] = self.build_generator
-            # v5.1 AI services
-            data["ai_assistant"] = self.ai_assistant
-            data["ai_generation_service"] = self.ai_generation_service
-            data["context_builder"] = self.context_builder
-            # News service
-            data["news_service"] = self.news_service
+            """Inject shared services into handlers."""
+            data.update(self.services.handler_data)
             return await handler(event, data)
         
+        # Tracing and handler latency first, so they cover the other inner middlewares
+        self.dp.message.middleware(self.services.trace_handler)
+        self.dp.callback_query.middleware(self.services.trace_handler)
+        self.dp.inline_query.middleware(self.services.trace_handler)
+        self.dp.message.middleware(self.services.measure_handler)
+        self.dp.callback_query.middleware(self.services.measure_handler)
+        self.dp.inline_query.middleware(self.services.measure_handler)
+        # Per-update user context for handlers that take `user`
+        self.dp.message.middleware(self.services.inject_user)
+        self.dp.callback_query.middleware(self.services.inject_user)
+        # Daily activity for DAU/WAU (batched writes)
+        self.dp.message.middleware(self.services.track_activity)
+        self.dp.callback_query.middleware(self.services.track_activity)
+        self.dp.inline_query.middleware(self.services.track_activity)
+        
         @self.dp.error()
         async def error_handler(event, exception):
             """Global error handler."""
@@ -200,6 +237,25 @@ class BotApplication:
         # Запускаем фоновую задачу обновления цен
         price_task = asyncio.create_task(self.price_update_task())
         
+        # Лайки сборок записываются в БД пакетами
+        self.services.start_background_tasks()
+        
+        # Метрики Prometheus (METRICS_PORT=0 отключает)
+        metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+        if metrics_port:
+            await self.services.start_metrics(os.getenv("METRICS_HOST", "127.0.0.1"), metrics_port)
+        
+        # Медленные обновления пишутся деревом спанов в JSONL (TRACE_SLOW_MS=0 отключает)
+        trace_slow_ms = int(os.getenv("TRACE_SLOW_MS", "5000"))
+        if trace_slow_ms:
+            self.services.enable_tracing(os.getenv("TRACE_FILE", "logs/slow_traces.jsonl"), trace_slow_ms / 1000)
+        
+        # Новости обновляются в фоне, обработчики читают их из памяти
+        self.news_service.start_background_refresh()
+        
+        # Продолжаем рассылки, прерванные перезапуском
+        await self.broadcast_service.resume_unfinished()
+        
         try:
             await self.dp.start_polling(
                 self.bot,
@@ -217,8 +273,11 @@ class BotApplication:
     async def cleanup(self):
         """Cleanup resources."""
         logger.info("Shutting down bot...")
+        self.broadcast_service.cancel_all()
         await self.bot.session.close()
-        await self.api_client.close()
+        await self.services.close()
+        await self.news_service.close()
+        self.voice_transcriber.shutdown()
         logger.info("Bot stopped")
 
 
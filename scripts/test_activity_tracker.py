@@ -0,0 +1,164 @@
+"""Regression test: activity log flush, daily rollup and raw event pruning.
+
+Flushed events must land in activity_events once with one
+user_activity_days row per user and day, and a failed flush must keep
+its batch. Rollups must aggregate events and distinct users per day and
+event type, recount only days that may still change (also after a
+restart) and prune raw events older than the retention while keeping
+their aggregates. Runs offline.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from benchmarks.harness import prepare_database
+from database import Database
+from services.activity_tracker import ActivityTracker, SECONDS_PER_DAY, day_number
+
+RETENTION_DAYS = 30
+
+
+async def fetch_all(db: Database, query: str, params: tuple = ()) -> list:
+    async with aiosqlite.connect(db.db_path) as conn:
+        async with conn.execute(query, params) as cursor:
+            return await cursor.fetchall()
+
+
+async def daily(db: Database) -> dict:
+    """{(day, event name): (events, users)} from activity_daily_events."""
+    rows = await fetch_all(
+        db,
+        """SELECT d.day, t.name, d.events, d.users FROM activity_daily_events d
+           JOIN activity_event_types t ON t.id = d.event_id"""
+    )
+    return {(day, name): (events, users) for day, name, events, users in rows}
+
+
+def at_day(day: int) -> int:
+    """Timestamp at noon of a day."""
+    return day * SECONDS_PER_DAY + SECONDS_PER_DAY // 2
+
+
+async def test():
+    """Flush, fail a flush, roll up, prune and roll up again after a restart."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "test.db"))
+        await prepare_database(db.db_path)
+        today = day_number()
+
+        print("=" * 70)
+        print("Журнал активности: запись, агрегация и очистка")
+        print("=" * 70)
+        failed = False
+
+        tracker = ActivityTracker(db, raw_retention_days=RETENTION_DAYS)
+        tracker.record(1, "start")
+        tracker.record(1, "start")
+        tracker.record(2, "search")
+        written = await tracker.flush()
+        tracker.record(1, "search")
+        written += await tracker.flush()
+        events = await fetch_all(db, "SELECT COUNT(*) FROM activity_events")
+        days = await fetch_all(db, "SELECT day, user_id FROM user_activity_days ORDER BY user_id")
+        ok = (
+            written == 4
+            and events == [(4,)]
+            and days == [(today, 1), (today, 2)]
+            and tracker.get_stats() == {"pending": 0, "active_today": 2, "events_written": 4}
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} События записаны, один день активности на пользователя: {days}")
+
+        # A failed write keeps the batch for the next flush
+        original_resolve = tracker._resolve_event_ids
+
+        async def failing_resolve(conn, names):
+            raise aiosqlite.OperationalError("database is locked")
+
+        tracker.record(3, "start")
+        tracker._resolve_event_ids = failing_resolve
+        try:
+            await tracker.flush()
+            flush_failed = False
+        except aiosqlite.OperationalError:
+            flush_failed = True
+        tracker._resolve_event_ids = original_resolve
+        pending = tracker.get_stats()["pending"]
+        written = await tracker.flush()
+        ok = (
+            flush_failed and pending == 1 and written == 1
+            and await fetch_all(db, "SELECT COUNT(*) FROM activity_events") == [(5,)]
+            and await fetch_all(db, "SELECT COUNT(*) FROM user_activity_days WHERE day = ?", (today,)) == [(3,)]
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Неудачная запись сохранила пакет и записала его повторно")
+
+        # Older days: one past the retention, one within it
+        old_day = today - RETENTION_DAYS - 5
+        recent_day = today - 2
+        tracker._events.extend([
+            (at_day(old_day), 1, "start"),
+            (at_day(old_day), 2, "start"),
+            (at_day(recent_day), 1, "search"),
+            (at_day(recent_day), 1, "search"),
+            (at_day(recent_day), 4, "search"),
+        ])
+        await tracker.flush()
+        await tracker.rollup()
+        aggregates = await daily(db)
+        ok = (
+            aggregates[(old_day, "start")] == (2, 2)
+            and aggregates[(recent_day, "search")] == (3, 2)
+            and aggregates[(today, "start")] == (3, 2)
+            and aggregates[(today, "search")] == (2, 2)
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Агрегаты по дням: события и уникальные пользователи")
+
+        raw_days = await fetch_all(db, "SELECT DISTINCT ts / ? FROM activity_events ORDER BY 1", (SECONDS_PER_DAY,))
+        ok = raw_days == [(recent_day,), (today,)] and (old_day, "start") in aggregates
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Старые сырые события удалены, их агрегаты сохранены")
+
+        # Only today is recounted; earlier aggregates stay as they are
+        tracker.record(5, "start")
+        await tracker.flush()
+        await tracker.rollup()
+        aggregates = await daily(db)
+        ok = (
+            aggregates[(today, "start")] == (4, 3)
+            and aggregates[(recent_day, "search")] == (3, 2)
+            and aggregates[(old_day, "start")] == (2, 2)
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Повторная агрегация обновила сегодняшний день без дублей")
+
+        # Restart: the new tracker resumes the rollup from the last aggregated day
+        restarted = ActivityTracker(db, raw_retention_days=RETENTION_DAYS)
+        restarted.record(6, "search")
+        await restarted.close()
+        await restarted.rollup()
+        aggregates = await daily(db)
+        ok = (
+            aggregates[(today, "search")] == (3, 3)
+            and aggregates[(today, "start")] == (4, 3)
+            and aggregates[(recent_day, "search")] == (3, 2)
+            and aggregates[(old_day, "start")] == (2, 2)
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} После перезапуска агрегация продолжена с последнего дня")
+
+    print("=" * 70)
+    if failed:
+        print("❌ Журнал активности работает неверно")
+        sys.exit(1)
+    print("✅ Журнал активности записывает, агрегирует и очищает события корректно")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,120 @@
+"""Regression test: AI build buttons reach AIGenerationService.
+
+Handlers get services by argument name, so a parameter that doesn't
+match a name in ServiceContainer.handler_data silently stays at its
+default (None) and the handler answers "AI not available". Each handler
+is called the way aiogram calls it (only arguments named in its
+signature are passed) with a fake AI generation service registered
+under the name the entrypoints use. Runs offline.
+"""
+import asyncio
+import inspect
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from database import Database
+from handlers import budget, builds, loyalty, loyalty_selection, search
+from services import ServiceContainer
+from scripts.migrate_add_tarkov_ids import migrate_database
+
+LOYALTY = "1:1:1:1:1:1:1:1"
+
+
+class FakeAIGenerationService:
+    """Records generate_build_with_ai calls instead of calling Ollama."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _select_random_tier(self) -> str:
+        return "A"
+
+    async def generate_build_with_ai(self, intent, context, user_id, language="ru", on_progress=None):
+        self.calls.append(intent)
+        return {"text": "Build", "tier": "A"}
+
+
+class FakeMessage:
+    """Minimal stand-in for aiogram Message/CallbackQuery."""
+
+    def __init__(self, text: str = "", data: str = ""):
+        self.text = text
+        self.data = data
+        self.from_user = SimpleNamespace(id=1)
+        self.message = self
+
+    async def answer(self, *args, **kwargs):
+        return self
+
+    async def edit_text(self, *args, **kwargs):
+        return self
+
+
+async def call_handler(handler, event, data: dict):
+    """Call a handler with the handler data its signature asks for (as aiogram does)."""
+    params = inspect.signature(handler).parameters
+    kwargs = {name: value for name, value in data.items() if name in params}
+    first = next(iter(params))
+    return await handler(**{first: event}, **kwargs)
+
+
+async def test():
+    """Press every AI build button once and check the AI service was called."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "test.db"))
+        await db.init_db()
+        migrate_database(db.db_path)
+        async with aiosqlite.connect(db.db_path) as conn:
+            cursor = await conn.execute(
+                "INSERT INTO weapons (name_ru, name_en, category, base_price, tarkov_id) VALUES (?, ?, ?, ?, ?)",
+                ("АК-74М", "AK-74M", "assault_rifle", 40000, "weapon-1")
+            )
+            weapon_id = cursor.lastrowid
+            await conn.commit()
+
+        services = ServiceContainer(db)
+        ai_generation_service = FakeAIGenerationService()
+        services.register("ai_generation_service", ai_generation_service)
+        user = await services.user_service.get_or_create_user(1)
+        data = dict(services.handler_data, user=user)
+
+        cases = [
+            (builds.show_random_build, FakeMessage(text="random")),
+            (search.generate_meta_build_ai, FakeMessage(data=f"build:meta:{weapon_id}")),
+            (search.generate_random_build_for_weapon, FakeMessage(data=f"build:random:{weapon_id}")),
+            (search.generate_loyalty_build_final, FakeMessage(data=f"gen_loyalty_final:{weapon_id}:{LOYALTY}:500000:1")),
+            (search.generate_budget_build, FakeMessage(data=f"gen_budget:{weapon_id}:500000")),
+            (budget.generate_budget_build_from_menu, FakeMessage(data="gen_budget_menu:any:500000")),
+            (loyalty_selection.generate_full_loyalty_build, FakeMessage(data=f"gen_loyalty_full:{weapon_id}:prapor-2:500000:yes")),
+            (loyalty.generate_loyalty_build_from_menu, FakeMessage(data=f"gen_loyalty_menu_final:any:{LOYALTY}:500000:1")),
+        ]
+
+        print("=" * 70)
+        print("Вызовы AIGenerationService из обработчиков")
+        print("=" * 70)
+
+        failed = False
+        for handler, event in cases:
+            before = len(ai_generation_service.calls)
+            await call_handler(handler, event, data)
+            ok = len(ai_generation_service.calls) > before
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} {handler.__module__}.{handler.__name__}")
+
+        await services.close()
+
+    print("=" * 70)
+    if failed:
+        print("❌ Обработчик не получил ai_generation_service")
+        sys.exit(1)
+    print("✅ Все AI-кнопки доходят до generate_build_with_ai")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,168 @@
+"""Regression test: broadcasts resume from checkpoint and back off on RetryAfter.
+
+A broadcast is interrupted mid-way (as on shutdown) and resumed by a new
+BroadcastService, as after a restart: recipients before the checkpoint
+must not get the message again, everyone after it must get it once.
+Telegram's RetryAfter must pause the token bucket without a burst when
+the pause ends, and the user it happened to still gets the message.
+Runs offline with a fake bot.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from benchmarks.harness import prepare_database
+from database import Database
+from services.broadcast_service import BroadcastService, TokenBucket
+
+USERS = 30
+CHUNK_SIZE = 10
+BLOCKED_USER = 5
+# First bot hangs on this user, so the job is interrupted inside the second chunk
+HANG_USER = 15
+RETRY_USER = 22
+
+
+class FakeBot:
+    """Records sends; can hang on one user or answer RetryAfter once."""
+
+    def __init__(self, hang_user: int = None, retry_user: int = None):
+        self.sent = []
+        self.hang_user = hang_user
+        self.retry_user = retry_user
+        self.retried = False
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id == self.hang_user:
+            await asyncio.Event().wait()
+        if chat_id == BLOCKED_USER:
+            raise TelegramForbiddenError(method, "bot was blocked by the user")
+        if chat_id == self.retry_user and not self.retried:
+            self.retried = True
+            raise TelegramRetryAfter(method, "Too Many Requests", 1)
+        self.sent.append(chat_id)
+
+    async def edit_message_text(self, *args, **kwargs):
+        pass
+
+
+async def job_row(db: Database, job_id: int) -> tuple:
+    async with aiosqlite.connect(db.db_path) as conn:
+        async with conn.execute(
+            "SELECT status, last_user_id, sent_count, blocked_count FROM broadcasts WHERE id = ?", (job_id,)
+        ) as cursor:
+            return await cursor.fetchone()
+
+
+async def _checkpoint_reached(db: Database, job_id: int) -> bool:
+    return (await job_row(db, job_id))[1] >= CHUNK_SIZE
+
+
+async def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not await condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+async def check_bucket_pause() -> bool:
+    """Tokens after a pause come at the normal rate, not as a full-capacity burst."""
+    bucket = TokenBucket(rate=10)
+    for _ in range(bucket.capacity):
+        await bucket.acquire()
+    bucket.pause(1.0)
+    start = time.monotonic()
+    for _ in range(bucket.capacity):
+        await bucket.acquire()
+    # 1 s pause + 10 tokens at 10/s; a burst would finish right after the pause
+    return time.monotonic() - start >= 1.8
+
+
+async def test():
+    """Interrupt a broadcast, resume it and check who got the message."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "test.db"))
+        await prepare_database(db.db_path)
+        async with aiosqlite.connect(db.db_path) as conn:
+            await conn.executemany(
+                "INSERT INTO users (user_id, language) VALUES (?, 'ru')",
+                [(user_id,) for user_id in range(1, USERS + 1)]
+            )
+            await conn.commit()
+
+        print("=" * 70)
+        print("Рассылка: продолжение с чекпоинта и RetryAfter")
+        print("=" * 70)
+        failed = False
+
+        # First run: interrupted while the second chunk is being sent
+        first_bot = FakeBot(hang_user=HANG_USER)
+        first = BroadcastService(first_bot, db, rate=1000)
+        first.CHUNK_SIZE = CHUNK_SIZE
+        job_id = await first.create_job("all", "Привет", None, None, admin_chat_id=1, progress_message_id=1)
+        first.start(job_id)
+        await wait_for(lambda: _checkpoint_reached(db, job_id))
+        task = BroadcastService._active_jobs[job_id]
+        first.cancel_all()
+        await asyncio.gather(task, return_exceptions=True)
+
+        status, last_user_id, _, _ = await job_row(db, job_id)
+        ok = status == "running" and last_user_id == CHUNK_SIZE
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Прерванная рассылка осталась 'running' с чекпоинтом {last_user_id}")
+
+        # Restart: a new service resumes the job
+        second_bot = FakeBot(retry_user=RETRY_USER)
+        second = BroadcastService(second_bot, db, rate=1000)
+        second.CHUNK_SIZE = CHUNK_SIZE
+        resumed = await second.resume_unfinished()
+        await asyncio.gather(*BroadcastService._active_jobs.values())
+
+        expected = [u for u in range(CHUNK_SIZE + 1, USERS + 1)]
+        ok = resumed == 1 and sorted(second_bot.sent) == expected
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} После рестарта отправлено только после чекпоинта, по одному разу")
+
+        ok = second_bot.retried and RETRY_USER in second_bot.sent
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} После RetryAfter сообщение доставлено повторной попыткой")
+
+        status, _, sent_count, blocked_count = await job_row(db, job_id)
+        # Sends of the interrupted chunk were never checkpointed, so they don't count
+        ok = status == "done" and blocked_count == 1 and sent_count == CHUNK_SIZE - 1 + len(second_bot.sent)
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Задание завершено, счётчики сохранены (отправлено {sent_count})")
+
+        # Users who blocked the bot are skipped by the next broadcast
+        third_bot = FakeBot()
+        third = BroadcastService(third_bot, db, rate=1000)
+        next_job = await third.create_job("all", "Ещё раз", None, None, admin_chat_id=1, progress_message_id=1)
+        third.start(next_job)
+        await asyncio.gather(*BroadcastService._active_jobs.values())
+        ok = BLOCKED_USER not in third_bot.sent and len(third_bot.sent) == USERS - 1
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Заблокировавшие бота пропускаются в следующей рассылке")
+
+        ok = await check_bucket_pause()
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} После паузы токены выдаются с обычной скоростью, без всплеска")
+
+    print("=" * 70)
+    if failed:
+        print("❌ Рассылка работает неверно")
+        sys.exit(1)
+    print("✅ Рассылка продолжается с чекпоинта и соблюдает RetryAfter")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,129 @@
+"""Benchmark: batched build details loader vs per-build queries (100 builds).
+
+Seeds a temporary database with 100 meta builds, then loads their weapon
+and modules the old way (two queries per build) and with
+BuildService.load_details() (one query per table). Checks that both
+return the same data and prints query counts and timings. Runs offline.
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from database import Database
+from services import BuildService
+from scripts.migrate_add_tarkov_ids import migrate_database
+
+BUILDS = 100
+WEAPONS = 30
+MODULES = 400
+MODULES_PER_BUILD = 10
+ROUNDS = 5
+
+TRADERS = ["Prapor", "Therapist", "Skier", "Peacekeeper", "Mechanic", "Ragman", "Jaeger"]
+
+
+class CountingDatabase(Database):
+    """Database that counts weapon/module lookups."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.queries = 0
+
+    async def get_weapon_by_id(self, weapon_id):
+        self.queries += 1
+        return await super().get_weapon_by_id(weapon_id)
+
+    async def get_weapons_by_ids(self, weapon_ids):
+        self.queries += 1
+        return await super().get_weapons_by_ids(weapon_ids)
+
+    async def get_modules_by_ids(self, module_ids):
+        self.queries += 1
+        return await super().get_modules_by_ids(module_ids)
+
+
+async def seed(db: Database):
+    """Insert weapons, modules and meta builds."""
+    rng = random.Random(42)
+    migrate_database(db.db_path)
+
+    async with aiosqlite.connect(db.db_path) as conn:
+        for i in range(1, WEAPONS + 1):
+            await conn.execute(
+                "INSERT INTO weapons (name_ru, name_en, category, base_price, caliber, ergonomics) VALUES (?, ?, ?, ?, ?, ?)",
+                (f"Оружие {i}", f"Weapon {i}", "assault_rifle", 30000 + i * 1000, "5.45x39", 40 + i % 20)
+            )
+        for i in range(1, MODULES + 1):
+            await conn.execute(
+                "INSERT INTO modules (name_ru, name_en, price, trader, loyalty_level, slot_type) VALUES (?, ?, ?, ?, ?, ?)",
+                (f"Модуль {i}", f"Module {i}", 1000 + i * 10, rng.choice(TRADERS), rng.randint(1, 4), "mod_stock")
+            )
+        for i in range(BUILDS):
+            modules = rng.sample(range(1, MODULES + 1), MODULES_PER_BUILD)
+            await conn.execute(
+                "INSERT INTO builds (weapon_id, category, name_ru, name_en, total_cost, min_loyalty_level, modules) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rng.randint(1, WEAPONS), "meta", f"Сборка {i}", f"Build {i}", 100000, 1, json.dumps(modules))
+            )
+        await conn.commit()
+
+
+async def load_per_build(db: Database, builds):
+    """Old approach: two queries per build."""
+    result = []
+    for build in builds:
+        weapon = await db.get_weapon_by_id(build.weapon_id)
+        modules = await db.get_modules_by_ids(build.modules)
+        result.append({"build": build, "weapon": weapon, "modules": modules})
+    return result
+
+
+async def measure(db: CountingDatabase, load) -> tuple:
+    """Run loader ROUNDS times, return (result, queries per run, ms per run)."""
+    db.queries = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = await load()
+    elapsed = time.perf_counter() - start
+    return result, db.queries // ROUNDS, elapsed / ROUNDS * 1000
+
+
+async def test():
+    """Compare per-build and batched loading."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = CountingDatabase(os.path.join(tmp_dir, "bench.db"))
+        await db.init_db()
+        await seed(db)
+
+        service = BuildService(db, None)
+        builds = await db.get_meta_builds()
+
+        naive, naive_queries, naive_ms = await measure(db, lambda: load_per_build(db, builds))
+        batched, batched_queries, batched_ms = await measure(db, lambda: service.load_details(builds))
+
+    print("=" * 70)
+    print(f"Загрузка деталей {len(builds)} сборок ({MODULES_PER_BUILD} модулей в каждой)")
+    print("=" * 70)
+    print(f"  по одной сборке: {naive_queries:4d} запросов, {naive_ms:8.1f} мс")
+    print(f"  пакетно:         {batched_queries:4d} запросов, {batched_ms:8.1f} мс")
+    print(f"  ускорение:       x{naive_ms / batched_ms:.1f}")
+    print("=" * 70)
+
+    if naive != batched:
+        print("❌ Пакетный загрузчик вернул другие данные")
+        sys.exit(1)
+    if batched_queries != 2:
+        print(f"❌ Ожидалось 2 запроса, выполнено {batched_queries}")
+        sys.exit(1)
+    print("✅ Данные совпадают, 2 запроса вместо 2N")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,124 @@
+"""Micro-benchmark: build card render time (compiled template vs render cache).
+
+Measures a fresh render through the compiled per-language template, a
+render cache hit, and load_build_card() against a real SQLite database
+with a cold and a warm cache. Runs offline.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Build, BuildCategory, Database, Module, TierRating, Weapon, WeaponCategory
+from utils.card_renderer import BuildCardCache, build_card_cache, get_card_template
+from utils.formatters import load_build_card
+
+ITERATIONS = 20000
+
+WEAPON = Weapon(
+    id=1, name_ru="Автомат Калашникова АК-74М", name_en="Kalashnikov AK-74M",
+    category=WeaponCategory.ASSAULT_RIFLE, tier_rating=TierRating("A"),
+    base_price=40000, flea_price=45000, caliber="5.45x39", ergonomics=44,
+    recoil_vertical=120, recoil_horizontal=300, fire_rate=650, effective_range=500,
+)
+
+TRADERS = ["Prapor", "Mechanic", "Skier", "Peacekeeper"]
+MODULES = [
+    Module(
+        id=i, name_ru=f"Модуль {i}", name_en=f"Module {i}", price=1000 * i,
+        trader=TRADERS[i % len(TRADERS)], loyalty_level=1 + i % 4,
+        slot_type="mod_stock", flea_price=1200 * i if i % 2 else None,
+    )
+    for i in range(1, 13)
+]
+
+BUILD = Build(
+    id=1, weapon_id=1, category=BuildCategory.META, name_ru="Мета сборка", name_en="Meta build",
+    total_cost=250000, min_loyalty_level=3, modules=[m.id for m in MODULES],
+)
+
+
+def bench(name: str, func, iterations: int = ITERATIONS):
+    """Run func iterations times and print mean time per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<40} {elapsed / iterations * 1e6:8.2f} мкс/вызов")
+
+
+async def abench(name: str, coro_factory, iterations: int):
+    """Async variant of bench()."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<40} {elapsed / iterations * 1e6:8.2f} мкс/вызов")
+
+
+async def seed(db: Database) -> Build:
+    """Insert benchmark weapon, modules and build into database."""
+    import aiosqlite
+    from scripts.migrate_add_tarkov_ids import migrate_database
+
+    migrate_database(db.db_path)
+    async with aiosqlite.connect(db.db_path) as conn:
+        cursor = await conn.execute(
+            "INSERT INTO weapons (name_ru, name_en, category, base_price, caliber, ergonomics) VALUES (?, ?, ?, ?, ?, ?)",
+            (WEAPON.name_ru, WEAPON.name_en, WEAPON.category.value, WEAPON.base_price, WEAPON.caliber, WEAPON.ergonomics)
+        )
+        weapon_id = cursor.lastrowid
+        module_ids = []
+        for module in MODULES:
+            cursor = await conn.execute(
+                "INSERT INTO modules (name_ru, name_en, price, trader, loyalty_level, slot_type) VALUES (?, ?, ?, ?, ?, ?)",
+                (module.name_ru, module.name_en, module.price, module.trader, module.loyalty_level, module.slot_type)
+            )
+            module_ids.append(cursor.lastrowid)
+        await conn.commit()
+
+    return Build(
+        id=1000, weapon_id=weapon_id, category=BuildCategory.META,
+        total_cost=BUILD.total_cost, min_loyalty_level=BUILD.min_loyalty_level, modules=module_ids,
+    )
+
+
+async def test():
+    """Measure card render time."""
+    print("=" * 70)
+    print(f"Рендер карточки сборки ({len(MODULES)} модулей)")
+    print("=" * 70)
+
+    for language in ("ru", "en"):
+        template = get_card_template(language)
+        cache = BuildCardCache()
+        cache.render(BUILD, WEAPON, MODULES, language)
+
+        print(f"\n[{language}]")
+        bench("шаблон, рендер без кэша", lambda: template.render(BUILD, WEAPON, MODULES))
+        bench("кэш рендера, попадание", lambda: cache.render(BUILD, WEAPON, MODULES, language))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        await db.init_db()
+        build = await seed(db)
+
+        async def cold():
+            build_card_cache.bump_price_version()
+            return await load_build_card(db, build, "ru")
+
+        print("\n[load_build_card + SQLite]")
+        await abench("холодный кэш (оружие + модули из БД)", cold, 200)
+        await load_build_card(db, build, "ru")
+        await abench("тёплый кэш (без запросов к БД)", lambda: load_build_card(db, build, "ru"), ITERATIONS)
+
+    stats = build_card_cache.get_stats()
+    print("\n" + "=" * 70)
+    print(f"✅ Кэш карточек: {stats['entries']} записей, версия цен {stats['price_version']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
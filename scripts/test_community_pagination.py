@@ -0,0 +1,160 @@
+"""Regression test and benchmark: community builds pagination.
+
+Seeds a temporary database with public builds, walks all pages through
+Database.get_public_builds() (cached top ranking + keyset pages) and
+compares them with a full ORDER BY over the table. Then adds likes and
+checks the cached ranking stays in sync, and that a page cursor still
+works after its build is hidden. Prints first/deep page timings
+for keyset pagination vs the old LIMIT/OFFSET query. Runs offline.
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from database import Database
+from database.leaderboard import rank_key
+
+BUILDS = 20000
+PAGE_SIZE = 20
+ROUNDS = 50
+
+
+async def seed(db: Database):
+    """Insert weapons and public/private user builds."""
+    rng = random.Random(7)
+    async with aiosqlite.connect(db.db_path) as conn:
+        for i in range(1, 51):
+            await conn.execute(
+                "INSERT INTO weapons (name_ru, name_en, category) VALUES (?, ?, ?)",
+                (f"Оружие {i}", f"Weapon {i}", "assault_rifle")
+            )
+        await conn.executemany(
+            """INSERT INTO user_builds (user_id, weapon_id, name, modules, total_cost, tier_rating,
+               is_public, created_at, likes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    rng.randint(1, 1000), rng.randint(1, 50), f"Build {i}", json.dumps([]), 100000,
+                    rng.choice("SABCD"), int(rng.random() < 0.8),
+                    f"2024-01-{rng.randint(1, 28):02d} 12:00:00", int(rng.expovariate(0.2)),
+                )
+                for i in range(BUILDS)
+            ]
+        )
+        await conn.commit()
+
+
+async def expected_order(db: Database) -> list:
+    """IDs of all public builds in ranking order (full sort)."""
+    async with aiosqlite.connect(db.db_path) as conn:
+        async with conn.execute(
+            "SELECT id FROM user_builds WHERE is_public = 1 ORDER BY likes DESC, created_at DESC, id DESC"
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+async def walk_pages(db: Database) -> list:
+    """IDs of all public builds, page by page."""
+    ids = []
+    after = None
+    while True:
+        page = await db.get_public_builds(limit=PAGE_SIZE, after=after)
+        if not page:
+            return ids
+        assert all(build.weapon_name_en for build in page), "weapon names must be joined"
+        ids.extend(build.id for build in page)
+        after = rank_key(page[-1])
+
+
+async def offset_page(db: Database, offset: int):
+    """Old query: full sort with linear OFFSET skip."""
+    async with aiosqlite.connect(db.db_path) as conn:
+        async with conn.execute(
+            """SELECT id, user_id, weapon_id, name, modules, total_cost, tier_rating,
+               ergonomics, recoil_vertical, recoil_horizontal, is_public,
+               created_at, likes FROM user_builds
+               WHERE is_public = 1 ORDER BY likes DESC, created_at DESC LIMIT ? OFFSET ?""",
+            (PAGE_SIZE, offset)
+        ) as cursor:
+            return await cursor.fetchall()
+
+
+async def timed(coro_factory) -> float:
+    """Mean time of ROUNDS awaits in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await coro_factory()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+async def test():
+    """Check pagination order and measure page latency."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        await db.init_db()
+        await seed(db)
+
+        print("=" * 70)
+        print(f"Пагинация сборок сообщества ({BUILDS} сборок, страница {PAGE_SIZE})")
+        print("=" * 70)
+
+        failed = False
+        expected = await expected_order(db)
+        ok = await walk_pages(db) == expected
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Все страницы совпадают с полной сортировкой ({len(expected)} сборок)")
+
+        # Likes: cached builds move in place, outside builds may enter the top
+        rng = random.Random(11)
+        for build_id in rng.sample(expected, 200) + expected[:20] + expected[-5:] * 30:
+            await db.increment_build_likes(build_id)
+        ranking = await db.get_public_builds(limit=db.community_top.size)
+        ok = [b.id for b in ranking] == (await expected_order(db))[:db.community_top.size]
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Кэшированный топ совпадает с БД после лайков")
+
+        # Cursor build liked or made private between pages: the next page stays the same
+        for position in (PAGE_SIZE, db.community_top.size + 3 * PAGE_SIZE):
+            cursor_build = (await db.get_public_builds(limit=position))[-1]
+            cursor = rank_key(cursor_build)
+            before = [b.id for b in await db.get_public_builds(limit=PAGE_SIZE, after=cursor)]
+            await db.update_user_build_visibility(cursor_build.id, False)
+            after_hidden = [b.id for b in await db.get_public_builds(limit=PAGE_SIZE, after=cursor)]
+            await db.update_user_build_visibility(cursor_build.id, True)
+            ok = before == after_hidden and len(before) == PAGE_SIZE
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} Курсор после {position} сборок не зависит от скрытой сборки")
+
+        # Deep page cursor: last build of the page before the last one
+        all_ids = await expected_order(db)
+        deep_offset = (len(all_ids) // PAGE_SIZE - 1) * PAGE_SIZE
+        deep_cursor = rank_key(await db.get_user_build_by_id(all_ids[deep_offset - 1]))
+
+        print()
+        first_cached = await timed(lambda: db.get_public_builds(limit=PAGE_SIZE))
+        first_keyset = await timed(lambda: db._query_public_builds(PAGE_SIZE))
+        deep_keyset = await timed(lambda: db._query_public_builds(PAGE_SIZE, deep_cursor))
+        first_offset = await timed(lambda: offset_page(db, 0))
+        deep_offset_ms = await timed(lambda: offset_page(db, deep_offset))
+        print(f"  первая страница, кэш топа:       {first_cached:7.3f} мс")
+        print(f"  первая страница, keyset:         {first_keyset:7.3f} мс")
+        print(f"  глубокая страница, keyset:       {deep_keyset:7.3f} мс")
+        print(f"  первая страница, OFFSET (старый): {first_offset:7.3f} мс")
+        print(f"  глубокая страница, OFFSET (старый): {deep_offset_ms:7.3f} мс")
+
+    print("=" * 70)
+    if failed:
+        print("❌ Пагинация работает неверно")
+        sys.exit(1)
+    print("✅ Пагинация сборок сообщества работает корректно")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,113 @@
+"""Regression test: SQLite FSM storage persistence, TTL and purge.
+
+Sessions must survive a restart (a new storage on the same database),
+expired sessions must read as empty and restart from scratch on write,
+the periodic purge must delete expired rows, and cleared sessions must
+not keep a row. Runs offline.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+from aiogram.fsm.storage.base import StorageKey
+
+from benchmarks.harness import prepare_database
+from database.fsm_storage import SQLiteStorage
+
+TTL = 60 * 60
+
+
+def storage_key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+async def expire(path: str, user_id: int):
+    """Move a session's last touch to before the TTL."""
+    async with aiosqlite.connect(path) as conn:
+        await conn.execute(
+            "UPDATE fsm_states SET updated_at = ? WHERE key = ?",
+            (int(time.time()) - TTL - 1, SQLiteStorage._make_key(storage_key(user_id)))
+        )
+        await conn.commit()
+
+
+async def row_count(path: str) -> int:
+    async with aiosqlite.connect(path) as conn:
+        async with conn.execute("SELECT COUNT(*) FROM fsm_states") as cursor:
+            return (await cursor.fetchone())[0]
+
+
+async def test():
+    """Write, restart, expire, purge and clear sessions."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "test.db")
+        await prepare_database(path)
+
+        print("=" * 70)
+        print("SQLite-хранилище FSM: перезапуск, TTL и очистка")
+        print("=" * 70)
+        failed = False
+
+        storage = SQLiteStorage(path, ttl_seconds=TTL)
+        for user_id in (1, 2, 3):
+            await storage.set_state(storage_key(user_id), "DynamicBuildStates:waiting_for_budget")
+            await storage.set_data(storage_key(user_id), {"weapon_id": f"weapon-{user_id}", "page": user_id})
+        await storage.close()
+
+        # Restart: a new storage on the same file
+        storage = SQLiteStorage(path, ttl_seconds=TTL)
+        ok = (
+            await storage.get_state(storage_key(1)) == "DynamicBuildStates:waiting_for_budget"
+            and await storage.get_data(storage_key(1)) == {"weapon_id": "weapon-1", "page": 1}
+            and await storage.count_sessions() == 3
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Состояние и данные пережили перезапуск")
+
+        await expire(path, 2)
+        ok = (
+            await storage.get_state(storage_key(2)) is None
+            and await storage.get_data(storage_key(2)) == {}
+            and await storage.count_sessions() == 2
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Просроченная сессия читается как пустая и не считается")
+
+        await storage.set_state(storage_key(2), "SearchStates:waiting_for_name")
+        ok = (
+            await storage.get_state(storage_key(2)) == "SearchStates:waiting_for_name"
+            and await storage.get_data(storage_key(2)) == {}
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Запись в просроченную сессию начинает её заново (старые данные не вернулись)")
+
+        # Purge runs on the first write after PURGE_INTERVAL
+        await expire(path, 3)
+        storage._last_purge = 0.0
+        await storage.set_data(storage_key(1), {"weapon_id": "weapon-1", "page": 2})
+        ok = await row_count(path) == 2
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Очистка удалила просроченные строки")
+
+        await storage.set_state(storage_key(1), None)
+        await storage.set_data(storage_key(1), {})
+        ok = await row_count(path) == 1 and await storage.count_sessions() == 1
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Сброшенная сессия не хранит строку")
+
+        await storage.close()
+
+    print("=" * 70)
+    if failed:
+        print("❌ Хранилище FSM работает неверно")
+        sys.exit(1)
+    print("✅ Хранилище FSM сохраняет, истекает и очищает сессии корректно")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
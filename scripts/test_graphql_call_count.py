@@ -0,0 +1,160 @@
+"""Regression test: count GraphQL requests per handler invocation.
+
+Handlers must use the shared services from ServiceContainer. A repeated
+invocation is served from the warm API client cache and must not hit
+tarkov.dev again. Runs offline: the API client returns canned data.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_clients import TarkovAPIClient
+from database import Database
+from services import ServiceContainer
+from handlers import dynamic_builds, loyalty
+
+
+MAGAZINE = {
+    "id": "mag-1",
+    "name": "6L23 5.45x39 30-round magazine",
+    "shortName": "6L23",
+    "avg24hPrice": 2000,
+    "buyFor": [{"vendor": {"name": "Prapor"}, "priceRUB": 1800, "requirements": [{"type": "loyaltyLevel", "value": 1}]}],
+    "properties": {"capacity": 30, "ergonomics": -1},
+}
+
+WEAPON = {
+    "id": "weapon-1",
+    "name": "Kalashnikov AK-74M 5.45x39 assault rifle",
+    "shortName": "AK-74M",
+    "normalizedName": "ak-74m",
+    "types": ["gun"],
+    "avg24hPrice": 40000,
+    "category": {"id": "cat-1", "name": "Assault rifle"},
+    "properties": {
+        "caliber": "Caliber545x39",
+        "ergonomics": 44,
+        "recoilVertical": 120,
+        "recoilHorizontal": 300,
+        "fireRate": 650,
+        "defaultPreset": {"id": "preset-1", "name": "AK-74M Default", "containsItems": [{"count": 1, "item": MAGAZINE}]},
+        "slots": [{
+            "id": "slot-1",
+            "name": "Magazine",
+            "nameId": "mod_magazine",
+            "required": True,
+            "filters": {"allowedCategories": [], "allowedItems": [MAGAZINE], "excludedItems": []},
+        }],
+    },
+}
+
+
+class CountingAPIClient(TarkovAPIClient):
+    """API client that answers from fixtures and counts GraphQL requests."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    async def _make_graphql_request(self, query: str):
+        self.requests += 1
+        if "types: [gun]" in query:
+            return {"items": [WEAPON]}
+        if "item(id:" in query:
+            return {"item": WEAPON}
+        if "items(name:" in query:
+            return {"items": [WEAPON]}
+        return None
+
+
+class FakeMessage:
+    """Minimal stand-in for aiogram Message/CallbackQuery."""
+
+    def __init__(self, text: str = "", data: str = ""):
+        self.text = text
+        self.data = data
+        self.from_user = SimpleNamespace(id=1)
+        self.message = self
+
+    async def answer(self, *args, **kwargs):
+        return self
+
+    async def edit_text(self, *args, **kwargs):
+        return self
+
+    async def delete(self):
+        return True
+
+
+class FakeState:
+    """Minimal stand-in for aiogram FSMContext."""
+
+    async def clear(self):
+        pass
+
+    async def get_data(self):
+        return {}
+
+
+async def count_requests(api_client: CountingAPIClient, coro) -> int:
+    """Run coroutine and return number of GraphQL requests it made."""
+    before = api_client.requests
+    await coro
+    return api_client.requests - before
+
+
+async def test():
+    """Invoke handlers twice and check GraphQL request counts."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "test.db"))
+        await db.init_db()
+
+        api_client = CountingAPIClient()
+        services = ServiceContainer(db, api_client)
+        data = services.handler_data
+        user = await services.user_service.get_or_create_user(1)
+
+        cases = [
+            ("dynamic_builds.process_budget", lambda: dynamic_builds.process_budget(
+                FakeMessage(text="500000"), FakeState(),
+                data["build_generator"], data["tier_evaluator"], user
+            )),
+            ("dynamic_builds.regenerate_build", lambda: dynamic_builds.regenerate_build(
+                FakeMessage(data="regenerate_build:500000"),
+                data["build_generator"], data["tier_evaluator"], user
+            )),
+            ("loyalty.show_filtered_loyalty_builds", lambda: loyalty.show_filtered_loyalty_builds(
+                FakeMessage(), data["build_generator"], user, "any", 500000
+            )),
+            ("BuildService.generate_meta_build_from_preset", lambda: (
+                data["build_service"].generate_meta_build_from_preset("AK-74M", "ru")
+            )),
+        ]
+
+        print("=" * 70)
+        print("GraphQL-запросы на вызов обработчика")
+        print("=" * 70)
+
+        failed = False
+        for name, make_call in cases:
+            first = await count_requests(api_client, make_call())
+            second = await count_requests(api_client, make_call())
+            ok = second == 0
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} {name}: первый вызов {first}, повторный {second}")
+
+        await services.close()
+
+    print("=" * 70)
+    if failed:
+        print("❌ Повторные вызовы обращаются к API: обработчик не использует общие сервисы")
+        sys.exit(1)
+    print("✅ Повторные вызовы обслуживаются из общего кэша")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
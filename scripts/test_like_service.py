@@ -0,0 +1,118 @@
+"""Regression test: build likes are deduplicated and survive a failed flush.
+
+Repeated likes must be rejected whether the earlier like is pending,
+being written, already flushed or only in the database ledger (after a
+restart). A flush that fails must keep its batch and write it on the
+next attempt, with counters matching the ledger. Runs offline.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from benchmarks.harness import prepare_database
+from database import Database
+from services import LikeService
+
+
+async def seed(db: Database):
+    """Two public builds; user 1 already liked build 1."""
+    async with aiosqlite.connect(db.db_path) as conn:
+        await conn.executemany(
+            """INSERT INTO user_builds (id, user_id, weapon_id, name, modules, total_cost, tier_rating,
+               is_public, likes) VALUES (?, 100, 1, ?, ?, 100000, 'A', 1, ?)""",
+            [(1, "Build 1", json.dumps([]), 1), (2, "Build 2", json.dumps([]), 0)]
+        )
+        await conn.execute("INSERT INTO build_likes (user_id, build_id, created_at) VALUES (1, 1, 0)")
+        await conn.commit()
+
+
+async def likes_of(db: Database, build_id: int) -> tuple:
+    """(counter in user_builds, rows in the ledger)."""
+    async with aiosqlite.connect(db.db_path) as conn:
+        async with conn.execute("SELECT likes FROM user_builds WHERE id = ?", (build_id,)) as cursor:
+            counter = (await cursor.fetchone())[0]
+        async with conn.execute("SELECT COUNT(*) FROM build_likes WHERE build_id = ?", (build_id,)) as cursor:
+            ledger = (await cursor.fetchone())[0]
+    return counter, ledger
+
+
+async def test():
+    """Like, fail a flush, retry it and restart the service."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "test.db"))
+        await prepare_database(db.db_path)
+        await seed(db)
+
+        print("=" * 70)
+        print("Лайки сборок: дубликаты и повтор записи")
+        print("=" * 70)
+        failed = False
+
+        service = LikeService(db, bloom_capacity=1000)
+        results = [
+            await service.like(1, 1),  # in the ledger already
+            await service.like(2, 1),
+            await service.like(2, 1),  # pending
+            await service.like(3, 2),
+        ]
+        ok = results == [False, True, False, True]
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Повторный лайк отклонён (из БД и из очереди): {results}")
+
+        # First write fails; likes tapped while it is in flight are still duplicates
+        original_add = db.add_build_likes
+        in_flight_results = []
+
+        async def failing_add(likes):
+            in_flight_results.append(await service.like(2, 1))
+            raise aiosqlite.OperationalError("database is locked")
+
+        db.add_build_likes = failing_add
+        try:
+            await service.flush()
+            flush_failed = False
+        except aiosqlite.OperationalError:
+            flush_failed = True
+        db.add_build_likes = original_add
+
+        ok = flush_failed and in_flight_results == [False] and service.get_stats()["pending"] == 2
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Неудачная запись сохранила пакет, лайк во время записи отклонён")
+
+        added = await service.flush()
+        ok = (
+            added == {1: 1, 2: 1}
+            and await likes_of(db, 1) == (2, 2)
+            and await likes_of(db, 2) == (1, 1)
+            and service.get_stats()["pending"] == 0
+        )
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Повторная запись добавила лайки один раз, счётчики = журнал")
+
+        ok = not await service.like(2, 1)
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} Лайк после записи отклонён")
+
+        # Restart: only the ledger knows about earlier likes
+        restarted = LikeService(db, bloom_capacity=1000)
+        ok = not await restarted.like(3, 2) and await restarted.like(4, 2)
+        await restarted.close()
+        ok = ok and await likes_of(db, 2) == (2, 2)
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} После перезапуска дубликат отклонён по журналу, новый лайк записан")
+
+    print("=" * 70)
+    if failed:
+        print("❌ Лайки работают неверно")
+        sys.exit(1)
+    print("✅ Лайки без дубликатов, неудачная запись повторяется")
+
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -1,5 +1,8 @@
 """Services layer for business logic."""
 from .weapon_service import WeaponService
+from .weapon_search import WeaponSearchIndex
+from .weapon_catalog import WeaponCatalog
+from .loyalty_index import LoyaltyIndex
 from .build_service import BuildService
 from .user_service import UserService
 from .sync_service import SyncService
@@ -13,6 +16,10 @@ from .context_builder import ContextBuilder
 from .ai_generation_service import AIGenerationService
 from .ai_assistant import AIAssistant
 from .news_service import NewsService
+from .broadcast_service import BroadcastService
+from .like_service import LikeService
+from .activity_tracker import ActivityTracker
+from .container import ServiceContainer
 
 __all__ = [
     "UserService",
@@ -20,6 +27,9 @@ __all__ = [
     "RandomBuildService",
     "AdminService",
     "WeaponService",
+    "WeaponSearchIndex",
+    "WeaponCatalog",
+    "LoyaltyIndex",
     "SyncService",
     "CompatibilityChecker",
     "TierEvaluator",
@@ -28,5 +38,9 @@ __all__ = [
     "AIGenerationService",
     "AIAssistant",
     "NewsService",
+    "BroadcastService",
     "ExportService",
+    "LikeService",
+    "ActivityTracker",
+    "ServiceContainer",
 ]
@@ -0,0 +1,203 @@
+"""Batched user activity event log with daily rollups."""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def day_number(timestamp: Optional[float] = None) -> int:
+    """Day index (days since epoch, UTC) of a timestamp or of now."""
+    return int(timestamp if timestamp is not None else time.time()) // SECONDS_PER_DAY
+
+
+class ActivityTracker:
+    """Append-only activity log: who did what and when.
+
+    record() appends to an in-memory list, so it adds no latency to
+    updates. Every flush_interval seconds the collected events are
+    appended to activity_events in one batch, together with new
+    (day, user_id) rows of user_activity_days for DAU/WAU/retention.
+
+    Every rollup_interval seconds the raw events of the days not yet
+    final are aggregated into activity_daily_events (events and distinct
+    users per day and event type), and raw events older than
+    raw_retention_days are pruned.
+    """
+
+    def __init__(
+        self,
+        db,
+        flush_interval: float = 60.0,
+        rollup_interval: float = 3600.0,
+        raw_retention_days: int = 30
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            db: Database instance
+            flush_interval: Seconds between batched writes
+            rollup_interval: Seconds between daily rollups
+            raw_retention_days: Days raw events are kept after rollup
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.rollup_interval = rollup_interval
+        self.raw_retention_days = raw_retention_days
+        self._day = day_number()
+        # Users already written for the current day (skipped until the day changes)
+        self._seen_today: Set[int] = set()
+        # (timestamp, user_id, event) not yet written
+        self._events: List[Tuple[int, int, str]] = []
+        self._event_ids: Dict[str, int] = {}
+        # First day whose aggregates may still change (None = read from DB)
+        self._rollup_from_day: Optional[int] = None
+        self._last_rollup = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+        self.events_written = 0
+
+    def record(self, user_id: int, event: str = "update"):
+        """
+        Log an activity event.
+
+        Args:
+            user_id: Telegram user ID
+            event: Event type (handler name)
+        """
+        self._events.append((int(time.time()), user_id, event))
+
+    async def flush(self) -> int:
+        """
+        Write pending events.
+
+        Returns:
+            Number of events written
+        """
+        if not self._events:
+            return 0
+
+        today = day_number()
+        if today != self._day:
+            self._day = today
+            self._seen_today = set()
+
+        events, self._events = self._events, []
+        # Users already written today don't need another user_activity_days row
+        active_days = {
+            (ts // SECONDS_PER_DAY, user_id) for ts, user_id, _ in events
+            if user_id not in self._seen_today or ts // SECONDS_PER_DAY != today
+        }
+        try:
+            async with aiosqlite.connect(self.db.db_path) as conn:
+                await self._resolve_event_ids(conn, {event for _, _, event in events})
+                await conn.executemany(
+                    "INSERT INTO activity_events (ts, user_id, event_id) VALUES (?, ?, ?)",
+                    [(ts, user_id, self._event_ids[event]) for ts, user_id, event in events]
+                )
+                if active_days:
+                    await conn.executemany(
+                        "INSERT OR IGNORE INTO user_activity_days (day, user_id) VALUES (?, ?)",
+                        active_days
+                    )
+                await conn.commit()
+        except Exception:
+            # Keep the batch for the next attempt
+            self._events[:0] = events
+            raise
+
+        self._seen_today.update(user_id for day, user_id in active_days if day == today)
+        self.events_written += len(events)
+        return len(events)
+
+    async def rollup(self):
+        """Aggregate raw events into daily tables and prune old raw events."""
+        today = day_number()
+        prune_before_day = today - self.raw_retention_days
+
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            from_day = self._rollup_from_day
+            if from_day is None:
+                # Last rolled-up day may have been partial; otherwise start at the oldest event
+                async with conn.execute(
+                    """SELECT COALESCE(
+                           (SELECT MAX(day) FROM activity_daily_events),
+                           (SELECT MIN(ts) FROM activity_events) / ?
+                       )""",
+                    (SECONDS_PER_DAY,)
+                ) as cursor:
+                    from_day = (await cursor.fetchone())[0]
+                if from_day is None:
+                    from_day = today
+
+            await conn.execute("DELETE FROM activity_daily_events WHERE day >= ?", (from_day,))
+            await conn.execute(
+                """INSERT INTO activity_daily_events (day, event_id, events, users)
+                   SELECT ts / ?, event_id, COUNT(*), COUNT(DISTINCT user_id)
+                   FROM activity_events WHERE ts >= ?
+                   GROUP BY ts / ?, event_id""",
+                (SECONDS_PER_DAY, from_day * SECONDS_PER_DAY, SECONDS_PER_DAY)
+            )
+            cursor = await conn.execute(
+                "DELETE FROM activity_events WHERE ts < ?",
+                (prune_before_day * SECONDS_PER_DAY,)
+            )
+            pruned = cursor.rowcount
+            await conn.commit()
+
+        # Today keeps changing, earlier days are final
+        self._rollup_from_day = today
+        self._last_rollup = time.time()
+        logger.info(f"📈 Activity rolled up from day {from_day}, pruned {pruned} raw events")
+
+    def start(self):
+        """Start periodic flushing and rollups."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop periodic jobs and write what is pending."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get tracker counters."""
+        return {
+            "pending": len(self._events),
+            "active_today": len(self._seen_today),
+            "events_written": self.events_written,
+        }
+
+    async def _resolve_event_ids(self, conn: aiosqlite.Connection, names: Set[str]):
+        """Make sure every event name has an ID in activity_event_types."""
+        missing = [name for name in names if name not in self._event_ids]
+        if not missing:
+            return
+        await conn.executemany(
+            "INSERT OR IGNORE INTO activity_event_types (name) VALUES (?)",
+            [(name,) for name in missing]
+        )
+        async with conn.execute("SELECT name, id FROM activity_event_types") as cursor:
+            self._event_ids = dict(await cursor.fetchall())
+
+    async def _flush_loop(self):
+        """Flush events every flush_interval seconds, roll up every rollup_interval."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if time.time() - self._last_rollup >= self.rollup_interval:
+                    await self.rollup()
+            except Exception as e:
+                logger.error(f"Error writing user activity: {e}")
@@ -1,80 +1,140 @@
 """Admin service for statistics and broadcasting."""
 import aiosqlite
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import time
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 import logging
 
+from .activity_tracker import ActivityTracker, SECONDS_PER_DAY, day_number
+
 logger = logging.getLogger(__name__)
 
 
 class AdminService:
     """Service for admin operations and statistics."""
     
-    def __init__(self, db):
+    # All counters of the stats screen as (key, count) rows of one query
+    STATS_QUERY = """
+        SELECT 'lang:' || COALESCE(language, '?'), COUNT(*) FROM users GROUP BY language
+        UNION ALL SELECT 'total_builds', COUNT(*) FROM builds
+        UNION ALL SELECT 'community_builds', COUNT(*) FROM builds WHERE category = 'community'
+        UNION ALL SELECT 'total_weapons', COUNT(*) FROM weapons
+        UNION ALL SELECT 'total_modules', COUNT(*) FROM modules
+        UNION ALL SELECT 'user_builds', COUNT(*) FROM user_builds
+        UNION ALL SELECT 'dau', COUNT(*) FROM user_activity_days WHERE day = :today
+        UNION ALL SELECT 'wau', COUNT(DISTINCT user_id) FROM user_activity_days WHERE day >= :week_start
+        UNION ALL SELECT 'day:' || day, COUNT(*) FROM user_activity_days WHERE day >= :week_start GROUP BY day
+        UNION ALL SELECT 'prev_wau', COUNT(DISTINCT user_id) FROM user_activity_days
+            WHERE day BETWEEN :prev_week_start AND :week_start - 1
+        UNION ALL SELECT 'retained', COUNT(DISTINCT user_id) FROM user_activity_days
+            WHERE day BETWEEN :prev_week_start AND :week_start - 1
+              AND user_id IN (SELECT user_id FROM user_activity_days WHERE day >= :week_start)
+        UNION ALL SELECT 'event:' || t.name, SUM(d.events) FROM activity_daily_events d
+            JOIN activity_event_types t ON t.id = d.event_id
+            WHERE d.day >= :week_start GROUP BY d.event_id
+    """
+    
+    def __init__(self, db, activity_tracker: Optional[ActivityTracker] = None):
+        """
+        Initialize admin service.
+        
+        Args:
+            db: Database instance
+            activity_tracker: Tracker flushed before counting active users
+        """
         self.db = db
+        self.activity_tracker = activity_tracker
+        self._snapshot: Optional[Dict] = None
+        self._snapshot_at = 0.0
     
-    async def get_statistics(self) -> Dict:
-        """Get bot statistics."""
+    async def get_statistics(self, max_age: float = 300.0, force: bool = False) -> Dict:
+        """
+        Get bot statistics.
+        
+        Served from a snapshot while it's younger than max_age seconds;
+        the result's "age" tells how old the numbers are.
+        
+        Args:
+            max_age: Maximum snapshot age in seconds
+            force: Recompute even if the snapshot is fresh
+        """
+        now = time.time()
+        if force or self._snapshot is None or now - self._snapshot_at > max_age:
+            self._snapshot = await self._compute_statistics()
+            self._snapshot_at = time.time()
+        
+        return {**self._snapshot, "age": int(time.time() - self._snapshot_at)}
+    
+    async def get_activity_history(self, days: int = 7) -> List[Tuple[str, int]]:
+        """
+        Get daily active users for the last N days (oldest first).
+        
+        Returns:
+            List of (YYYY-MM-DD, active users) pairs, days without activity included
+        """
+        today = day_number()
+        first_day = today - days + 1
         async with aiosqlite.connect(self.db.db_path) as conn:
-            # Total users
-            async with conn.execute("SELECT COUNT(*) FROM users") as cursor:
-                total_users = (await cursor.fetchone())[0]
-            
-            # Active users (last 24 hours)
-            yesterday = int((datetime.now() - timedelta(days=1)).timestamp())
-            async with conn.execute(
-                "SELECT COUNT(*) FROM users WHERE last_activity > ?", 
-                (yesterday,)
-            ) as cursor:
-                active_users_24h = (await cursor.fetchone())[0] if cursor else 0
-            
-            # Active users (last 7 days)
-            week_ago = int((datetime.now() - timedelta(days=7)).timestamp())
-            async with conn.execute(
-                "SELECT COUNT(*) FROM users WHERE last_activity > ?", 
-                (week_ago,)
-            ) as cursor:
-                active_users_7d = (await cursor.fetchone())[0] if cursor else 0
-            
-            # Total builds
-            async with conn.execute("SELECT COUNT(*) FROM builds") as cursor:
-                total_builds = (await cursor.fetchone())[0]
-            
-            # Community builds count
             async with conn.execute(
-                "SELECT COUNT(*) FROM builds WHERE category = 'community'"
+                "SELECT day, COUNT(*) FROM user_activity_days WHERE day >= ? GROUP BY day",
+                (first_day,)
             ) as cursor:
-                community_builds = (await cursor.fetchone())[0]
-            
-            # Total weapons
-            async with conn.execute("SELECT COUNT(*) FROM weapons") as cursor:
-                total_weapons = (await cursor.fetchone())[0]
-            
-            # Total modules
-            async with conn.execute("SELECT COUNT(*) FROM modules") as cursor:
-                total_modules = (await cursor.fetchone())[0]
-            
-            # User builds count
-            async with conn.execute("SELECT COUNT(*) FROM user_builds") as cursor:
-                user_builds = (await cursor.fetchone())[0] if cursor else 0
-            
-            # Language distribution
-            async with conn.execute(
-                "SELECT language, COUNT(*) FROM users GROUP BY language"
-            ) as cursor:
-                lang_distribution = dict(await cursor.fetchall())
-            
-            return {
-                "total_users": total_users,
-                "active_users_24h": active_users_24h,
-                "active_users_7d": active_users_7d,
-                "total_builds": total_builds,
-                "community_builds": community_builds,
-                "user_builds": user_builds,
-                "total_weapons": total_weapons,
-                "total_modules": total_modules,
-                "language_distribution": lang_distribution
-            }
+                counts = dict(await cursor.fetchall())
+        
+        return self._daily_series(counts, first_day, today)
+    
+    @staticmethod
+    def _daily_series(counts: Dict[int, int], first_day: int, last_day: int) -> List[Tuple[str, int]]:
+        """Per-day counts as (YYYY-MM-DD, count) pairs with missing days as zero."""
+        return [
+            (datetime.utcfromtimestamp(day * SECONDS_PER_DAY).strftime("%Y-%m-%d"), counts.get(day, 0))
+            for day in range(first_day, last_day + 1)
+        ]
+    
+    async def _compute_statistics(self) -> Dict:
+        """Count everything in one query."""
+        if self.activity_tracker:
+            try:
+                await self.activity_tracker.flush()
+                await self.activity_tracker.rollup()
+            except Exception as e:
+                logger.error(f"Error writing user activity: {e}")
+        
+        today = day_number()
+        params = {"today": today, "week_start": today - 6, "prev_week_start": today - 13}
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            async with conn.execute(self.STATS_QUERY, params) as cursor:
+                rows = await cursor.fetchall()
+        
+        counts = {}
+        lang_distribution = {}
+        daily = {}
+        feature_usage = {}
+        for key, count in rows:
+            if key.startswith("lang:"):
+                lang_distribution[key[len("lang:"):]] = count
+            elif key.startswith("day:"):
+                daily[int(key[len("day:"):])] = count
+            elif key.startswith("event:"):
+                feature_usage[key[len("event:"):]] = count
+            else:
+                counts[key] = count
+        
+        return {
+            "total_users": sum(lang_distribution.values()),
+            "dau": counts["dau"],
+            "wau": counts["wau"],
+            "total_builds": counts["total_builds"],
+            "community_builds": counts["community_builds"],
+            "user_builds": counts["user_builds"],
+            "total_weapons": counts["total_weapons"],
+            "total_modules": counts["total_modules"],
+            "language_distribution": lang_distribution,
+            "activity_history": self._daily_series(daily, today - 6, today),
+            # Share of last week's users who came back this week
+            "weekly_retention": counts["retained"] / counts["prev_wau"] if counts["prev_wau"] else None,
+            "feature_usage": sorted(feature_usage.items(), key=lambda item: item[1], reverse=True),
+        }
     
     async def get_all_user_ids(self) -> List[int]:
         """Get list of all user IDs for broadcasting."""
@@ -85,11 +145,10 @@ class AdminService:
     
     async def get_active_user_ids(self, days: int = 7) -> List[int]:
         """Get list of active user IDs (last N days)."""
-        timestamp = int((datetime.now() - timedelta(days=days)).timestamp())
         async with aiosqlite.connect(self.db.db_path) as conn:
             async with conn.execute(
-                "SELECT user_id FROM users WHERE last_activity > ?",
-                (timestamp,)
+                "SELECT DISTINCT user_id FROM user_activity_days WHERE day >= ?",
+                (day_number() - days + 1,)
             ) as cursor:
                 rows = await cursor.fetchall()
                 return [row[0] for row in rows]
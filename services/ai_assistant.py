@@ -1,5 +1,8 @@
 """Central AI assistant service - handles all user messages and voice input."""
+import asyncio
 import logging
+import os
+import uuid
 from typing import Optional, Dict, List
 from aiogram.types import Message
 from api_clients import TarkovAPIClient
@@ -18,12 +21,14 @@ class AIAssistant:
         api_client: TarkovAPIClient,
         db: Database,
         ai_generation_service: AIGenerationService,
-        news_service=None
+        news_service=None,
+        voice_transcriber=None
     ):
         self.api = api_client
         self.db = db
         self.ai_gen = ai_generation_service
         self.news_service = news_service
+        self.voice_transcriber = voice_transcriber
         self.fallback_enabled = True
     
     async def handle_message(self, message: Message, user_language: str = "ru") -> str:
@@ -85,13 +90,12 @@ class AIAssistant:
             logger.error(f"Error in AI assistant: {e}", exc_info=True)
             return await self._fallback_response(user_text, user_id, user_language)
     
-    async def handle_voice(self, message: Message, voice_file_path: str, user_language: str = "ru") -> str:
+    async def handle_voice(self, message: Message, user_language: str = "ru") -> str:
         """
         Handle incoming voice message.
         
         Args:
-            message: Telegram message object
-            voice_file_path: Path to downloaded voice file
+            message: Telegram message object with voice
             user_language: User's language preference
             
         Returns:
@@ -102,13 +106,17 @@ class AIAssistant:
         logger.info(f"AI Assistant handling voice message from user {user_id}")
         
         try:
-            # Import voice transcriber
-            from utils.voice_transcriber import VoiceTranscriber
+            # Shared transcriber (model stays loaded between messages)
+            from utils.voice_transcriber import VoiceTranscriber, TranscriberBusyError
             
-            transcriber = VoiceTranscriber()
+            if self.voice_transcriber is None:
+                self.voice_transcriber = VoiceTranscriber()
             
-            # Transcribe voice to text
-            transcribed_text = await transcriber.transcribe(voice_file_path, user_language)
+            # Transcribe voice to text (cached by file_unique_id / audio hash)
+            try:
+                transcribed_text = await self._transcribe_voice(message, user_language)
+            except TranscriberBusyError:
+                return get_text("voice_busy", user_language)
             
             if not transcribed_text:
                 return get_text("voice_transcription_failed", user_language)
@@ -143,6 +151,65 @@ class AIAssistant:
             logger.error(f"Error handling voice: {e}", exc_info=True)
             return get_text("voice_processing_error", user_language)
     
+    async def _transcribe_voice(self, message: Message, language: str) -> Optional[str]:
+        """
+        Transcribe voice message with caching.
+        
+        Forwarded or retried voice notes keep the same file_unique_id, so they
+        are answered from cache without downloading. Otherwise the file is
+        downloaded into VOICE_TEMP_DIR and its content hash is checked before
+        decoding. The temp file is always removed.
+        
+        Args:
+            message: Telegram message object with voice
+            language: Expected language (ru/en)
+            
+        Returns:
+            Transcribed text or None if transcription failed
+        """
+        from utils.constants import VOICE_TEMP_DIR
+        from utils.voice_transcriber import hash_audio_file
+        
+        cache = self.voice_transcriber.cache
+        file_key = f"{language}:file:{message.voice.file_unique_id}"
+        
+        cached = cache.get(file_key)
+        if cached:
+            logger.info(f"Voice transcription cache hit: {message.voice.file_unique_id}")
+            return cached["text"]
+        
+        os.makedirs(VOICE_TEMP_DIR, exist_ok=True)
+        temp_path = os.path.join(
+            VOICE_TEMP_DIR, f"{message.voice.file_unique_id}_{uuid.uuid4().hex[:8]}.ogg"
+        )
+        
+        try:
+            voice_file = await message.bot.get_file(message.voice.file_id)
+            await message.bot.download_file(voice_file.file_path, temp_path)
+            
+            # Same audio re-uploaded gets a new file_unique_id, check content hash
+            audio_hash = await asyncio.get_running_loop().run_in_executor(None, hash_audio_file, temp_path)
+            hash_key = f"{language}:sha256:{audio_hash}"
+            
+            cached = cache.get(hash_key)
+            if cached:
+                logger.info(f"Voice transcription cache hit by audio hash: {audio_hash[:12]}")
+                cache.set(file_key, cached["text"], cached["language"])
+                return cached["text"]
+            
+            result = await self.voice_transcriber.transcribe_with_info(temp_path, language)
+            if not result:
+                return None
+            
+            cache.set(file_key, result["text"], result["language"])
+            cache.set(hash_key, result["text"], result["language"])
+            return result["text"]
+        finally:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+    
     def _is_news_request(self, text: str, language: str) -> bool:
         """Check if message is a news request."""
         text_lower = text.lower()
@@ -267,28 +334,6 @@ class AIAssistant:
         from .context_builder import ContextBuilder
         context_builder = ContextBuilder(self.api, self.db)
         
-        user_context = await context_builder.build_user_context(user_id)
-        
-        # Get latest news from Telegram for context
-        news_context = ""
-        if self.news_service:
-            try:
-                # Get all recent news - AI analyzes everything
-                all_news = await self.news_service.get_latest_news(lang=language, limit=15)
-                if all_news:
-                    logger.info(f"Fetched {len(all_news)} news items for AI context")
-                    
-                    news_list = "\n\n".join([
-                        f"{i+1}. {item['title']}\n   Дата: {item['date']}\n   {item['description']}\n   Link: {item['link']}"
-                        for i, item in enumerate(all_news)
-                    ])
-                    if language == "ru":
-                        news_context = f"\n\nПОСЛЕДНИЕ НОВОСТИ ИЗ TELEGRAM @escapefromtarkovRU ({len(all_news)} постов):\n\n{news_list}\n"
-                    else:
-                        news_context = f"\n\nLATEST NEWS FROM TELEGRAM @escapefromtarkovEN ({len(all_news)} posts):\n\n{news_list}\n"
-            except Exception as e:
-                logger.error(f"Failed to fetch news: {e}")
-        
         # Check if question is about quests/tasks and add quest context
         text_lower = text.lower()
         quest_keywords = ["квест", "задание", "задача", "оружейник", "gunsmith", "quest", "task", "mission"] if language == "ru" else ["quest", "task", "mission", "gunsmith"]
@@ -304,15 +349,23 @@ class AIAssistant:
         is_news_question = any(kw in text_lower for kw in news_keywords)
         logger.info(f"Question about news/release: {is_news_question}")
         
-        quest_context = ""
+        # User, news and quest context are independent - fetch them concurrently
+        sources = {"user": context_builder.build_user_context(user_id)}
+        if self.news_service:
+            sources["news"] = self._build_news_context(language)
         if is_quest_question:
             # Try to extract quest name
             quest_name = self._extract_quest_name(text, language)
             if quest_name:
-                quest_context = await context_builder.build_quest_info_context(quest_name, language)
+                sources["quest"] = context_builder.build_quest_info_context(quest_name, language)
             else:
                 # Provide general quest context
-                quest_context = await context_builder.build_quest_context(language=language)
+                sources["quest"] = context_builder.build_quest_context(language=language)
+        
+        results = await self.ai_gen.gather_context(sources)
+        user_context = results["user"]
+        news_context = results.get("news", "")
+        quest_context = results.get("quest", "")
         
         # Prepare quest context section (avoid backslash in f-string expressions)
         quest_context_section = ""
@@ -387,6 +440,23 @@ Your response in English (USE INFORMATION FROM NEWS):"""
             logger.error(f"Error in general question: {e}")
             return get_text("ai_error", language)
     
+    async def _build_news_context(self, language: str) -> str:
+        """Build latest Telegram news section for the general query prompt."""
+        # Get all recent news - AI analyzes everything
+        all_news = await self.news_service.get_latest_news(lang=language, limit=15)
+        if not all_news:
+            return ""
+        
+        logger.info(f"Fetched {len(all_news)} news items for AI context")
+        
+        news_list = "\n\n".join([
+            f"{i+1}. {item['title']}\n   Дата: {item['date']}\n   {item['description']}\n   Link: {item['link']}"
+            for i, item in enumerate(all_news)
+        ])
+        if language == "ru":
+            return f"\n\nПОСЛЕДНИЕ НОВОСТИ ИЗ TELEGRAM @escapefromtarkovRU ({len(all_news)} постов):\n\n{news_list}\n"
+        return f"\n\nLATEST NEWS FROM TELEGRAM @escapefromtarkovEN ({len(all_news)} posts):\n\n{news_list}\n"
+    
     async def _fallback_response(self, text: str, user_id: int, language: str) -> str:
         # Basic fallback message without Markdown to avoid parsing errors
         if language == "ru":
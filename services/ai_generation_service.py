@@ -1,11 +1,18 @@
 """AI-powered build generation service using Qwen3-Coder-480B-Cloud via Ollama."""
+import asyncio
 import logging
 import json
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from api_clients import TarkovAPIClient
 from database import Database
+from utils.metrics import timed_call
+from utils.tracing import traced
+from .build_generator import BuildGenerator, BuildGeneratorConfig, GeneratedBuild
+from .compatibility_checker import CompatibilityChecker
 from .context_builder import ContextBuilder
+from .loyalty_index import MAX_LOYALTY_LEVEL
+from .tier_evaluator import TierEvaluator
 
 logger = logging.getLogger(__name__)
 
@@ -22,25 +29,65 @@ class AIGenerationService:
         "D": 0.10   # 10% - Experimental/weak
     }
     
+    # Per-source timeout for context fetching (seconds). A slow source is
+    # dropped from the prompt instead of delaying the whole generation.
+    CONTEXT_SOURCE_TIMEOUT = 10.0
+    
+    # JSON schema passed to Ollama as `format` in structured-output mode
+    BUILD_RESPONSE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "tier": {"type": "string", "enum": ["S", "A", "B", "C", "D"]},
+            "description": {"type": "string"},
+            "modules": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "slot": {"type": "string"},
+                        "id": {"type": "string"},
+                        "name": {"type": "string"}
+                    },
+                    "required": ["slot", "id"]
+                }
+            },
+            "reasoning": {"type": "string"}
+        },
+        "required": ["tier", "modules", "reasoning"]
+    }
+    
     def __init__(
         self, 
         api_client: TarkovAPIClient,
         db: Database,
         ollama_url: str = "http://localhost:11434",
-        ollama_model: str = "qwen3-coder:480b-cloud"
+        ollama_model: str = "qwen3-coder:480b-cloud",
+        structured_output: bool = True,
+        build_generator: Optional[BuildGenerator] = None,
+        hybrid_generation: bool = True,
+        max_inflight_llm: int = 2
     ):
         self.api = api_client
         self.db = db
         self.context_builder = ContextBuilder(api_client, db)
         self.ollama_url = ollama_url
         self.model = ollama_model
+        self.structured_output = structured_output
+        self.build_generator = build_generator or BuildGenerator(
+            api_client, CompatibilityChecker(api_client), TierEvaluator()
+        )
+        self.hybrid_generation = hybrid_generation
+        # Explanations are skipped while this many LLM calls are already running
+        self.max_inflight_llm = max_inflight_llm
+        self._llm_inflight = 0
     
     async def generate_build_with_ai(
         self,
         intent: str,
         context: Dict,
         user_id: int,
-        language: str = "ru"
+        language: str = "ru",
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> Optional[Dict]:
         """
         Unified AI build generation based on intent.
@@ -50,11 +97,30 @@ class AIGenerationService:
             context: Context dictionary with weapon_id, budget, loyalty, tier, quest_name, etc.
             user_id: User ID for preferences
             language: Response language
+            on_progress: Optional callback receiving partial build text while the
+                explanation streams (hybrid mode only)
             
         Returns:
             Dict with build data including tier
         """
         try:
+            # Hybrid mode: optimizer picks modules, LLM only explains them.
+            # Quest builds need exact required items, so they stay LLM-driven.
+            if self.hybrid_generation and context.get("weapon_id") and intent != "quest_build":
+                build_data = await self.generate_build_hybrid(
+                    intent, context, user_id, language, on_progress
+                )
+                if build_data:
+                    return build_data
+                logger.warning("Hybrid build generation failed, falling back to LLM module selection")
+            
+            # Structured JSON mode needs a weapon to resolve module IDs against
+            if self.structured_output and context.get("weapon_id"):
+                build_data = await self._generate_structured_build(intent, context, user_id, language)
+                if build_data:
+                    return build_data
+                logger.warning("Structured build generation failed, falling back to free-text mode")
+            
             # Build context string based on intent
             context_str = await self._build_context_for_intent(intent, context, user_id, language)
             
@@ -158,8 +224,12 @@ class AIGenerationService:
                 return None
             
             # Build context with quest requirements
-            quest_context = await self.context_builder.build_quest_context(quest_name, language)
-            user_context = await self.context_builder.build_user_context(user_id)
+            results = await self.gather_context({
+                "quest": self.context_builder.build_quest_context(quest_name, language),
+                "user": self.context_builder.build_user_context(user_id)
+            })
+            quest_context = results["quest"]
+            user_context = results["user"]
             
             # Include exact required items in context
             required_items = build_obj.get("containsOne", []) or build_obj.get("containsAll", [])
@@ -249,11 +319,9 @@ class AIGenerationService:
         language: str
     ) -> str:
         """Build context for LLM based on intent."""
-        context_parts = []
-        
-        # User context
-        user_ctx = await self.context_builder.build_user_context(user_id)
-        context_parts.append(user_ctx)
+        sources = {
+            "user": self.context_builder.build_user_context(user_id)
+        }
         
         # Weapon context
         if intent.get("weapon_name"):
@@ -261,23 +329,55 @@ class AIGenerationService:
             weapons = await self.api.search_items(intent["weapon_name"], item_types=["gun"])
             if weapons:
                 weapon = weapons[0]
-                weapon_ctx = await self.context_builder.build_weapon_context(weapon["id"], language)
-                context_parts.append(weapon_ctx)
-                
-                # Module context
-                module_ctx = await self.context_builder.build_modules_context(weapon["id"], language)
-                context_parts.append(module_ctx)
+                sources["weapon"] = self.context_builder.build_weapon_context(weapon["id"], language)
+                sources["modules"] = self.context_builder.build_modules_context(weapon["id"], language)
         else:
             # General weapon context
-            weapon_ctx = await self.context_builder.build_weapon_context(None, language)
-            context_parts.append(weapon_ctx)
+            sources["weapon"] = self.context_builder.build_weapon_context(None, language)
         
         # Quest context if needed
         if intent["type"] == "quest":
-            quest_ctx = await self.context_builder.build_quest_context(None, language)
-            context_parts.append(quest_ctx)
+            sources["quest"] = self.context_builder.build_quest_context(None, language)
+        
+        results = await self.gather_context(sources)
+        parts = [results[name] for name in ("user", "weapon", "modules", "quest") if results.get(name)]
+        return "\n\n---\n\n".join(parts)
+    
+    async def gather_context(
+        self,
+        sources: Dict[str, Awaitable[str]],
+        timeout: Optional[float] = None
+    ) -> Dict[str, str]:
+        """
+        Fetch independent context sources concurrently.
         
-        return "\n\n---\n\n".join(context_parts)
+        Each source gets its own timeout; a source that times out or fails
+        yields an empty string so the prompt is built from whatever arrived.
+        
+        Args:
+            sources: Mapping of source name to context coroutine
+            timeout: Per-source timeout in seconds (defaults to CONTEXT_SOURCE_TIMEOUT)
+            
+        Returns:
+            Mapping of source name to context string ("" for failed sources)
+        """
+        if not sources:
+            return {}
+        
+        timeout = self.CONTEXT_SOURCE_TIMEOUT if timeout is None else timeout
+        
+        async def fetch(name: str, coro: Awaitable[str]) -> str:
+            try:
+                return await asyncio.wait_for(coro, timeout=timeout) or ""
+            except asyncio.TimeoutError:
+                logger.warning(f"Context source '{name}' timed out after {timeout}s, skipping")
+            except Exception as e:
+                logger.warning(f"Context source '{name}' failed: {e}")
+            return ""
+        
+        names = list(sources.keys())
+        results = await asyncio.gather(*(fetch(name, sources[name]) for name in names))
+        return dict(zip(names, results))
     
     def _create_build_prompt(self, user_request: str, context: str, language: str) -> str:
         """Create prompt for LLM build generation."""
@@ -473,52 +573,35 @@ Create a build in English that EXACTLY fulfills all quest requirements:"""
         intent: str,
         context: Dict,
         user_id: int,
-        language: str
+        language: str,
+        include_ids: bool = False
     ) -> str:
         """Build context string based on intent type."""
-        from .context_builder import ContextBuilder
-        context_builder = ContextBuilder(self.api, self.db)
-        
-        parts = []
+        sources = {}
+        weapon_id = context.get("weapon_id")
         
-        if intent == "meta_build":
-            # Meta build - focus on optimal performance
-            weapon_id = context.get("weapon_id")
-            if weapon_id:
-                weapon_context = await context_builder.build_weapon_context(weapon_id, language)
-                module_context = await context_builder.build_modules_context(weapon_id, language)
-                parts.extend([weapon_context, module_context])
-        
-        elif intent == "quest_build":
+        if intent == "quest_build":
             # Quest build - exact requirements
             quest_name = context.get("quest_name")
             if quest_name:
-                quest_context = await context_builder.build_quest_context(quest_name, language)
-                parts.append(quest_context)
-            weapon_id = context.get("weapon_id")
-            if weapon_id:
-                module_context = await context_builder.build_modules_context(weapon_id, language)
-                parts.append(module_context)
-        
-        elif intent == "random_build":
-            # Random build - with tier variety
-            weapon_id = context.get("weapon_id")
+                sources["quest"] = self.context_builder.build_quest_context(quest_name, language)
             if weapon_id:
-                weapon_context = await context_builder.build_weapon_context(weapon_id, language)
-                module_context = await context_builder.build_modules_context(weapon_id, language)
-                parts.extend([weapon_context, module_context])
+                sources["modules"] = self.context_builder.build_modules_context(
+                    weapon_id, language, include_ids
+                )
         
-        else:  # custom_request
-            weapon_id = context.get("weapon_id")
-            if weapon_id:
-                weapon_context = await context_builder.build_weapon_context(weapon_id, language)
-                module_context = await context_builder.build_modules_context(weapon_id, language)
-                parts.extend([weapon_context, module_context])
+        elif weapon_id:
+            # meta_build, random_build and custom_request all need weapon + modules
+            sources["weapon"] = self.context_builder.build_weapon_context(weapon_id, language)
+            sources["modules"] = self.context_builder.build_modules_context(
+                weapon_id, language, include_ids
+            )
         
         # Add user context
-        user_context = await context_builder.build_user_context(user_id)
-        parts.append(user_context)
+        sources["user"] = self.context_builder.build_user_context(user_id)
         
+        results = await self.gather_context(sources)
+        parts = [results[name] for name in ("weapon", "quest", "modules", "user") if results.get(name)]
         return "\n\n---\n\n".join(parts)
     
     def _create_prompt_for_intent(
@@ -887,8 +970,24 @@ Create build in English:"""
         # Fallback to generic custom request
         return self._create_build_prompt(context.get("user_request", ""), context_str, language)
     
-    async def _call_ollama(self, prompt: str) -> Optional[str]:
-        """Call Ollama API to generate response."""
+    @traced("ollama.generate")
+    @timed_call("ollama", failed=lambda text: text is None)
+    async def _call_ollama(self, prompt: str, response_format: Optional[Dict] = None) -> Optional[str]:
+        """
+        Call Ollama API to generate response.
+        
+        Args:
+            prompt: Prompt text
+            response_format: Optional JSON schema for structured output (Ollama `format`)
+        """
+        self._llm_inflight += 1
+        try:
+            return await self._request_ollama(prompt, response_format)
+        finally:
+            self._llm_inflight -= 1
+    
+    async def _request_ollama(self, prompt: str, response_format: Optional[Dict]) -> Optional[str]:
+        """Send a single non-streaming generate request to Ollama."""
         try:
             import aiohttp
             
@@ -903,6 +1002,10 @@ Create build in English:"""
                         "max_tokens": 2048
                     }
                 }
+                if response_format is not None:
+                    payload["format"] = response_format
+                    # Deterministic-ish sampling keeps JSON output on-schema
+                    payload["options"]["temperature"] = 0.3
                 
                 async with session.post(
                     f"{self.ollama_url}/api/generate",
@@ -927,6 +1030,670 @@ Create build in English:"""
             logger.error(f"Error calling Ollama: {e}", exc_info=True)
             return None
     
+    # Hybrid deterministic + LLM generation
+    
+    async def generate_build_hybrid(
+        self,
+        intent: str,
+        context: Dict,
+        user_id: int,
+        language: str = "ru",
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Optional[Dict]:
+        """
+        Generate build with the deterministic optimizer and let the LLM explain it.
+        
+        BuildGenerator.generate_optimized_build picks the modules under the
+        budget and loyalty constraints, so cost, stats and tier are exact.
+        The LLM only receives the compact chosen build and writes the
+        reasoning; the step is skipped when the backend is busy.
+        
+        Args:
+            intent: Type of generation (see generate_build_with_ai)
+            context: Context with weapon_id and optional budget, trader_levels,
+                use_flea_market, target_tier
+            user_id: User ID (trader levels are read from profile if not in context)
+            language: Response language
+            on_progress: Optional callback receiving partial build text while streaming
+            
+        Returns:
+            Build dict in the same shape as generate_build_with_ai, or None
+        """
+        trader_levels = context.get("trader_levels")
+        if not trader_levels:
+            user = await self.db.get_user(user_id)
+            if user:
+                trader_levels = user.trader_levels
+            else:
+                from utils.constants import DEFAULT_TRADER_LEVELS
+                trader_levels = dict(DEFAULT_TRADER_LEVELS)
+        
+        config = BuildGeneratorConfig(
+            budget=context.get("budget") or 0,
+            trader_levels=trader_levels,
+            allow_flea=context.get("use_flea_market", True),
+            prioritize_ergonomics=intent == "meta_build"
+        )
+        
+        build = await self.build_generator.generate_optimized_build(
+            context["weapon_id"], config, context.get("target_tier")
+        )
+        if not build or not build.modules:
+            return None
+        
+        module_lines = self._generated_module_lines(build, config, language)
+        build_data = self._generated_build_to_dict(build, intent, context, module_lines, None, language)
+        
+        if self.is_llm_busy():
+            logger.info(f"LLM busy ({self._llm_inflight} calls in flight), returning build without explanation")
+            return build_data
+        
+        prompt = self._create_explanation_prompt(build, module_lines, context, language)
+        
+        if on_progress:
+            async def on_chunk(partial: str):
+                await on_progress(
+                    self._generated_build_to_dict(build, intent, context, module_lines, partial, language)["text"]
+                )
+            reasoning = await self._stream_ollama(prompt, on_chunk)
+        else:
+            reasoning = await self._call_ollama(prompt)
+        
+        if reasoning and reasoning.strip():
+            build_data = self._generated_build_to_dict(
+                build, intent, context, module_lines, reasoning.strip(), language
+            )
+        
+        return build_data
+    
+    def is_llm_busy(self) -> bool:
+        """Check whether the Ollama backend already has too many requests in flight."""
+        return self._llm_inflight >= self.max_inflight_llm
+    
+    def _generated_module_lines(
+        self,
+        build: GeneratedBuild,
+        config: BuildGeneratorConfig,
+        language: str
+    ) -> List[str]:
+        """Format optimizer-selected modules as numbered card lines."""
+        from utils.localization_helpers import localize_trader_name
+        
+        lines = []
+        for i, module in enumerate(build.modules.values(), 1):
+            price, source = self.build_generator._get_module_offer(module, config)
+            ergo, recoil = self.build_generator._get_module_modifiers(module)
+            if source == "Flea Market":
+                source = "Барахолка" if language == "ru" else "Flea Market"
+            elif language == "ru":
+                source = localize_trader_name(source, language)
+            
+            mods = []
+            if ergo:
+                mods.append(f"Ergo: {ergo:+g}")
+            if recoil:
+                mods.append(f"Recoil: {recoil:+.0f}%")
+            mods_str = f" ({', '.join(mods)})" if mods else ""
+            lines.append(f"{i}. {module.get('name', 'Unknown')} - {source} - {price:,}₽{mods_str}")
+        return lines
+    
+    def _generated_build_to_dict(
+        self,
+        build: GeneratedBuild,
+        intent: str,
+        context: Dict,
+        module_lines: List[str],
+        reasoning: Optional[str],
+        language: str
+    ) -> Dict:
+        """Convert optimizer build into the generate_build_with_ai result dict."""
+        stats = {}
+        if build.ergonomics is not None:
+            stats["ergonomics"] = build.ergonomics
+        if build.recoil_vertical is not None:
+            stats["recoil_vertical"] = build.recoil_vertical
+        if build.recoil_horizontal is not None:
+            stats["recoil_horizontal"] = build.recoil_horizontal
+        
+        weapon_name = context.get("weapon_name") or build.weapon_name
+        return {
+            "text": self._render_build_text(
+                weapon_name, None, module_lines, stats, build.total_cost, reasoning, language
+            ),
+            "weapon": build.weapon_name,
+            "modules": [
+                {"id": module.get("id"), "name": module.get("name"), "slot": slot}
+                for slot, module in build.modules.items()
+            ],
+            "stats": stats,
+            "total_cost": build.total_cost,
+            "reasoning": reasoning,
+            "intent": intent,
+            "tier": build.tier_rating.value,
+            "hybrid": True
+        }
+    
+    def _create_explanation_prompt(
+        self,
+        build: GeneratedBuild,
+        module_lines: List[str],
+        context: Dict,
+        language: str
+    ) -> str:
+        """Create compact prompt asking the LLM to explain an already chosen build."""
+        weapon_name = context.get("weapon_name") or build.weapon_name
+        modules_str = "\n".join(module_lines)
+        budget = context.get("budget")
+        
+        if language == "ru":
+            budget_str = f", бюджет {budget:,}₽" if budget else ""
+            return f"""Ты — Никита Буянов, эксперт Escape from Tarkov.
+Сборка уже выбрана, НЕ меняй её. Объясни на русском в 2-3 предложениях, почему эти модули хороши для {weapon_name}.
+
+Тир {build.tier_rating.value}, стоимость {build.total_cost:,}₽{budget_str}
+Эргономика {build.ergonomics}, вертикальная отдача {build.recoil_vertical}
+{modules_str}
+
+Обоснование:"""
+        
+        budget_str = f", budget {budget:,}₽" if budget else ""
+        return f"""You are Nikita Buyanov, Escape from Tarkov expert.
+The build is already chosen, DO NOT change it. In 2-3 sentences in English, explain why these modules suit the {weapon_name}.
+
+Tier {build.tier_rating.value}, cost {build.total_cost:,}₽{budget_str}
+Ergonomics {build.ergonomics}, vertical recoil {build.recoil_vertical}
+{modules_str}
+
+Reasoning:"""
+    
+    def _render_build_text(
+        self,
+        weapon_name: str,
+        description: Optional[str],
+        module_lines: List[str],
+        stats: Dict,
+        total_cost: int,
+        reasoning: Optional[str],
+        language: str
+    ) -> str:
+        """Render build card text in the same layout the free-text prompts ask for."""
+        if language == "ru":
+            labels = ("Описание", "Модули", "Итоговые характеристики", "Эргономика",
+                      "Вертикальная отдача", "Горизонтальная отдача", "Стоимость", "Обоснование")
+        else:
+            labels = ("Description", "Modules", "Final Stats", "Ergonomics",
+                      "Vertical recoil", "Horizontal recoil", "Total Cost", "Reasoning")
+        
+        lines = [f"🔫 **{weapon_name}**", ""]
+        if description:
+            lines += [f"📝 **{labels[0]}:**", description, ""]
+        lines += [f"🔧 **{labels[1]}:**", *module_lines, ""]
+        if stats:
+            lines.append(f"📊 **{labels[2]}:**")
+            if "ergonomics" in stats:
+                lines.append(f"   - {labels[3]}: {stats['ergonomics']}")
+            if "recoil_vertical" in stats:
+                lines.append(f"   - {labels[4]}: {stats['recoil_vertical']}")
+            if "recoil_horizontal" in stats:
+                lines.append(f"   - {labels[5]}: {stats['recoil_horizontal']}")
+            lines.append("")
+        lines.append(f"💰 **{labels[6]}:** {total_cost:,}₽")
+        if reasoning:
+            lines += ["", f"💡 **{labels[7]}:** {reasoning}"]
+        
+        return "\n".join(lines)
+    
+    # Structured JSON-mode generation
+    
+    async def _generate_structured_build(
+        self,
+        intent: str,
+        context: Dict,
+        user_id: int,
+        language: str
+    ) -> Optional[Dict]:
+        """
+        Generate build using Ollama JSON mode with schema validation.
+        
+        Module IDs from the response are resolved against the weapon's slot
+        catalog. Invalid output gets a single repair pass instead of a full
+        regeneration. Cost and stats are computed from catalog data, not
+        taken from the LLM.
+        
+        Returns:
+            Build dict in the same shape as generate_build_with_ai, or None
+        """
+        weapon_data = await self.api.get_weapon_details(context["weapon_id"])
+        if not weapon_data:
+            return None
+        
+        catalog = self._build_item_catalog(weapon_data)
+        if not catalog["items"]:
+            return None
+        
+        context_str = await self._build_context_for_intent(
+            intent, context, user_id, language, include_ids=True
+        )
+        prompt = self._create_structured_prompt(intent, context, context_str, language)
+        
+        response = await self._call_ollama(prompt, response_format=self.BUILD_RESPONSE_SCHEMA)
+        if not response:
+            return None
+        
+        data, modules, errors = self._validate_structured_build(response, catalog, context)
+        
+        if errors:
+            logger.info(f"Structured build has {len(errors)} problem(s), running repair pass: {errors}")
+            repair_prompt = self._create_repair_prompt(response, errors, context_str, language)
+            repaired = await self._call_ollama(repair_prompt, response_format=self.BUILD_RESPONSE_SCHEMA)
+            if repaired:
+                repaired_data, repaired_modules, repaired_errors = self._validate_structured_build(
+                    repaired, catalog, context
+                )
+                # A response that parses beats one that doesn't, whatever the error counts
+                if repaired_data is not None and (data is None or len(repaired_errors) <= len(errors)):
+                    data, modules, errors = repaired_data, repaired_modules, repaired_errors
+        
+        if data is None:
+            return None
+        
+        if errors:
+            # Unknown IDs, duplicate slots and modules the user can't buy are
+            # already left out of modules;
+            # what remains to enforce is the tier and the budget
+            if not context.get("target_tier") and data.get("tier") not in self.TIER_DISTRIBUTION:
+                logger.warning(f"Structured build rejected after repair, invalid tier: {errors}")
+                return None
+            modules = self._trim_to_budget(modules, context.get("budget"))
+            logger.warning(f"Structured build still had problems after repair, dropped invalid modules: {errors}")
+        
+        if not modules:
+            return None
+        
+        return self._assemble_structured_build(intent, weapon_data, data, modules, context, language)
+    
+    def _trim_to_budget(self, modules: List[Dict], budget: Optional[int]) -> List[Dict]:
+        """Drop the most expensive modules until the modules fit the budget."""
+        if not budget:
+            return modules
+        by_price = sorted(modules, key=lambda entry: self._item_price(entry["item"]))
+        modules_cost = sum(self._item_price(entry["item"]) for entry in by_price)
+        while by_price and modules_cost > budget:
+            modules_cost -= self._item_price(by_price.pop()["item"])
+        kept = {id(entry) for entry in by_price}
+        return [entry for entry in modules if id(entry) in kept]
+    
+    def _build_item_catalog(self, weapon_data: Dict) -> Dict:
+        """Index weapon slot items by ID and by lowercase name for resolution."""
+        items = {}
+        names = {}
+        slots = weapon_data.get("properties", {}).get("slots", []) or []
+        for slot in slots:
+            slot_name = slot.get("name") or slot.get("nameId") or "?"
+            for item in slot.get("filters", {}).get("allowedItems", []) or []:
+                item_id = item.get("id")
+                if not item_id or item_id in items:
+                    continue
+                items[item_id] = {"item": item, "slot": slot_name}
+                for key in (item.get("name"), item.get("shortName")):
+                    if key:
+                        names.setdefault(key.strip().lower(), item_id)
+        return {"items": items, "names": names}
+    
+    def _validate_structured_build(
+        self,
+        response: str,
+        catalog: Dict,
+        context: Dict
+    ) -> Tuple[Optional[Dict], List[Dict], List[str]]:
+        """
+        Validate JSON build response against schema and item catalog.
+        
+        Modules not purchasable at the request's trader levels (or only on
+        flea when flea is off) are reported and left out.
+        
+        Returns:
+            Tuple of (parsed data or None, resolved catalog entries, list of problems)
+        """
+        try:
+            data = json.loads(response)
+        except (TypeError, ValueError) as e:
+            return None, [], [f"response is not valid JSON: {e}"]
+        
+        if not isinstance(data, dict):
+            return None, [], ["response must be a JSON object"]
+        
+        errors = []
+        if data.get("tier") not in self.TIER_DISTRIBUTION:
+            errors.append(f"tier must be one of S/A/B/C/D, got {data.get('tier')!r}")
+        if not isinstance(data.get("reasoning"), str) or not data["reasoning"].strip():
+            errors.append("reasoning must be a non-empty string")
+        
+        raw_modules = data.get("modules")
+        if not isinstance(raw_modules, list) or not raw_modules:
+            errors.append("modules must be a non-empty array")
+            raw_modules = []
+        
+        # Modules must be purchasable within the limits the prompt states
+        purchase_config = self._purchase_config(context)
+        
+        resolved = []
+        used_slots = set()
+        for entry in raw_modules:
+            if not isinstance(entry, dict):
+                errors.append(f"module entry must be an object, got {entry!r}")
+                continue
+            
+            item_id = str(entry.get("id") or "").strip()
+            entry_name = str(entry.get("name") or "").strip()
+            resolved_id = item_id if item_id in catalog["items"] else catalog["names"].get(entry_name.lower())
+            if not resolved_id:
+                errors.append(f"unknown module id {item_id!r} ({entry_name or 'no name'}) - use an id listed in context")
+                continue
+            
+            catalog_entry = catalog["items"][resolved_id]
+            if purchase_config and self.build_generator._get_module_offer(catalog_entry["item"], purchase_config) is None:
+                errors.append(
+                    f"module {resolved_id!r} ({catalog_entry['item'].get('name')}) can't be bought "
+                    f"at the allowed trader levels{'' if purchase_config.allow_flea else ' without flea market'}"
+                )
+                continue
+            
+            if catalog_entry["slot"] in used_slots:
+                errors.append(f"slot {catalog_entry['slot']!r} has more than one module")
+                continue
+            
+            used_slots.add(catalog_entry["slot"])
+            resolved.append(catalog_entry)
+        
+        budget = context.get("budget")
+        if budget and resolved:
+            modules_cost = sum(self._item_price(entry["item"]) for entry in resolved)
+            if modules_cost > budget:
+                errors.append(f"modules cost {modules_cost:,} exceeds budget {budget:,}")
+        
+        return data, resolved, errors
+    
+    def _purchase_config(self, context: Dict) -> Optional[BuildGeneratorConfig]:
+        """
+        Trader levels and flea rule of the request, or None if anything goes.
+        
+        Without trader_levels every trader counts as fully unlocked.
+        """
+        trader_levels = context.get("trader_levels")
+        use_flea = context.get("use_flea_market", True)
+        if not trader_levels and use_flea:
+            return None
+        if not trader_levels:
+            from utils.constants import DEFAULT_TRADER_LEVELS
+            trader_levels = {name: MAX_LOYALTY_LEVEL for name in DEFAULT_TRADER_LEVELS}
+        return BuildGeneratorConfig(
+            budget=context.get("budget") or 0,
+            trader_levels={name.lower(): level for name, level in trader_levels.items()},
+            allow_flea=use_flea
+        )
+    
+    def _item_price(self, item: Dict) -> int:
+        """Cheapest trader price in rubles, falling back to 24h flea average."""
+        trader_prices = [
+            offer.get("priceRUB") for offer in item.get("buyFor", []) or []
+            if offer.get("priceRUB") and offer.get("vendor", {}).get("name") != "Flea Market"
+        ]
+        if trader_prices:
+            return min(trader_prices)
+        return item.get("avg24hPrice", 0) or 0
+    
+    def _item_source(self, item: Dict, language: str) -> str:
+        """Describe where an item is bought (first trader offer or flea)."""
+        from utils.localization_helpers import localize_trader_name
+        
+        for offer in item.get("buyFor", []) or []:
+            vendor_name = offer.get("vendor", {}).get("name", "")
+            if vendor_name and vendor_name != "Flea Market":
+                requirements = offer.get("requirements", []) or []
+                level = next((r.get("value") for r in requirements if r.get("type") == "loyaltyLevel"), 1)
+                trader = localize_trader_name(vendor_name, language) if language == "ru" else vendor_name
+                return f"{trader} LL{level}"
+        return "Барахолка" if language == "ru" else "Flea Market"
+    
+    def _assemble_structured_build(
+        self,
+        intent: str,
+        weapon_data: Dict,
+        data: Dict,
+        modules: List[Dict],
+        context: Dict,
+        language: str
+    ) -> Dict:
+        """Compute exact cost/stats from catalog data and render the build text."""
+        props = weapon_data.get("properties", {}) or {}
+        weapon_price = weapon_data.get("avg24hPrice", 0) or 0
+        
+        ergo_sum = 0
+        recoil_sum = 0.0
+        module_lines = []
+        modules_cost = 0
+        for i, entry in enumerate(modules, 1):
+            item = entry["item"]
+            price = self._item_price(item)
+            ergo, recoil = self.build_generator._get_module_modifiers(item)
+            ergo_sum += ergo
+            recoil_sum += recoil
+            modules_cost += price
+            
+            mods = []
+            if ergo:
+                mods.append(f"Ergo: {ergo:+g}")
+            if recoil:
+                mods.append(f"Recoil: {recoil:+.0f}%")
+            mods_str = f" ({', '.join(mods)})" if mods else ""
+            module_lines.append(
+                f"{i}. {item.get('name', 'Unknown')} - {self._item_source(item, language)} - {price:,}₽{mods_str}"
+            )
+        
+        stats = {}
+        if props.get("ergonomics") is not None:
+            stats["ergonomics"] = round(props["ergonomics"] + ergo_sum)
+        if props.get("recoilVertical") is not None:
+            stats["recoil_vertical"] = round(props["recoilVertical"] * (1 + recoil_sum / 100))
+        if props.get("recoilHorizontal") is not None:
+            stats["recoil_horizontal"] = round(props["recoilHorizontal"] * (1 + recoil_sum / 100))
+        
+        total_cost = weapon_price + modules_cost
+        weapon_name = context.get("weapon_name") or weapon_data.get("name", "Unknown")
+        description = (data.get("description") or "").strip()
+        reasoning = (data.get("reasoning") or "").strip()
+        
+        tier = context.get("target_tier") or data.get("tier")
+        return {
+            "text": self._render_build_text(
+                weapon_name, description, module_lines, stats, total_cost, reasoning, language
+            ),
+            "weapon": weapon_data.get("name"),
+            "modules": [
+                {"id": entry["item"].get("id"), "name": entry["item"].get("name"), "slot": entry["slot"]}
+                for entry in modules
+            ],
+            "stats": stats,
+            "total_cost": total_cost,
+            "reasoning": reasoning or None,
+            "intent": intent,
+            "tier": tier if tier in self.TIER_DISTRIBUTION else "B",
+            "structured": True
+        }
+    
+    def _create_structured_prompt(
+        self,
+        intent: str,
+        context: Dict,
+        context_str: str,
+        language: str
+    ) -> str:
+        """Create prompt for JSON-mode build generation."""
+        weapon_name = context.get("weapon_name", "weapon")
+        target_tier = context.get("target_tier")
+        budget = context.get("budget")
+        trader_levels = context.get("trader_levels")
+        use_flea = context.get("use_flea_market", True)
+        
+        constraints = []
+        if language == "ru":
+            goals = {
+                "meta_build": f"Создай оптимальную мета-сборку для {weapon_name}: минимальная отдача, высокая эргономика.",
+                "random_build": f"Создай креативную случайную сборку для {weapon_name}.",
+                "quest_build": f"Создай сборку для квеста {context.get('quest_name', '')}, выполняющую ВСЕ требования квеста.",
+            }
+            goal = goals.get(intent, f"Создай сборку для {weapon_name}.")
+            if target_tier:
+                constraints.append(f"- Сборка должна быть тира {target_tier}")
+            if budget:
+                constraints.append(f"- Сумма цен модулей не должна превышать {budget:,} ₽")
+            if trader_levels:
+                levels = ", ".join(f"{t.capitalize()} LL{l}" for t, l in trader_levels.items())
+                constraints.append(f"- Только модули, доступные на уровнях лояльности: {levels}")
+                if not use_flea:
+                    constraints.append("- НЕ используй барахолку")
+            constraints_str = "\n".join(constraints)
+            return f"""Ты — Никита Буянов, эксперт Escape from Tarkov.
+{goal}
+
+ПРАВИЛА:
+- Ответ — ТОЛЬКО JSON-объект по схеме: tier, description, modules[{{slot, id, name}}], reasoning
+- id модуля бери ТОЛЬКО из "(id: ...)" в контексте, не более одного модуля на слот
+- Модуль должен быть из списка своего слота
+- description и reasoning пиши на русском, 1-2 предложения
+{constraints_str}
+
+КОНТЕКСТ:
+{context_str}"""
+        
+        goals = {
+            "meta_build": f"Create an optimal meta build for {weapon_name}: minimal recoil, high ergonomics.",
+            "random_build": f"Create a creative random build for {weapon_name}.",
+            "quest_build": f"Create a build for quest {context.get('quest_name', '')} that meets ALL quest requirements.",
+        }
+        goal = goals.get(intent, f"Create a build for {weapon_name}.")
+        if target_tier:
+            constraints.append(f"- Build must be tier {target_tier}")
+        if budget:
+            constraints.append(f"- Total module price must not exceed {budget:,} ₽")
+        if trader_levels:
+            levels = ", ".join(f"{t.capitalize()} LL{l}" for t, l in trader_levels.items())
+            constraints.append(f"- Only modules available at loyalty levels: {levels}")
+            if not use_flea:
+                constraints.append("- DO NOT use the flea market")
+        constraints_str = "\n".join(constraints)
+        return f"""You are Nikita Buyanov, Escape from Tarkov expert.
+{goal}
+
+RULES:
+- Respond with ONLY a JSON object matching the schema: tier, description, modules[{{slot, id, name}}], reasoning
+- Take module ids ONLY from "(id: ...)" in the context, at most one module per slot
+- Each module must come from its own slot's list
+- Write description and reasoning in English, 1-2 sentences
+{constraints_str}
+
+CONTEXT:
+{context_str}"""
+    
+    def _create_repair_prompt(
+        self,
+        previous_response: str,
+        errors: List[str],
+        context_str: str,
+        language: str
+    ) -> str:
+        """Create prompt asking the LLM to fix an invalid JSON build."""
+        problems = "\n".join(f"- {e}" for e in errors)
+        if language == "ru":
+            return f"""Твой предыдущий JSON со сборкой содержит ошибки:
+{problems}
+
+Предыдущий ответ:
+{previous_response}
+
+Исправь ТОЛЬКО эти ошибки и верни полный исправленный JSON-объект. id модулей бери только из контекста.
+
+КОНТЕКСТ:
+{context_str}"""
+        return f"""Your previous build JSON has problems:
+{problems}
+
+Previous response:
+{previous_response}
+
+Fix ONLY these problems and return the full corrected JSON object. Take module ids only from the context.
+
+CONTEXT:
+{context_str}"""
+    
+    @traced("ollama.stream")
+    @timed_call("ollama_stream", failed=lambda text: text is None)
+    async def _stream_ollama(
+        self,
+        prompt: str,
+        on_chunk: Callable[[str], Awaitable[None]]
+    ) -> Optional[str]:
+        """
+        Call Ollama with streaming enabled.
+        
+        Args:
+            prompt: Prompt text
+            on_chunk: Callback receiving the accumulated text after each chunk
+            
+        Returns:
+            Full generated text or None on error
+        """
+        self._llm_inflight += 1
+        try:
+            import aiohttp
+            
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "max_tokens": 512
+                }
+            }
+            
+            text = ""
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f"{self.ollama_url}/api/generate",
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=60)
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"Ollama API error {response.status}: {error_text}")
+                        return None
+                    
+                    # Ollama streams newline-delimited JSON objects
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        piece = chunk.get("response", "")
+                        if piece:
+                            text += piece
+                            try:
+                                await on_chunk(text)
+                            except Exception as e:
+                                logger.debug(f"Progress callback failed: {e}")
+                        if chunk.get("done"):
+                            break
+            
+            return text
+        
+        except Exception as e:
+            logger.error(f"Error streaming from Ollama: {e}", exc_info=True)
+            return None
+        finally:
+            self._llm_inflight -= 1
+    
     def _parse_build_response(self, response: str, language: str) -> Dict:
         """Parse LLM response into structured build data."""
         build_data = {
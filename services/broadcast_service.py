@@ -0,0 +1,376 @@
+"""Background broadcast engine with rate limiting and resumable progress."""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+from keyboards import get_admin_keyboard
+
+from .activity_tracker import day_number
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket limiter shared by all broadcast senders."""
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second (messages per second)
+            capacity: Maximum burst size (defaults to rate)
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for a while (Telegram asked us to back off)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+        # Refill starts when the pause ends, not from before it (no burst on resume)
+        self._updated = self._paused_until
+
+
+class BroadcastService:
+    """Runs broadcasts as background jobs.
+
+    Messages are sent by a bounded pool of concurrent senders behind a global
+    token bucket (Telegram allows ~30 msg/s per bot). RetryAfter pauses all
+    senders, users who blocked the bot are remembered and skipped next time,
+    and progress is checkpointed to SQLite after every chunk so an interrupted
+    broadcast resumes where it stopped after a restart.
+    """
+
+    # Keep some headroom below Telegram's ~30 messages/second global limit
+    DEFAULT_RATE = 25
+    DEFAULT_CONCURRENCY = 8
+    # Checkpoint granularity: after a crash at most one chunk is sent again
+    CHUNK_SIZE = 100
+    MAX_RETRIES = 3
+    PROGRESS_INTERVAL = 5.0
+
+    # Running jobs by id (class-level so tasks are never garbage collected
+    # and the same job cannot be started twice)
+    _active_jobs: Dict[int, asyncio.Task] = {}
+
+    def __init__(self, bot: Bot, db, rate: float = DEFAULT_RATE, concurrency: int = DEFAULT_CONCURRENCY):
+        """
+        Initialize broadcast service.
+
+        Args:
+            bot: Bot instance used for sending
+            db: Database instance
+            rate: Maximum messages per second
+            concurrency: Number of concurrent senders
+        """
+        self.bot = bot
+        self.db = db
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+
+    async def create_job(
+        self,
+        audience: str,
+        text_content: str,
+        media_type: Optional[str],
+        media_file_id: Optional[str],
+        admin_chat_id: int,
+        progress_message_id: int
+    ) -> int:
+        """
+        Store a new broadcast job.
+
+        Args:
+            audience: "all" or "active"
+            text_content: Message text or media caption
+            media_type: photo/video/document or None for text only
+            media_file_id: Telegram file id of the media
+            admin_chat_id: Chat to report progress to
+            progress_message_id: Message edited with live progress
+
+        Returns:
+            Job id
+        """
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            cursor = await conn.execute("""
+                INSERT INTO broadcasts (
+                    audience, text_content, media_type, media_file_id,
+                    admin_chat_id, progress_message_id, status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, 'running', ?)
+            """, (
+                audience, text_content, media_type, media_file_id,
+                admin_chat_id, progress_message_id, int(time.time())
+            ))
+            await conn.commit()
+            return cursor.lastrowid
+
+    def start(self, job_id: int) -> bool:
+        """
+        Run broadcast job in background.
+
+        Returns:
+            False if the job is already running
+        """
+        if job_id in self._active_jobs:
+            return False
+
+        task = asyncio.create_task(self._run(job_id))
+        self._active_jobs[job_id] = task
+        task.add_done_callback(lambda _: self._active_jobs.pop(job_id, None))
+        return True
+
+    async def resume_unfinished(self) -> int:
+        """
+        Resume broadcasts interrupted by a restart.
+
+        Returns:
+            Number of resumed jobs
+        """
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            async with conn.execute("SELECT id FROM broadcasts WHERE status = 'running'") as cursor:
+                job_ids = [row[0] for row in await cursor.fetchall()]
+
+        for job_id in job_ids:
+            logger.info(f"📢 Resuming broadcast #{job_id}")
+            self.start(job_id)
+        return len(job_ids)
+
+    async def _get_job(self, job_id: int) -> Optional[Dict]:
+        """Load broadcast job row."""
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            conn.row_factory = aiosqlite.Row
+            async with conn.execute("SELECT * FROM broadcasts WHERE id = ?", (job_id,)) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+    async def _get_recipients(self, audience: str, after_user_id: int, limit: int) -> List[int]:
+        """Get next chunk of recipients after checkpoint, skipping blocked users."""
+        query = """
+            SELECT user_id FROM users
+            WHERE user_id > ?
+              AND user_id NOT IN (SELECT user_id FROM blocked_users)
+        """
+        params = [after_user_id]
+
+        if audience != "all":
+            query += " AND user_id IN (SELECT user_id FROM user_activity_days WHERE day >= ?)"
+            params.append(day_number() - 6)
+
+        query += " ORDER BY user_id LIMIT ?"
+        params.append(limit)
+
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            async with conn.execute(query, params) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+
+    async def _count_recipients(self, audience: str, after_user_id: int = 0) -> int:
+        """Count recipients of a broadcast after checkpoint."""
+        query = """
+            SELECT COUNT(*) FROM users
+            WHERE user_id > ?
+              AND user_id NOT IN (SELECT user_id FROM blocked_users)
+        """
+        params = [after_user_id]
+
+        if audience != "all":
+            query += " AND user_id IN (SELECT user_id FROM user_activity_days WHERE day >= ?)"
+            params.append(day_number() - 6)
+
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            async with conn.execute(query, params) as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def _save_checkpoint(self, job_id: int, last_user_id: int, stats: Dict, blocked_ids: List[int]):
+        """Persist progress and newly blocked users in one transaction."""
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            await conn.execute("""
+                UPDATE broadcasts
+                SET last_user_id = ?, sent_count = ?, failed_count = ?, blocked_count = ?
+                WHERE id = ?
+            """, (last_user_id, stats["sent"], stats["failed"], stats["blocked"], job_id))
+
+            if blocked_ids:
+                now = int(time.time())
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO blocked_users (user_id, blocked_at) VALUES (?, ?)",
+                    [(user_id, now) for user_id in blocked_ids]
+                )
+            await conn.commit()
+
+    async def _finish_job(self, job_id: int, status: str):
+        """Mark broadcast job as finished."""
+        async with aiosqlite.connect(self.db.db_path) as conn:
+            await conn.execute(
+                "UPDATE broadcasts SET status = ?, finished_at = ? WHERE id = ?",
+                (status, int(time.time()), job_id)
+            )
+            await conn.commit()
+
+    async def _send_one(self, job: Dict, user_id: int) -> str:
+        """
+        Send broadcast to one user.
+
+        Returns:
+            "sent", "blocked" or "failed"
+        """
+        text_content = job["text_content"] or ""
+        media_type = job["media_type"]
+        media_file_id = job["media_file_id"]
+
+        for attempt in range(self.MAX_RETRIES):
+            await self.bucket.acquire()
+            try:
+                if media_type and media_file_id:
+                    if media_type == "photo":
+                        await self.bot.send_photo(user_id, photo=media_file_id, caption=text_content, parse_mode="HTML")
+                    elif media_type == "video":
+                        await self.bot.send_video(user_id, video=media_file_id, caption=text_content, parse_mode="HTML")
+                    elif media_type == "document":
+                        await self.bot.send_document(user_id, document=media_file_id, caption=text_content, parse_mode="HTML")
+                else:
+                    await self.bot.send_message(user_id, text=text_content, parse_mode="HTML")
+                return "sent"
+            except TelegramRetryAfter as e:
+                logger.warning(f"Broadcast flood control, pausing for {e.retry_after}s")
+                self.bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                # Bot blocked by user or account deactivated
+                return "blocked"
+            except TelegramBadRequest as e:
+                if "chat not found" in str(e).lower():
+                    return "blocked"
+                logger.error(f"Failed to send broadcast to {user_id}: {e}")
+                return "failed"
+            except Exception as e:
+                logger.error(f"Failed to send broadcast to {user_id}: {e}")
+                return "failed"
+
+        return "failed"
+
+    async def _run(self, job_id: int):
+        """Send broadcast chunk by chunk, checkpointing after each chunk."""
+        job = await self._get_job(job_id)
+        if not job:
+            return
+
+        stats = {
+            "sent": job["sent_count"] or 0,
+            "failed": job["failed_count"] or 0,
+            "blocked": job["blocked_count"] or 0
+        }
+        last_user_id = job["last_user_id"] or 0
+        # Already processed recipients (when resuming) + remaining ones
+        total = sum(stats.values()) + await self._count_recipients(job["audience"], last_user_id)
+
+        started = time.monotonic()
+        last_progress = 0.0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(user_id: int):
+            async with semaphore:
+                return user_id, await self._send_one(job, user_id)
+
+        try:
+            while True:
+                user_ids = await self._get_recipients(job["audience"], last_user_id, self.CHUNK_SIZE)
+                if not user_ids:
+                    break
+
+                results = await asyncio.gather(*(send(user_id) for user_id in user_ids))
+
+                blocked_ids = []
+                for user_id, result in results:
+                    stats[result] += 1
+                    if result == "blocked":
+                        blocked_ids.append(user_id)
+
+                last_user_id = user_ids[-1]
+                await self._save_checkpoint(job_id, last_user_id, stats, blocked_ids)
+
+                if time.monotonic() - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    await self._report_progress(job, stats, total, started)
+
+            await self._finish_job(job_id, "done")
+            await self._report_progress(job, stats, total, started, finished=True)
+            logger.info(
+                f"📢 Broadcast #{job_id} finished: {stats['sent']} sent, "
+                f"{stats['blocked']} blocked, {stats['failed']} failed"
+            )
+        except asyncio.CancelledError:
+            # Shutdown: job stays 'running' and resumes from checkpoint
+            logger.info(f"Broadcast #{job_id} interrupted at user {last_user_id}")
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast #{job_id} failed: {e}", exc_info=True)
+            await self._finish_job(job_id, "failed")
+
+    async def _report_progress(self, job: Dict, stats: Dict, total: int, started: float, finished: bool = False):
+        """Edit admin's progress message."""
+        processed = stats["sent"] + stats["failed"] + stats["blocked"]
+        elapsed = time.monotonic() - started
+
+        if finished:
+            text = (
+                f"✅ <b>Рассылка завершена!</b>\n\n"
+                f"📊 Результаты:\n"
+                f"├ Отправлено: {stats['sent']}\n"
+                f"├ Заблокировали бота: {stats['blocked']}\n"
+                f"└ Ошибок: {stats['failed']}\n\n"
+                f"⏱ Время: {int(elapsed)} сек."
+            )
+            reply_markup = get_admin_keyboard()
+        else:
+            percent = processed / total * 100 if total else 100
+            text = (
+                f"📤 <b>Отправка рассылки...</b>\n\n"
+                f"Прогресс: {processed}/{total} ({percent:.0f}%)\n"
+                f"├ Отправлено: {stats['sent']}\n"
+                f"├ Заблокировали бота: {stats['blocked']}\n"
+                f"└ Ошибок: {stats['failed']}"
+            )
+            reply_markup = None
+
+        try:
+            await self.bot.edit_message_text(
+                text,
+                chat_id=job["admin_chat_id"],
+                message_id=job["progress_message_id"],
+                reply_markup=reply_markup,
+                parse_mode="HTML"
+            )
+        except Exception as e:
+            logger.debug(f"Could not update broadcast progress: {e}")
+
+    def cancel_all(self):
+        """Cancel running broadcasts (they resume from checkpoint on next start)."""
+        for task in list(self._active_jobs.values()):
+            task.cancel()
@@ -6,6 +6,43 @@ from typing import Dict, List, Optional, Tuple
 from database.models import Weapon, Module, Build, User
 
 
+# Build display layout per language, assembled once at import
+DISPLAY_LABELS = {
+    "ru": {
+        "weapon_not_found": "❌ Оружие не найдено",
+        "base_weapon": "🔫 **Базовое оружие**: ",
+        "modules": "\n🔧 **Модули:**\n",
+        "characteristics": "\n📊 **Характеристики:**\n",
+        "stats": (
+            ("caliber", "  - Калибр: {}\n"),
+            ("ergonomics", "  - Эргономика: {}\n"),
+            ("recoil_vertical", "  - Отдача (верт): {}\n"),
+            ("recoil_horizontal", "  - Отдача (гор): {}\n"),
+            ("fire_rate", "  - Скорострельность: {} в/м\n"),
+            ("velocity", "  - Скорость пули: {} м/с\n"),
+        ),
+        "cost": "\n💰 **Стоимость**: {} ₽\n",
+        "loyalty": "🛒 **Доступно при лояльности**: {} Lvl {}\n",
+    },
+    "en": {
+        "weapon_not_found": "❌ Weapon not found",
+        "base_weapon": "🔫 **Base Weapon**: ",
+        "modules": "\n🔧 **Modules:**\n",
+        "characteristics": "\n📊 **Characteristics:**\n",
+        "stats": (
+            ("caliber", "  - Caliber: {}\n"),
+            ("ergonomics", "  - Ergonomics: {}\n"),
+            ("recoil_vertical", "  - Recoil (vert): {}\n"),
+            ("recoil_horizontal", "  - Recoil (hor): {}\n"),
+            ("fire_rate", "  - Fire Rate: {} RPM\n"),
+            ("velocity", "  - Velocity: {} m/s\n"),
+        ),
+        "cost": "\n💰 **Cost**: {} ₽\n",
+        "loyalty": "🛒 **Available at loyalty**: {} Lvl {}\n",
+    },
+}
+
+
 class BuildFormatter:
     """Service for formatting weapon builds according to v2.0 specifications."""
     
@@ -17,7 +54,9 @@ class BuildFormatter:
         self, 
         build: Build, 
         user: User,
-        include_modules: bool = True
+        include_modules: bool = True,
+        weapon: Optional[Weapon] = None,
+        modules: Optional[List[Module]] = None
     ) -> str:
         """
         Format a complete build for display according to v2.0 specification.
@@ -33,17 +72,25 @@ class BuildFormatter:
           - Скорость пули: Z м/с
         💰 Стоимость: N руб.
         🛒 Доступно при лояльности: [Торговец] Lvl X
+        
+        Args:
+            build: Build to display
+            user: Viewing user (for language)
+            include_modules: Whether to list modules
+            weapon: Already loaded build weapon (loaded from DB if None)
+            modules: Already loaded build modules (loaded from DB if None)
         """
         language = user.language
+        labels = DISPLAY_LABELS.get(language, DISPLAY_LABELS["en"])
         
         # Get weapon data
-        weapon = await self.db.get_weapon_by_id(build.weapon_id)
+        if weapon is None:
+            weapon = await self.db.get_weapon_by_id(build.weapon_id)
         if not weapon:
-            return "❌ Оружие не найдено" if language == "ru" else "❌ Weapon not found"
+            return labels["weapon_not_found"]
         
-        # Start building the text
         weapon_name = weapon.name_ru if language == "ru" else weapon.name_en
-        text = f"🔫 **Базовое оружие**: {weapon_name}\n" if language == "ru" else f"🔫 **Base Weapon**: {weapon_name}\n"
+        parts = [labels["base_weapon"], weapon_name, "\n"]
         
         total_cost = weapon.base_price or weapon.flea_price or 0
         min_loyalty_level = 1
@@ -51,17 +98,17 @@ class BuildFormatter:
         
         # Add modules if requested and available
         if include_modules and build.modules:
-            modules = await self.db.get_modules_by_ids(build.modules)
+            if modules is None:
+                modules = await self.db.get_modules_by_ids(build.modules)
             if modules:
-                text += "\n🔧 **Модули:**\n" if language == "ru" else "\n🔧 **Modules:**\n"
+                parts.append(labels["modules"])
                 
                 for module in modules:
                     module_name = module.name_ru if language == "ru" else module.name_en
-                    text += f"  - **{module.slot_type}**: {module_name}\n"
+                    parts.append(f"  - **{module.slot_type}**: {module_name}\n")
                     
                     # Add to total cost
-                    module_price = module.flea_price or module.price or 0
-                    total_cost += module_price
+                    total_cost += module.flea_price or module.price or 0
                     
                     # Track highest loyalty requirement
                     if module.loyalty_level > min_loyalty_level:
@@ -69,35 +116,21 @@ class BuildFormatter:
                         required_trader = module.trader
         
         # Add weapon characteristics
-        text += "\n📊 **Характеристики:**\n" if language == "ru" else "\n📊 **Characteristics:**\n"
-        
-        if weapon.caliber:
-            text += f"  - Калибр: {weapon.caliber}\n" if language == "ru" else f"  - Caliber: {weapon.caliber}\n"
+        parts.append(labels["characteristics"])
         
-        if weapon.ergonomics:
-            text += f"  - Эргономика: {weapon.ergonomics}\n" if language == "ru" else f"  - Ergonomics: {weapon.ergonomics}\n"
-        
-        if weapon.recoil_vertical:
-            text += f"  - Отдача (верт): {weapon.recoil_vertical}\n" if language == "ru" else f"  - Recoil (vert): {weapon.recoil_vertical}\n"
-        
-        if weapon.recoil_horizontal:
-            text += f"  - Отдача (гор): {weapon.recoil_horizontal}\n" if language == "ru" else f"  - Recoil (hor): {weapon.recoil_horizontal}\n"
-        
-        if weapon.fire_rate:
-            text += f"  - Скорострельность: {weapon.fire_rate} в/м\n" if language == "ru" else f"  - Fire Rate: {weapon.fire_rate} RPM\n"
-        
-        # Add velocity if available (new field)
-        if hasattr(weapon, 'velocity') and weapon.velocity:
-            text += f"  - Скорость пули: {weapon.velocity} м/с\n" if language == "ru" else f"  - Velocity: {weapon.velocity} m/s\n"
+        for attr, label in labels["stats"]:
+            value = getattr(weapon, attr, None)
+            if value:
+                parts.append(label.format(value))
         
         # Add cost information
-        text += f"\n💰 **Стоимость**: {total_cost:,} ₽\n".replace(",", " ") if language == "ru" else f"\n💰 **Cost**: {total_cost:,} ₽\n".replace(",", " ")
+        parts.append(labels["cost"].format(f"{total_cost:,}".replace(",", " ")))
         
         # Add trader loyalty requirement
         if min_loyalty_level > 1 and required_trader:
-            text += f"🛒 **Доступно при лояльности**: {required_trader} Lvl {min_loyalty_level}\n" if language == "ru" else f"🛒 **Available at loyalty**: {required_trader} Lvl {min_loyalty_level}\n"
+            parts.append(labels["loyalty"].format(required_trader, min_loyalty_level))
         
-        return text
+        return "".join(parts)
     
     async def format_weapon_search_result(
         self, 
@@ -6,6 +6,8 @@ from database import TierRating
 from api_clients import TarkovAPIClient
 from .compatibility_checker import CompatibilityChecker
 from .tier_evaluator import TierEvaluator
+from .loyalty_index import offer_mask, user_loyalty_mask
+from utils.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,8 @@ class BuildGeneratorConfig:
         use_flea_only: bool = False,
         weapon_type: Optional[str] = None,
         prioritize_ergonomics: bool = False,
-        prioritize_recoil: bool = True
+        prioritize_recoil: bool = True,
+        allow_flea: bool = True
     ):
         self.budget = budget
         self.trader_levels = trader_levels
@@ -27,6 +30,15 @@ class BuildGeneratorConfig:
         self.weapon_type = weapon_type
         self.prioritize_ergonomics = prioritize_ergonomics
         self.prioritize_recoil = prioritize_recoil
+        self.allow_flea = allow_flea
+        self._loyalty_mask: Optional[int] = None
+    
+    @property
+    def loyalty_mask(self) -> int:
+        """(trader, level) bits unlocked by trader_levels; traders not listed are unavailable."""
+        if self._loyalty_mask is None:
+            self._loyalty_mask = user_loyalty_mask(self.trader_levels, default_level=0)
+        return self._loyalty_mask
 
 
 class GeneratedBuild:
@@ -61,6 +73,12 @@ class GeneratedBuild:
 class BuildGenerator:
     """Service for dynamic weapon build generation."""
     
+    # Module selection strategies for the deterministic optimizer, from the
+    # strongest build to the cheapest. Each one is evaluated and the result
+    # whose tier matches the target is returned.
+    OPTIMIZER_STRATEGIES = ("best", "value", "budget")
+    TIER_ORDER = ("S", "A", "B", "C", "D")
+    
     def __init__(
         self, 
         api_client: TarkovAPIClient,
@@ -70,6 +88,8 @@ class BuildGenerator:
         self.api = api_client
         self.compatibility = compatibility_checker
         self.tier_eval = tier_evaluator
+        # Module id -> OR of its (trader, level) offer bits
+        self._module_masks: Dict[str, int] = {}
     
     async def generate_random_build(
         self,
@@ -371,6 +391,247 @@ class BuildGenerator:
             available_from=available_from
         )
     
+    async def generate_optimized_build(
+        self,
+        weapon_id: str,
+        config: BuildGeneratorConfig,
+        target_tier: Optional[str] = None
+    ) -> Optional[GeneratedBuild]:
+        """
+        Deterministically choose modules for a weapon under budget and loyalty constraints.
+        
+        Unlike generate_build_for_weapon this does not pick at random: every
+        candidate is priced from its buyFor offers at the configured trader
+        levels, the budget is never exceeded, and the returned tier comes
+        from TierEvaluator rather than being guessed.
+        
+        Only the weapon's own slots are filled. Slots of the chosen modules
+        (handguard -> foregrip, mount -> sight) are not explored: weapon
+        details don't include mod slots, and the random generators have
+        the same limit.
+        
+        Args:
+            weapon_id: Tarkov.dev API weapon ID
+            config: Build generation configuration
+            target_tier: Desired tier (S/A/B/C/D); closest achievable tier is used
+            
+        Returns:
+            GeneratedBuild or None if no valid build exists
+        """
+        weapon_data = await self.api.get_weapon_details(weapon_id)
+        if not weapon_data:
+            logger.warning(f"Could not fetch weapon details for {weapon_id}")
+            return None
+        
+        slots = await self.compatibility.get_weapon_slots(weapon_id)
+        if not slots:
+            logger.warning(f"No slots found for weapon {weapon_id}")
+            return None
+        
+        weapon_price = weapon_data.get("avg24hPrice", 0) or 0
+        if config.budget and config.budget > 0:
+            modules_budget = config.budget - weapon_price
+            if modules_budget < 0:
+                logger.warning(f"Weapon price {weapon_price} exceeds budget {config.budget}")
+                return None
+        else:
+            modules_budget = None
+        
+        # Price every purchasable candidate once; strategies only re-rank them
+        with span("build_generator.price_candidates", slots=len(slots)):
+            slot_candidates = []
+            for slot in slots:
+                filters = slot.get("filters", {}) or {}
+                excluded_ids = {item.get("id") for item in filters.get("excludedItems", []) or []}
+                candidates = []
+                for module in filters.get("allowedItems", []) or []:
+                    if not module.get("id") or module.get("id") in excluded_ids:
+                        continue
+                    offer = self._get_module_offer(module, config)
+                    if offer is None:
+                        continue
+                    ergo, recoil = self._get_module_modifiers(module)
+                    candidates.append((module, offer[0], ergo, recoil))
+                if candidates:
+                    slot_candidates.append((slot, candidates))
+        
+        best_build = None
+        best_distance = None
+        with span("build_generator.strategies"):
+            for strategy in self.OPTIMIZER_STRATEGIES:
+                build = self._build_with_strategy(
+                    weapon_data, slots, slot_candidates, modules_budget, config, strategy
+                )
+                if build is None:
+                    continue
+                if not target_tier:
+                    return build
+                distance = abs(
+                    self.TIER_ORDER.index(build.tier_rating.value) - self.TIER_ORDER.index(target_tier)
+                )
+                if best_distance is None or distance < best_distance:
+                    best_build, best_distance = build, distance
+                if distance == 0:
+                    break
+        
+        return best_build
+    
+    def _build_with_strategy(
+        self,
+        weapon_data: Dict,
+        slots: List[Dict],
+        slot_candidates: List[Tuple[Dict, List[Tuple[Dict, int, float, float]]]],
+        modules_budget: Optional[int],
+        config: BuildGeneratorConfig,
+        strategy: str
+    ) -> Optional[GeneratedBuild]:
+        """Greedy per-slot selection for one optimizer strategy."""
+        ergo_weight = 2.0 if config.prioritize_ergonomics else 1.0
+        recoil_weight = 2.0 if config.prioritize_recoil else 1.0
+        
+        def gain(candidate) -> float:
+            _, _, ergo, recoil = candidate
+            return ergo * ergo_weight - recoil * recoil_weight
+        
+        def rank(candidate) -> Tuple:
+            module, price, _, _ = candidate
+            if strategy == "best":
+                return (-gain(candidate), price, module.get("id"))
+            if strategy == "value":
+                return (-(gain(candidate) / max(price, 1)), price, module.get("id"))
+            return (price, -gain(candidate), module.get("id"))
+        
+        required = [sc for sc in slot_candidates if sc[0].get("required", False)]
+        optional = [sc for sc in slot_candidates if not sc[0].get("required", False)]
+        if strategy == "budget":
+            # Cheapest strategy only fills mandatory slots
+            optional = []
+        else:
+            # Spend on the slots with the largest potential improvement first
+            optional.sort(key=lambda sc: (-max(gain(c) for c in sc[1]), sc[0].get("nameId") or ""))
+        
+        # Reserve money for the cheapest option of every required slot
+        reserve = sum(min(c[1] for c in candidates) for _, candidates in required)
+        if modules_budget is not None and reserve > modules_budget:
+            return None
+        
+        selected = {}
+        spent = 0
+        for slot, candidates in required + optional:
+            is_required = slot.get("required", False)
+            if is_required:
+                reserve -= min(c[1] for c in candidates)
+            available = None if modules_budget is None else modules_budget - spent - reserve
+            
+            for candidate in sorted(candidates, key=rank):
+                module, price, _, _ = candidate
+                if available is not None and price > available:
+                    continue
+                if not is_required and strategy != "best" and gain(candidate) <= 0:
+                    break
+                selected[slot.get("nameId") or slot.get("name")] = module
+                spent += price
+                break
+        
+        base_props = weapon_data.get("properties", {}) or {}
+        final_ergo, final_recoil_v, final_recoil_h = self._calculate_optimized_stats(base_props, selected)
+        
+        slot_names = list(selected.keys())
+        required_slot_names = [s.get("nameId") or s.get("name") for s in slots if s.get("required", False)]
+        weapon_price = weapon_data.get("avg24hPrice", 0) or 0
+        total_cost = weapon_price + spent
+        
+        tier = self.tier_eval.evaluate_build(
+            ergonomics=final_ergo,
+            recoil_vertical=final_recoil_v,
+            recoil_horizontal=final_recoil_h,
+            total_cost=total_cost,
+            has_all_required_slots=all(name in selected for name in required_slot_names),
+            has_sight=any("sight" in n.lower() or "scope" in n.lower() for n in slot_names),
+            has_stock=any("stock" in n.lower() for n in slot_names),
+            has_grip=any("grip" in n.lower() or "pistol" in n.lower() for n in slot_names),
+            weapon_base_ergonomics=base_props.get("ergonomics"),
+            weapon_base_recoil=base_props.get("recoilVertical")
+        )
+        
+        return GeneratedBuild(
+            weapon_id=weapon_data.get("id"),
+            weapon_name=weapon_data.get("name", "Unknown"),
+            weapon_data=weapon_data,
+            modules=selected,
+            total_cost=total_cost,
+            remaining_budget=(modules_budget - spent) if modules_budget is not None else 999999999,
+            ergonomics=final_ergo,
+            recoil_vertical=final_recoil_v,
+            recoil_horizontal=final_recoil_h,
+            tier_rating=tier,
+            available_from=sorted({self._get_module_offer(m, config)[1] for m in selected.values()})
+        )
+    
+    def _get_module_offer(self, module: Dict, config: BuildGeneratorConfig) -> Optional[Tuple[int, str]]:
+        """
+        Cheapest purchasable offer for a module as (price in RUB, source name).
+        
+        Trader offers count only when the user's loyalty level for that trader
+        meets the offer requirement; flea is used when allowed or when the
+        config is flea-only. Returns None if the module can't be bought.
+        """
+        flea_price = module.get("avg24hPrice", 0) or 0
+        if config.use_flea_only:
+            return (flea_price, "Flea Market") if flea_price else None
+        
+        best = None
+        for offer in module.get("buyFor", []) or []:
+            vendor_name = offer.get("vendor", {}).get("name", "")
+            price = offer.get("priceRUB")
+            if not vendor_name or not price or vendor_name == "Flea Market":
+                continue
+            requirements = offer.get("requirements", []) or []
+            level = next((r.get("value") for r in requirements if r.get("type") == "loyaltyLevel"), 1)
+            if config.trader_levels.get(vendor_name.lower(), 0) < level:
+                continue
+            if best is None or price < best[0]:
+                best = (price, vendor_name)
+        
+        if config.allow_flea and flea_price and (best is None or flea_price < best[0]):
+            best = (flea_price, "Flea Market")
+        return best
+    
+    @staticmethod
+    def _get_module_modifiers(module: Dict) -> Tuple[float, float]:
+        """Ergonomics and recoil modifier (in percent) of a module."""
+        props = module.get("properties", {}) or {}
+        ergo = props.get("ergonomics", 0) or 0
+        recoil = props.get("recoilModifier", 0) or 0
+        # API may return the recoil modifier as a fraction
+        if -1 < recoil < 1:
+            recoil *= 100
+        return ergo, recoil
+    
+    def _calculate_optimized_stats(
+        self,
+        base_props: Dict,
+        modules: Dict[str, Dict]
+    ) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """Final ergonomics and recoil: ergo is additive, recoil modifiers scale base recoil."""
+        ergo_sum = 0
+        recoil_sum = 0
+        for module in modules.values():
+            ergo, recoil = self._get_module_modifiers(module)
+            ergo_sum += ergo
+            recoil_sum += recoil
+        
+        base_ergo = base_props.get("ergonomics")
+        base_recoil_v = base_props.get("recoilVertical")
+        base_recoil_h = base_props.get("recoilHorizontal")
+        recoil_factor = 1 + recoil_sum / 100
+        return (
+            round(base_ergo + ergo_sum) if base_ergo is not None else None,
+            round(base_recoil_v * recoil_factor) if base_recoil_v is not None else None,
+            round(base_recoil_h * recoil_factor) if base_recoil_h is not None else None
+        )
+    
+    @traced("build_generator.select_weapon")
     async def _select_weapon(
         self, 
         config: BuildGeneratorConfig,
@@ -473,6 +734,7 @@ class BuildGenerator:
         
         return random.choice(top_tier_weapons)
     
+    @traced("build_generator.select_module_for_slot")
     async def _select_module_for_slot(
         self,
         slot: Dict,
@@ -525,7 +787,7 @@ class BuildGenerator:
         if not config.use_flea_only:
             trader_available = [
                 m for m in affordable
-                if self._is_module_available(m, config.trader_levels)
+                if self._is_module_available(m, config)
             ]
         
         logger.debug(f"After loyalty filter: {len(trader_available)} modules")
@@ -565,20 +827,27 @@ class BuildGenerator:
         # Fallback to flea price
         return module.get("avg24hPrice", 0) or 0
     
-    def _is_module_available(self, module: Dict, trader_levels: Dict[str, int]) -> bool:
-        """Check if module is available from traders."""
-        sell_for = module.get("sellFor", [])
-        
-        for seller in sell_for:
-            vendor = seller.get("vendor", {})
-            vendor_name = vendor.get("normalizedName", "").lower()
-            min_level = vendor.get("minTraderLevel", 1)
-            
-            if vendor_name in trader_levels:
-                if trader_levels[vendor_name] >= min_level:
-                    return True
-        
-        return False
+    def _is_module_available(self, module: Dict, config: BuildGeneratorConfig) -> bool:
+        """Check if module is available from traders at the configured loyalty levels."""
+        return bool(self._get_module_mask(module) & config.loyalty_mask)
+    
+    def _get_module_mask(self, module: Dict) -> int:
+        """OR of (trader, level) bits of all trader offers of a module (cached per module id)."""
+        module_id = module.get("id")
+        mask = self._module_masks.get(module_id) if module_id else None
+        if mask is None:
+            mask = 0
+            # buyFor lists who sells the item; the loyalty level is an offer requirement
+            for offer in module.get("buyFor", []) or []:
+                vendor_name = offer.get("vendor", {}).get("name", "")
+                if not vendor_name or vendor_name == "Flea Market":
+                    continue
+                requirements = offer.get("requirements", []) or []
+                level = next((r.get("value") for r in requirements if r.get("type") == "loyaltyLevel"), 1)
+                mask |= offer_mask(vendor_name, level)
+            if module_id:
+                self._module_masks[module_id] = mask
+        return mask
     
     def _calculate_build_stats(
         self,
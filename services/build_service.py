@@ -4,6 +4,7 @@ import random
 from typing import List, Optional
 from database import Database, Build, BuildCategory, Module, Weapon
 from api_clients import TarkovAPIClient
+from .loyalty_index import LoyaltyIndex
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +12,17 @@ logger = logging.getLogger(__name__)
 class BuildService:
     """Service for weapon build operations."""
     
-    def __init__(self, db: Database, api_client: TarkovAPIClient):
+    def __init__(
+        self,
+        db: Database,
+        api_client: Optional[TarkovAPIClient],
+        loyalty_index: Optional[LoyaltyIndex] = None
+    ):
         self.db = db
         self.api = api_client
+        # Loyalty requirement masks of meta builds, built on first use and
+        # invalidated by SyncService when modules or builds change
+        self.loyalty_index = loyalty_index or LoyaltyIndex()
     
     async def get_build_with_details(self, build_id: int) -> Optional[dict]:
         """
@@ -35,6 +44,38 @@ class BuildService:
             "modules": modules
         }
     
+    async def load_details(self, builds: List[Build]) -> List[dict]:
+        """
+        Attach weapon and modules to builds in one batch.
+        
+        Collects weapon and module IDs across all builds and fetches each
+        table once instead of two queries per build.
+        
+        Args:
+            builds: Builds to load details for
+            
+        Returns:
+            List of dictionaries with build, weapon, and modules data
+        """
+        if not builds:
+            return []
+        
+        weapon_ids = {build.weapon_id for build in builds}
+        module_ids = {module_id for build in builds for module_id in build.modules}
+        
+        weapons_by_id = {w.id: w for w in await self.db.get_weapons_by_ids(weapon_ids)}
+        modules_by_id = {m.id: m for m in await self.db.get_modules_by_ids(module_ids)}
+        
+        return [
+            {
+                "build": build,
+                "weapon": weapons_by_id.get(build.weapon_id),
+                # Same order get_modules_by_ids() returns for a single build
+                "modules": [modules_by_id[i] for i in sorted(set(build.modules)) if i in modules_by_id]
+            }
+            for build in builds
+        ]
+    
     async def get_builds_for_weapon(
         self, 
         weapon_id: int, 
@@ -52,17 +93,7 @@ class BuildService:
         """
         builds = await self.db.get_builds_by_weapon(weapon_id, category)
         
-        result = []
-        for build in builds:
-            weapon = await self.db.get_weapon_by_id(build.weapon_id)
-            modules = await self.db.get_modules_by_ids(build.modules)
-            result.append({
-                "build": build,
-                "weapon": weapon,
-                "modules": modules
-            })
-        
-        return result
+        return await self.load_details(builds)
     
     async def get_random_build(self) -> Optional[dict]:
         """Get a random build with details."""
@@ -83,17 +114,7 @@ class BuildService:
         """Get all meta builds with details."""
         builds = await self.db.get_meta_builds()
         
-        result = []
-        for build in builds:
-            weapon = await self.db.get_weapon_by_id(build.weapon_id)
-            modules = await self.db.get_modules_by_ids(build.modules)
-            result.append({
-                "build": build,
-                "weapon": weapon,
-                "modules": modules
-            })
-        
-        return result
+        return await self.load_details(builds)
     
     async def generate_meta_build_from_preset(self, weapon_search: str, language: str = "ru"):
         """Generate meta build from weapon's best preset using API.
@@ -105,12 +126,10 @@ class BuildService:
         Returns:
             Dict with weapon, modules, and stats
         """
-        from api_clients import TarkovAPIClient
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        # Search for weapon
-        api = TarkovAPIClient()
+        # Shared client keeps its session and cache warm between requests;
+        # a temporary one is only created for standalone use (scripts)
+        api = self.api or TarkovAPIClient()
+        owns_api = self.api is None
         try:
             logger.info(f"Searching for weapon: {weapon_search}")
             
@@ -178,7 +197,12 @@ class BuildService:
             }}
             """
             
-            data = await api._make_graphql_request(search_query)
+            cache_key = f"meta_preset_{weapon_search.lower()}"
+            data = api._get_cached(cache_key)
+            if data is None:
+                data = await api._make_graphql_request(search_query)
+                if data and data.get('items'):
+                    api._set_cache(cache_key, data)
             
             if not data:
                 logger.error(f"No data returned from API for weapon: {weapon_search}")
@@ -225,11 +249,12 @@ class BuildService:
             modules = []
             total_cost = weapon_data.get('avg24hPrice', 0)
             
+            from services.quest_build_service import QuestBuildService
+            quest_service = QuestBuildService(api)
+            
             for item in contained_items:
                 item_data = item.get('item')
                 if item_data:
-                    from services.quest_build_service import QuestBuildService
-                    quest_service = QuestBuildService(api)
                     trader_info = quest_service._get_best_trader(item_data.get('buyFor', []))
                     
                     # Get slot name from item_to_slot mapping
@@ -261,23 +286,14 @@ class BuildService:
             logger.error(f"Error generating meta build for {weapon_search}: {e}", exc_info=True)
             return None
         finally:
-            await api.close()
+            if owns_api:
+                await api.close()
     
     async def get_quest_builds(self) -> List[dict]:
         """Get all quest builds with details."""
         builds = await self.db.get_quest_builds()
         
-        result = []
-        for build in builds:
-            weapon = await self.db.get_weapon_by_id(build.weapon_id)
-            modules = await self.db.get_modules_by_ids(build.modules)
-            result.append({
-                "build": build,
-                "weapon": weapon,
-                "modules": modules
-            })
-        
-        return result
+        return await self.load_details(builds)
     
     async def get_builds_by_loyalty(
         self, 
@@ -290,33 +306,13 @@ class BuildService:
             trader_levels: Dictionary of trader loyalty levels
             
         Returns:
-            List of available builds
+            List of available builds (bitmask check per build, see LoyaltyIndex)
         """
-        all_builds = await self.db.get_meta_builds()
-        available_builds = []
-        
-        for build in all_builds:
-            modules = await self.db.get_modules_by_ids(build.modules)
-            
-            # Check if all modules are available at user's loyalty levels
-            is_available = True
-            for module in modules:
-                trader_name_lower = module.trader.lower()
-                user_level = trader_levels.get(trader_name_lower, 1)
-                
-                if module.loyalty_level > user_level:
-                    is_available = False
-                    break
-            
-            if is_available:
-                weapon = await self.db.get_weapon_by_id(build.weapon_id)
-                available_builds.append({
-                    "build": build,
-                    "weapon": weapon,
-                    "modules": modules
-                })
+        if not self.loyalty_index.is_built:
+            self.loyalty_index.build(await self.load_details(await self.db.get_meta_builds()))
         
-        return available_builds
+        # Missing traders count as loyalty level 1
+        return self.loyalty_index.available(trader_levels, default_level=1)
     
     async def calculate_build_cost(self, module_ids: List[int]) -> int:
         """Calculate total cost of a build."""
@@ -0,0 +1,267 @@
+"""Process-wide service container shared by all handlers."""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from database import Database
+from api_clients import TarkovAPIClient
+from .weapon_service import WeaponService
+from .weapon_search import WeaponSearchIndex
+from .weapon_catalog import WeaponCatalog
+from .loyalty_index import LoyaltyIndex
+from .build_service import BuildService
+from .user_service import UserService
+from .sync_service import SyncService
+from .random_build_service import RandomBuildService
+from .admin_service import AdminService
+from .compatibility_checker import CompatibilityChecker
+from .tier_evaluator import TierEvaluator
+from .build_generator import BuildGenerator
+from .like_service import LikeService
+from .activity_tracker import ActivityTracker
+from utils.metrics import (
+    metrics, handler_duration, handler_errors, cache_entries, cache_hit_rate, pending_writes,
+    llm_inflight, fsm_sessions, build_sessions_count, build_sessions_bytes, instrument_methods,
+    start_metrics_server
+)
+from utils.card_renderer import build_card_cache
+from utils.session_cache import build_sessions
+from utils.tracing import Tracer, trace_methods
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Holds one instance of every service for the whole process.
+
+    The entrypoint builds the container once at startup and the update
+    middleware injects handler_data into every handler. Handlers therefore
+    share a single TarkovAPIClient (one aiohttp session, one warm cache)
+    and a single BuildGenerator instead of constructing their own.
+    """
+
+    # Core services injected into handlers under these names
+    INJECTED = (
+        "db",
+        "api_client",
+        "weapon_service",
+        "build_service",
+        "user_service",
+        "random_build_service",
+        "admin_service",
+        "compatibility_checker",
+        "tier_evaluator",
+        "build_generator",
+        "like_service",
+    )
+
+    def __init__(self, db: Database, api_client: Optional[TarkovAPIClient] = None):
+        """
+        Create core services.
+
+        Args:
+            db: Database instance
+            api_client: Shared API client (created if not given)
+        """
+        self.db = db
+        self.api_client = api_client or TarkovAPIClient()
+
+        self.weapon_search_index = WeaponSearchIndex()
+        self.weapon_catalog = WeaponCatalog()
+        self.weapon_service = WeaponService(db, self.api_client, self.weapon_search_index, self.weapon_catalog)
+        self.loyalty_index = LoyaltyIndex()
+        self.build_service = BuildService(db, self.api_client, self.loyalty_index)
+        self.user_service = UserService(db)
+        self.sync_service = SyncService(
+            db, self.api_client, self.weapon_search_index, self.weapon_catalog, self.loyalty_index
+        )
+        self.random_build_service = RandomBuildService(self.api_client)
+        self.activity_tracker = ActivityTracker(db)
+        self.admin_service = AdminService(db, self.activity_tracker)
+
+        self.compatibility_checker = CompatibilityChecker(self.api_client)
+        self.tier_evaluator = TierEvaluator()
+        self.build_generator = BuildGenerator(self.api_client, self.compatibility_checker, self.tier_evaluator)
+        self.like_service = LikeService(db)
+
+        # Optional services configured by the entrypoint (AI, news, broadcasts)
+        self._extra: Dict[str, Any] = {}
+        self._handler_data: Optional[Dict[str, Any]] = None
+        self._metrics_runner = None
+        self.tracer: Optional[Tracer] = None
+        # Dispatcher FSM storage, set by the entrypoint (session gauge)
+        self.fsm_storage = None
+
+    def register(self, name: str, service: Any):
+        """
+        Add a service created outside the container.
+
+        Args:
+            name: Handler argument name the service is injected as
+            service: Service instance (None if unavailable)
+        """
+        setattr(self, name, service)
+        self._extra[name] = service
+        self._handler_data = None
+
+    @property
+    def handler_data(self) -> Dict[str, Any]:
+        """Services to inject into handler data (built once, reused per update)."""
+        if self._handler_data is None:
+            data = {name: getattr(self, name) for name in self.INJECTED}
+            data.update(self._extra)
+            self._handler_data = data
+        return self._handler_data
+
+    async def trace_handler(self, handler, event, data: Dict[str, Any]):
+        """
+        Inner middleware: open a trace for the update (when tracing is enabled).
+
+        Spans of the API client, Database, build generator and AI services
+        called by the handler nest under it.
+        """
+        handler_object = data.get("handler")
+        if self.tracer is None or handler_object is None:
+            return await handler(event, data)
+
+        callback = handler_object.callback
+        from_user = data.get("event_from_user")
+        with self.tracer.trace(
+            f"{callback.__module__}.{callback.__name__}",
+            user_id=from_user.id if from_user else None,
+            event=type(event).__name__
+        ):
+            return await handler(event, data)
+
+    async def measure_handler(self, handler, event, data: Dict[str, Any]):
+        """
+        Inner middleware: record handler latency and errors.
+
+        The handler label is the module-qualified handler function name.
+        """
+        handler_object = data.get("handler")
+        if handler_object is None:
+            return await handler(event, data)
+
+        callback = handler_object.callback
+        name = f"{callback.__module__}.{callback.__name__}"
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_duration.observe(time.perf_counter() - start, name)
+
+    async def inject_user(self, handler, event, data: Dict[str, Any]):
+        """
+        Inner middleware: load the user once per update.
+
+        Only handlers that take a `user` argument trigger the lookup, so
+        /start can still tell new users apart and inline queries skip it.
+        The lookup is served from the Database user cache after the first hit.
+        """
+        handler_object = data.get("handler")
+        from_user = data.get("event_from_user")
+        if from_user and handler_object and "user" in handler_object.params:
+            data["user"] = await self.user_service.get_or_create_user(from_user.id)
+        return await handler(event, data)
+
+    async def track_activity(self, handler, event, data: Dict[str, Any]):
+        """
+        Inner middleware: log the update as an activity event.
+
+        The event type is the name of the handler that serves the update.
+        Only an in-memory append per update; the tracker writes events to
+        the database in batches.
+        """
+        from_user = data.get("event_from_user")
+        handler_object = data.get("handler")
+        if from_user:
+            event_name = handler_object.callback.__name__ if handler_object else "update"
+            self.activity_tracker.record(from_user.id, event_name)
+        return await handler(event, data)
+
+    async def collect_metrics(self):
+        """Update cache and session gauges (runs on /metrics scrape)."""
+        for cache_name, stats in (
+            ("user", self.db.user_cache.get_stats()),
+            ("build_card", build_card_cache.get_stats()),
+        ):
+            cache_entries.set(stats["entries"], cache_name)
+            cache_hit_rate.set(stats["hit_rate"], cache_name)
+        cache_entries.set(len(self.api_client.cache), "tarkov_api")
+        pending_writes.set(self.like_service.get_stats()["pending"], "likes")
+        pending_writes.set(self.activity_tracker.get_stats()["pending"], "activity_events")
+
+        session_stats = build_sessions.get_stats()
+        build_sessions_count.set(session_stats["sessions"])
+        build_sessions_bytes.set(session_stats["bytes"])
+        # MemoryStorage keeps no expiry, only SQLiteStorage can count live sessions
+        if hasattr(self.fsm_storage, "count_sessions"):
+            fsm_sessions.set(await self.fsm_storage.count_sessions())
+
+        ai_generation_service = self._extra.get("ai_generation_service")
+        if ai_generation_service is not None:
+            llm_inflight.set(ai_generation_service._llm_inflight)
+        news_service = self._extra.get("news_service")
+        if news_service is not None:
+            cache_entries.set(news_service.get_stats()["entries"], "news")
+        ai_assistant = self._extra.get("ai_assistant")
+        if ai_assistant is not None and ai_assistant.voice_transcriber is not None:
+            cache_entries.set(len(ai_assistant.voice_transcriber.cache), "voice_transcription")
+
+    async def start_metrics(self, host: str, port: int):
+        """
+        Time Database calls and serve metrics on http://host:port/metrics.
+
+        A bind failure (port in use, bad host) is logged and the bot runs
+        without metrics.
+
+        Args:
+            host: Interface to bind (127.0.0.1 keeps it local)
+            port: TCP port
+        """
+        try:
+            self._metrics_runner = await start_metrics_server(host, port)
+        except OSError as e:
+            logger.error(f"❌ Metrics endpoint not started on {host}:{port}: {e}")
+            return
+        instrument_methods(self.db)
+        metrics.add_collector(self.collect_metrics)
+
+    def enable_tracing(self, path: str, slow_threshold: float):
+        """
+        Trace updates and dump the ones slower than slow_threshold seconds.
+
+        Call after optional services are registered so AI calls are traced too.
+
+        Args:
+            path: JSONL file for slow traces
+            slow_threshold: Update duration in seconds that triggers a dump
+        """
+        self.tracer = Tracer(path, slow_threshold)
+        trace_methods(self.db, "db")
+        trace_methods(self.api_client, "tarkov_api")
+        trace_methods(self.compatibility_checker, "compatibility")
+        trace_methods(self.build_generator, "build_generator")
+        for name in ("ai_generation_service", "ai_assistant"):
+            service = self._extra.get(name)
+            if service is not None:
+                trace_methods(service, name)
+
+    def start_background_tasks(self):
+        """Start periodic jobs of core services (needs a running event loop)."""
+        self.like_service.start()
+        self.activity_tracker.start()
+    
+    async def close(self):
+        """Stop background jobs and close shared resources."""
+        await self.like_service.close()
+        await self.activity_tracker.close()
+        await self.api_client.close()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+            self._metrics_runner = None
+        self.tracer = None
@@ -53,13 +53,19 @@ class ContextBuilder:
         
         return context
     
-    async def build_modules_context(self, weapon_id: str, language: str = "ru") -> str:
+    async def build_modules_context(
+        self,
+        weapon_id: str,
+        language: str = "ru",
+        include_ids: bool = False
+    ) -> str:
         """
         Build context about available modules for a weapon.
         
         Args:
             weapon_id: Weapon ID to get modules for
             language: Language for names (ru/en)
+            include_ids: Append item IDs (for structured JSON output that references them)
             
         Returns:
             Formatted string with module information
@@ -132,8 +138,9 @@ class ContextBuilder:
                     stats.append(f"Recoil: {recoil_mod:+d}")
                 
                 stats_str = f" [{', '.join(stats)}]" if stats else ""
+                id_str = f" (id: {item_id})" if include_ids and item_id else ""
                 
-                context += f"  - {item_name} ({item_price:,} ₽, {trader_info}){stats_str}\n"
+                context += f"  - {item_name} ({item_price:,} ₽, {trader_info}){stats_str}{id_str}\n"
             
             if len(allowed_items) > 15:
                 context += f"  ... and {len(allowed_items) - 15} more compatible options\n"
@@ -0,0 +1,160 @@
+"""Deduplicated, batched likes for community builds."""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from database import Database
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class LikeService:
+    """Records who liked which build and writes likes in batches.
+
+    A Bloom filter over all (user_id, build_id) pairs of the build_likes
+    ledger answers "never liked" without touching the database, which is
+    the common case for a new like. Repeated taps are rejected from the
+    pending batch or from a bounded set of recently confirmed likes; only
+    a Bloom "maybe" for an older pair needs a ledger lookup. Accepted
+    likes are flushed every flush_interval seconds in one transaction.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        flush_interval: float = 5.0,
+        bloom_capacity: int = 1_000_000,
+        recent_size: int = 100_000
+    ):
+        """
+        Initialize like service.
+
+        Args:
+            db: Database instance
+            flush_interval: Seconds between batched writes
+            bloom_capacity: Expected number of likes in the ledger
+            recent_size: Number of recently confirmed likes kept for exact rejection
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.recent_size = recent_size
+        self._bloom = BloomFilter(capacity=bloom_capacity)
+        self._bloom_loaded = False
+        self._load_lock = asyncio.Lock()
+        self._pending: Set[Tuple[int, int]] = set()
+        # Batch being written by flush()
+        self._in_flight: Set[Tuple[int, int]] = set()
+        self._recent: "OrderedDict[Tuple[int, int], None]" = OrderedDict()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.ledger_lookups = 0
+
+    async def like(self, user_id: int, build_id: int) -> bool:
+        """
+        Like a build once per user.
+
+        Returns:
+            True if the like was accepted, False if the user already liked the build
+        """
+        key = (user_id, build_id)
+        if key in self._pending or key in self._in_flight or key in self._recent:
+            self.rejected += 1
+            return False
+
+        if not self._bloom_loaded:
+            await self._load_bloom()
+
+        if self._bloom.might_contain(key):
+            # Liked before or a false positive: ask the ledger
+            self.ledger_lookups += 1
+            liked = await self.db.has_build_like(user_id, build_id)
+            if liked or key in self._pending or key in self._in_flight:
+                self._remember(key)
+                self.rejected += 1
+                return False
+
+        self._bloom.add(key)
+        self._pending.add(key)
+        self.accepted += 1
+        return True
+
+    async def flush(self) -> Dict[int, int]:
+        """
+        Write pending likes to the ledger and update counters.
+
+        Returns:
+            Number of new likes per build ID
+        """
+        if not self._pending:
+            return {}
+
+        batch = self._in_flight = self._pending
+        self._pending = set()
+        try:
+            added = await self.db.add_build_likes(list(batch))
+        except Exception:
+            # Keep the batch for the next attempt
+            self._pending.update(batch)
+            raise
+        finally:
+            self._in_flight = set()
+
+        for key in batch:
+            self._remember(key)
+        logger.debug(f"👍 Flushed {len(batch)} likes ({sum(added.values())} new)")
+        return added
+
+    def start(self):
+        """Start periodic flushing."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop periodic flushing and write what is pending."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get like counters."""
+        return {
+            "pending": len(self._pending),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "ledger_lookups": self.ledger_lookups,
+        }
+
+    async def _flush_loop(self):
+        """Flush pending likes every flush_interval seconds."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing likes: {e}")
+
+    async def _load_bloom(self):
+        """Fill the Bloom filter from the ledger (once)."""
+        async with self._load_lock:
+            if self._bloom_loaded:
+                return
+            keys = await self.db.get_build_like_keys()
+            for key in keys:
+                self._bloom.add(key)
+            self._bloom_loaded = True
+            logger.info(f"👍 Like filter loaded: {len(keys)} likes")
+
+    def _remember(self, key: Tuple[int, int]):
+        """Remember a confirmed like for exact rejection of repeats."""
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
@@ -0,0 +1,109 @@
+"""Loyalty availability as bitmasks over (trader, loyalty level)."""
+import logging
+from typing import Dict, Iterable, List
+
+from database import Module
+from utils.constants import DEFAULT_TRADER_LEVELS
+
+logger = logging.getLogger(__name__)
+
+MAX_LOYALTY_LEVEL = 4
+
+# Trader name (lowercase) -> slot; every trader owns MAX_LOYALTY_LEVEL bits.
+# Unknown traders get the next free slot the first time they are seen.
+TRADER_SLOTS: Dict[str, int] = {name: i for i, name in enumerate(DEFAULT_TRADER_LEVELS)}
+
+
+def trader_slot(trader: str) -> int:
+    """Get bit slot of trader, registering it on first use."""
+    name = trader.lower()
+    slot = TRADER_SLOTS.get(name)
+    if slot is None:
+        slot = TRADER_SLOTS[name] = len(TRADER_SLOTS)
+    return slot
+
+
+def offer_mask(trader: str, loyalty_level: int) -> int:
+    """Bit for "purchasable from trader at loyalty_level"."""
+    level = min(max(loyalty_level or 1, 1), MAX_LOYALTY_LEVEL)
+    return 1 << (trader_slot(trader) * MAX_LOYALTY_LEVEL + level - 1)
+
+
+def user_loyalty_mask(trader_levels: Dict[str, int], default_level: int = 1) -> int:
+    """
+    Bits of every (trader, level) the user has unlocked.
+
+    Args:
+        trader_levels: User's trader levels (lowercase trader names)
+        default_level: Level assumed for traders missing from trader_levels
+            (0 = trader not available at all)
+    """
+    for name in trader_levels:
+        trader_slot(name)
+
+    mask = 0
+    for name, slot in TRADER_SLOTS.items():
+        level = min(trader_levels.get(name, default_level) or 0, MAX_LOYALTY_LEVEL)
+        if level > 0:
+            # Levels 1..level of this trader
+            mask |= ((1 << level) - 1) << (slot * MAX_LOYALTY_LEVEL)
+    return mask
+
+
+def module_mask(module: Module) -> int:
+    """Requirement bit of a database module (one trader offer)."""
+    return offer_mask(module.trader, module.loyalty_level)
+
+
+def build_requirement_mask(modules: Iterable[Module]) -> int:
+    """OR of module requirements: every bit must be unlocked to buy the build."""
+    mask = 0
+    for module in modules:
+        mask |= module_mask(module)
+    return mask
+
+
+def is_build_available(requirement_mask: int, user_mask: int) -> bool:
+    """Check that all required (trader, level) bits are unlocked."""
+    return not requirement_mask & ~user_mask
+
+
+class LoyaltyIndex:
+    """Precomputed loyalty requirement of every build.
+
+    Built once from loaded build details; filtering builds for a user is a
+    single pass of bitwise checks against the user's trader-level mask.
+    """
+
+    def __init__(self):
+        self._items: List[dict] = []
+        self._masks: List[int] = []
+        self._built = False
+
+    @property
+    def is_built(self) -> bool:
+        """Check if index was built since the last invalidation."""
+        return self._built
+
+    def invalidate(self):
+        """Drop index (builds or modules changed); rebuilt on next use."""
+        self._built = False
+        self._items = []
+        self._masks = []
+
+    def build(self, builds: List[dict]):
+        """
+        Rebuild index.
+
+        Args:
+            builds: Build details dicts (build, weapon, modules)
+        """
+        self._items = list(builds)
+        self._masks = [build_requirement_mask(item["modules"]) for item in self._items]
+        self._built = True
+        logger.info(f"🎖️ Loyalty index built: {len(self._items)} builds")
+
+    def available(self, trader_levels: Dict[str, int], default_level: int = 1) -> List[dict]:
+        """Get builds whose modules are all purchasable at trader_levels."""
+        blocked = ~user_loyalty_mask(trader_levels, default_level)
+        return [item for item, mask in zip(self._items, self._masks) if not mask & blocked]
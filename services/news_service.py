@@ -1,6 +1,7 @@
 """Service for fetching Escape from Tarkov news."""
 import logging
 import asyncio
+import time
 import aiohttp
 import feedparser
 from typing import List, Dict, Optional
@@ -10,7 +11,12 @@ logger = logging.getLogger(__name__)
 
 
 class NewsService:
-    """Service for fetching and formatting EFT news."""
+    """Service for fetching and formatting EFT news.
+    
+    News are kept in memory and refreshed on a background schedule, so
+    handlers read them without network I/O. RSSHub instances are raced
+    (hedged requests) and feeds are fetched with conditional GET.
+    """
     
     # RSSHub instances for Telegram channel
     RSSHUB_INSTANCES = [
@@ -24,8 +30,30 @@ class NewsService:
     # VK RSS feed (backup)
     VK_RSS_URL = "https://vk.com/rss/escapefromtarkov"
     
+    # Background refresh interval (seconds)
+    REFRESH_INTERVAL = 15 * 60
+    # Delay before the next RSSHub instance joins the race (seconds)
+    HEDGE_DELAY = 1.5
+    # Timeout for a single feed request (seconds)
+    REQUEST_TIMEOUT = 10
+    # Number of news items kept per language
+    CACHE_LIMIT = 30
+    # Requests don't wait on the network again for this long after all feeds failed (seconds)
+    FAILURE_BACKOFF = 5 * 60
+    
+    LANGUAGES = ("ru", "en")
+    
     def __init__(self):
         self._session: Optional[aiohttp.ClientSession] = None
+        self._news: Dict[str, List[Dict]] = {}
+        self._updated_at: Dict[str, float] = {}
+        # Time of the last refresh in which every feed failed, per language
+        self._failed_at: Dict[str, float] = {}
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        # Conditional GET state: url -> (ETag, Last-Modified) and last parsed entries
+        self._validators: Dict[str, tuple] = {}
+        self._feed_entries: Dict[str, list] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -34,14 +62,87 @@ class NewsService:
         return self._session
     
     async def close(self):
-        """Close the session."""
+        """Stop background refresh and close the session."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
         if self._session and not self._session.closed:
             await self._session.close()
     
+    def start_background_refresh(self):
+        """Start periodic news refresh for all languages."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def _refresh_loop(self):
+        """Refresh news cache every REFRESH_INTERVAL seconds."""
+        while True:
+            for lang in self.LANGUAGES:
+                try:
+                    await self.refresh(lang)
+                except Exception as e:
+                    logger.error(f"Error refreshing {lang} news: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+    
+    async def refresh(self, lang: str = "ru", force: bool = True) -> bool:
+        """
+        Fetch news for a language and update the cache.
+        
+        Args:
+            lang: Language (ru/en)
+            force: Fetch even if news are cached or all feeds failed recently
+            
+        Returns:
+            True if fresh news were stored
+        """
+        lock = self._refresh_locks.setdefault(lang, asyncio.Lock())
+        async with lock:
+            # Callers queued behind a refresh that just finished don't fetch again
+            if not force and (lang in self._news or self._in_backoff(lang)):
+                return False
+            
+            # Try Telegram RSS first (primary source)
+            news = await self._fetch_telegram_news(self.CACHE_LIMIT, lang)
+            if news:
+                logger.info(f"✅ Fetched {len(news)} news items from Telegram")
+            else:
+                # Try VK RSS as fallback
+                news = await self._fetch_vk_news(self.CACHE_LIMIT)
+                if news:
+                    logger.info(f"✅ Fetched {len(news)} news items from VK")
+            
+            if not news:
+                self._failed_at[lang] = time.time()
+                return False
+            
+            self._news[lang] = news
+            self._updated_at[lang] = time.time()
+            self._failed_at.pop(lang, None)
+            return True
+    
+    def _in_backoff(self, lang: str) -> bool:
+        """Whether all feeds failed for a language less than FAILURE_BACKOFF ago."""
+        failed_at = self._failed_at.get(lang)
+        return failed_at is not None and time.time() - failed_at < self.FAILURE_BACKOFF
+    
+    def get_stats(self) -> Dict:
+        """Get news cache statistics."""
+        return {
+            "entries": sum(len(items) for items in self._news.values()),
+            "languages": len(self._news),
+        }
+    
     async def get_latest_news(self, lang: str = "ru", limit: int = 5) -> List[Dict]:
         """
         Get latest Escape from Tarkov news from Telegram or VK RSS.
         
+        Served from memory; only a cold cache waits for the network, and not
+        again within FAILURE_BACKOFF after all feeds failed.
+        
         Args:
             lang: Language (ru/en)
             limit: Maximum number of news items to return
@@ -49,120 +150,167 @@ class NewsService:
         Returns:
             List of news items
         """
-        # Try Telegram RSS first (primary source)
-        tg_news = await self._fetch_telegram_news(limit, lang)
-        if tg_news:
-            logger.info(f"✅ Fetched {len(tg_news)} news items from Telegram")
-            return tg_news
+        if lang not in self._news and not self._in_backoff(lang):
+            await self.refresh(lang, force=False)
         
-        # Try VK RSS as fallback
-        vk_news = await self._fetch_vk_news(limit)
-        if vk_news:
-            logger.info(f"✅ Fetched {len(vk_news)} news items from VK")
-            return vk_news
+        news = self._news.get(lang)
+        if news:
+            return news[:limit]
         
         # All feeds failed - return fallback
         logger.error("❌ All RSS feeds failed, using fallback sources")
         return self._get_fallback_news(lang)
     
+    async def _fetch_feed(self, url: str, headers: Optional[Dict] = None) -> list:
+        """
+        Fetch and parse RSS feed with conditional GET.
+        
+        Args:
+            url: Feed URL
+            headers: Extra request headers
+            
+        Returns:
+            Feed entries (cached entries on 304 Not Modified)
+            
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: On network errors
+        """
+        session = await self._get_session()
+        request_headers = dict(headers or {})
+        
+        etag, last_modified = self._validators.get(url, (None, None))
+        if etag:
+            request_headers["If-None-Match"] = etag
+        if last_modified:
+            request_headers["If-Modified-Since"] = last_modified
+        
+        async with session.get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT),
+            headers=request_headers
+        ) as response:
+            if response.status == 304 and url in self._feed_entries:
+                logger.info(f"Feed not modified: {url}")
+                return self._feed_entries[url]
+            
+            if response.status != 200:
+                logger.warning(f"{url} returned {response.status}")
+                return []
+            
+            content = await response.read()
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        
+        # feedparser is CPU-bound, keep it off the event loop
+        feed = await asyncio.to_thread(feedparser.parse, content)
+        
+        if feed.entries:
+            self._validators[url] = validators
+            self._feed_entries[url] = feed.entries
+        return feed.entries
+    
     async def _fetch_vk_news(self, limit: int) -> List[Dict]:
         """Fetch latest posts from VK RSS."""
         try:
-            session = await self._get_session()
             logger.info("Trying VK RSS feed")
+            entries = await self._fetch_feed(self.VK_RSS_URL)
             
-            async with session.get(
-                self.VK_RSS_URL,
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status != 200:
-                    logger.warning(f"VK RSS returned {response.status}")
-                    return []
-                
-                content = await response.text()
-                feed = feedparser.parse(content)
-                
-                if not feed.entries:
-                    logger.warning("No entries in VK RSS")
-                    return []
-                
-                # Format news items
-                news_items = []
-                for entry in feed.entries[:limit]:
-                    title = entry.get("title", "No title")
-                    description = self._clean_description(entry.get("description", entry.get("summary", "")))
-                    
-                    news_item = {
-                        "title": title[:100] + "..." if len(title) > 100 else title,
-                        "description": description,
-                        "link": entry.get("link", ""),
-                        "date": self._parse_date(entry.get("published", ""))
-                    }
-                    news_items.append(news_item)
+            if not entries:
+                logger.warning("No entries in VK RSS")
+                return []
+            
+            # Format news items
+            news_items = []
+            for entry in entries[:limit]:
+                title = entry.get("title", "No title")
+                description = self._clean_description(entry.get("description", entry.get("summary", "")))
                 
-                logger.info(f"Fetched {len(news_items)} posts from VK")
-                return news_items
+                news_item = {
+                    "title": title[:100] + "..." if len(title) > 100 else title,
+                    "description": description,
+                    "link": entry.get("link", ""),
+                    "date": self._parse_date(entry.get("published", ""))
+                }
+                news_items.append(news_item)
+            
+            logger.info(f"Fetched {len(news_items)} posts from VK")
+            return news_items
                 
         except Exception as e:
             logger.error(f"Error fetching VK RSS: {e}")
             return []
     
+    async def _fetch_from_instance(self, instance: str, channel: str, delay: float) -> list:
+        """Fetch Telegram channel feed from one RSSHub instance after a hedge delay."""
+        await asyncio.sleep(delay)
+        rss_url = f"{instance}/telegram/channel/{channel}"
+        logger.info(f"Trying RSSHub instance: {instance}")
+        
+        try:
+            entries = await self._fetch_feed(
+                rss_url,
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout fetching from {instance}")
+            return []
+        except Exception as e:
+            logger.warning(f"Error fetching from {instance}: {e}")
+            return []
+        
+        if not entries:
+            logger.warning(f"No entries from {instance}")
+        return entries
+    
     async def _fetch_telegram_news(self, limit: int, lang: str = "ru") -> List[Dict]:
-        """Fetch latest posts from Telegram RSS via multiple RSSHub instances."""
-        session = await self._get_session()
+        """
+        Fetch latest posts from Telegram RSS via multiple RSSHub instances.
         
+        Instances are raced: each next instance starts HEDGE_DELAY seconds
+        later and the first non-empty feed wins, the rest are cancelled.
+        """
         # Choose channel based on language
         channel = "escapefromtarkovEN" if lang == "en" else "escapefromtarkovRU"
         
-        # Try each RSSHub instance
-        for instance in self.RSSHUB_INSTANCES:
-            try:
-                rss_url = f"{instance}/telegram/channel/{channel}"
-                logger.info(f"Trying RSSHub instance: {instance}")
-                
-                async with session.get(
-                    rss_url,
-                    timeout=aiohttp.ClientTimeout(total=15),
-                    headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                ) as response:
-                    if response.status != 200:
-                        logger.warning(f"RSSHub {instance} returned {response.status}")
-                        continue
-                    
-                    content = await response.text()
-                    feed = feedparser.parse(content)
-                    
-                    if not feed.entries:
-                        logger.warning(f"No entries from {instance}")
-                        continue
-                    
-                    # Format news items
-                    news_items = []
-                    for entry in feed.entries[:limit]:
-                        title = entry.get("title", "No title")
-                        description = self._clean_description(entry.get("description", entry.get("summary", "")))
-                        
-                        news_item = {
-                            "title": title[:150] + "..." if len(title) > 150 else title,
-                            "description": description[:400] + "..." if len(description) > 400 else description,
-                            "link": entry.get("link", f"https://t.me/{channel}"),
-                            "date": self._parse_date(entry.get("published", ""))
-                        }
-                        news_items.append(news_item)
-                    
-                    logger.info(f"✅ Successfully fetched {len(news_items)} posts from {instance}")
-                    return news_items
-                    
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout fetching from {instance}")
-                continue
-            except Exception as e:
-                logger.warning(f"Error fetching from {instance}: {e}")
-                continue
+        pending = {
+            asyncio.create_task(self._fetch_from_instance(instance, channel, index * self.HEDGE_DELAY)): instance
+            for index, instance in enumerate(self.RSSHUB_INSTANCES)
+        }
         
-        logger.error("All RSSHub instances failed")
-        return []
-    
+        entries = []
+        winner = None
+        try:
+            while pending and not entries:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    instance = pending.pop(task)
+                    result = task.result()
+                    if result and not entries:
+                        entries = result
+                        winner = instance
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if not entries:
+            logger.error("All RSSHub instances failed")
+            return []
+        
+        # Format news items
+        news_items = []
+        for entry in entries[:limit]:
+            title = entry.get("title", "No title")
+            description = self._clean_description(entry.get("description", entry.get("summary", "")))
+            
+            news_item = {
+                "title": title[:150] + "..." if len(title) > 150 else title,
+                "description": description[:400] + "..." if len(description) > 400 else description,
+                "link": entry.get("link", f"https://t.me/{channel}"),
+                "date": self._parse_date(entry.get("published", ""))
+            }
+            news_items.append(news_item)
+        
+        logger.info(f"✅ Successfully fetched {len(news_items)} posts from {winner}")
+        return news_items
     
     def _get_fallback_news(self, lang: str) -> List[Dict]:
         """Return hardcoded fallback news sources."""
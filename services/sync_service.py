@@ -4,6 +4,7 @@ import aiosqlite
 from typing import Dict, List, Optional
 from database import Database, WeaponCategory
 from api_clients import TarkovAPIClient
+from utils.card_renderer import build_card_cache
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +42,14 @@ TRADER_EMOJIS = {
 class SyncService:
     """Service for syncing data from tarkov.dev API to local database."""
     
-    def __init__(self, db: Database, api_client: TarkovAPIClient):
+    def __init__(self, db: Database, api_client: TarkovAPIClient, search_index=None, catalog=None, loyalty_index=None):
         self.db = db
         self.api = api_client
+        # Optional WeaponSearchIndex and WeaponCatalog, rebuilt after weapons are synced
+        self.search_index = search_index
+        self.catalog = catalog
+        # Optional LoyaltyIndex, invalidated after modules or builds are synced
+        self.loyalty_index = loyalty_index
     
     async def sync_traders(self) -> int:
         """Sync traders from API to database."""
@@ -142,7 +148,18 @@ class SyncService:
             
             await conn.commit()
             logger.info(f"Synced {added_count} weapons with localization")
-            return added_count
+        
+        if self.search_index is not None or self.catalog is not None:
+            weapons = await self.db.get_all_weapons()
+            if self.search_index is not None:
+                self.search_index.build(weapons)
+            if self.catalog is not None:
+                self.catalog.build(weapons)
+        
+        # Weapon prices/stats changed, cached build cards are stale
+        build_card_cache.bump_price_version()
+        
+        return added_count
     
     async def sync_modules(self) -> int:
         """Sync weapon modules/attachments from API to database with localization."""
@@ -249,7 +266,11 @@ class SyncService:
             
             await conn.commit()
             logger.info(f"Synced {added_count} modules with localization")
-            return added_count
+        
+        build_card_cache.bump_price_version()
+        if self.loyalty_index is not None:
+            self.loyalty_index.invalidate()
+        return added_count
     
     async def sync_all(self) -> Dict[str, int]:
         """
@@ -275,6 +296,10 @@ class SyncService:
         logger.info("Loading quest builds...")
         quest_count = await self._load_quest_builds()
         results["quest_builds"] = quest_count
+        if quest_count:
+            build_card_cache.bump_price_version()
+            if self.loyalty_index is not None:
+                self.loyalty_index.invalidate()
         
         logger.info(f"Full sync completed: {results}")
         return results
@@ -0,0 +1,86 @@
+"""Precomputed weapon views (by category, by tier) rebuilt on every sync."""
+import logging
+from typing import Any, Callable, Dict, Hashable, List, Union
+
+from database import Weapon, WeaponCategory
+
+logger = logging.getLogger(__name__)
+
+
+class WeaponCatalog:
+    """Materialized weapon lists for the category and tier screens.
+
+    Built from one full weapons load after every weapon sync, so a tap on a
+    category or tier is a dict lookup. Rendered texts and keyboards can be
+    stored next to the views with rendered(); they are dropped on rebuild.
+    """
+
+    def __init__(self):
+        self._weapons: List[Weapon] = []
+        self._by_category: Dict[WeaponCategory, List[Weapon]] = {}
+        self._by_tier: Dict[str, List[Weapon]] = {}
+        self._rendered: Dict[Hashable, Any] = {}
+
+    @property
+    def is_built(self) -> bool:
+        """Check if views contain weapons."""
+        return bool(self._weapons)
+
+    def build(self, weapons: List[Weapon]):
+        """
+        Rebuild all views from weapon list.
+
+        Args:
+            weapons: All weapons from database
+        """
+        by_category: Dict[WeaponCategory, List[Weapon]] = {}
+        by_tier: Dict[str, List[Weapon]] = {}
+
+        for weapon in weapons:
+            by_category.setdefault(weapon.category, []).append(weapon)
+            if weapon.tier_rating:
+                by_tier.setdefault(weapon.tier_rating.value, []).append(weapon)
+
+        # Stable display order: tier lists grouped by category
+        for tier_weapons in by_tier.values():
+            tier_weapons.sort(key=lambda w: w.category.value)
+
+        self._weapons = list(weapons)
+        self._by_category = by_category
+        self._by_tier = by_tier
+        self._rendered = {}
+
+        logger.info(
+            f"📚 Weapon views built: {len(weapons)} weapons, "
+            f"{len(by_category)} categories, {len(by_tier)} tiers"
+        )
+
+    def all(self) -> List[Weapon]:
+        """Get all weapons."""
+        return self._weapons
+
+    def by_category(self, category: Union[WeaponCategory, str]) -> List[Weapon]:
+        """Get weapons of a category (accepts enum or its string value)."""
+        try:
+            return self._by_category.get(WeaponCategory(category), [])
+        except ValueError:
+            return []
+
+    def by_tier(self, tier: str) -> List[Weapon]:
+        """Get weapons of a tier (S, A, B, C, D)."""
+        return self._by_tier.get(tier, [])
+
+    def rendered(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """
+        Get pre-rendered value for key, rendering it on first use.
+
+        Args:
+            key: Cache key, e.g. ("tier", "S", "ru")
+            render: Builds the value from the current views
+
+        Returns:
+            Cached value (valid until the next rebuild)
+        """
+        if key not in self._rendered:
+            self._rendered[key] = render()
+        return self._rendered[key]
@@ -0,0 +1,174 @@
+"""In-memory weapon search index (prefix + fuzzy)."""
+import bisect
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+from database import Weapon
+
+logger = logging.getLogger(__name__)
+
+
+# Cyrillic -> Latin, so "ак74" and "ak74" produce the same key
+TRANSLIT_MAP = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "c", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+# Community nicknames -> part of the English weapon name they refer to
+WEAPON_ALIASES = {
+    "ксюха": "AKS-74U",
+    "ксюша": "AKS-74U",
+    "калаш": "AKM",
+    "весло": "AK-74",
+    "мосинка": "Mosin",
+    "мосин": "Mosin",
+    "винторез": "VSS",
+    "вал": "AS VAL",
+    "свд": "SVD",
+    "сайга": "Saiga",
+    "кедр": "PP-91",
+    "бизон": "PP-19-01",
+    "мр5": "MP5",
+    "м4": "M4A1",
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def make_search_key(text: str) -> str:
+    """
+    Normalize text to a search key.
+
+    Lowercase, transliterate Cyrillic and drop spaces, hyphens and
+    punctuation: "АК-74Н", "ak 74n" and "AK74N" all become "ak74n".
+    """
+    text = text.lower()
+    text = "".join(TRANSLIT_MAP.get(char, char) for char in text)
+    return _NON_ALNUM.sub("", text)
+
+
+class WeaponSearchIndex:
+    """Search index over all weapons, rebuilt after every weapon sync.
+
+    Each weapon gets several keys (RU/EN names, aliases) normalized with
+    make_search_key. Prefix lookups use a sorted key list with bisect and
+    fuzzy lookups use one RapidFuzz extract over the prebuilt choice list.
+    """
+
+    # Minimum RapidFuzz score for fuzzy matches
+    SCORE_CUTOFF = 75
+
+    def __init__(self):
+        self._weapons: List[Weapon] = []
+        # Parallel lists: search key -> weapon position in self._weapons
+        self._choices: List[str] = []
+        self._choice_weapons: List[int] = []
+        # Sorted (key, weapon position) pairs for prefix lookups
+        self._sorted_keys: List[Tuple[str, int]] = []
+
+    @property
+    def is_built(self) -> bool:
+        """Check if index contains weapons."""
+        return bool(self._weapons)
+
+    def build(self, weapons: List[Weapon]):
+        """
+        Build index from weapon list.
+
+        Args:
+            weapons: All weapons from database
+        """
+        choices = []
+        choice_weapons = []
+        seen = set()
+
+        alias_keys: Dict[str, List[str]] = {}
+        for alias, target in WEAPON_ALIASES.items():
+            alias_keys.setdefault(make_search_key(target), []).append(make_search_key(alias))
+
+        for position, weapon in enumerate(weapons):
+            keys = {make_search_key(weapon.name_ru), make_search_key(weapon.name_en)}
+            for target_key, aliases in alias_keys.items():
+                if target_key in keys or any(key.startswith(target_key) for key in keys):
+                    keys.update(aliases)
+
+            for key in keys:
+                if key and (key, position) not in seen:
+                    seen.add((key, position))
+                    choices.append(key)
+                    choice_weapons.append(position)
+
+        self._weapons = list(weapons)
+        self._choices = choices
+        self._choice_weapons = choice_weapons
+        self._sorted_keys = sorted(zip(choices, choice_weapons))
+
+        logger.info(f"🔎 Weapon search index built: {len(weapons)} weapons, {len(choices)} keys")
+
+    def _prefix_matches(self, key: str) -> List[int]:
+        """Get weapon positions whose keys start with key (shortest keys first)."""
+        start = bisect.bisect_left(self._sorted_keys, (key, -1))
+        matches = []
+        for index in range(start, len(self._sorted_keys)):
+            choice, position = self._sorted_keys[index]
+            if not choice.startswith(key):
+                break
+            matches.append((len(choice), choice, position))
+
+        matches.sort()
+        return [position for _, _, position in matches]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> List[Weapon]:
+        """
+        Search weapons by name, alias or abbreviation.
+
+        Exact and prefix matches come first, then fuzzy matches.
+
+        Args:
+            query: User's search text
+            limit: Maximum number of results
+            offset: Number of results to skip (pagination)
+
+        Returns:
+            Matching weapons ordered by relevance
+        """
+        key = make_search_key(query)
+        if not key or not self._weapons:
+            return []
+
+        wanted = offset + limit
+        positions: List[int] = []
+        seen = set()
+
+        for position in self._prefix_matches(key):
+            if position not in seen:
+                seen.add(position)
+                positions.append(position)
+
+        if len(positions) < wanted:
+            matches = process.extract(
+                key,
+                self._choices,
+                scorer=fuzz.WRatio,
+                processor=None,
+                limit=wanted * 3,
+                score_cutoff=self.SCORE_CUTOFF
+            )
+            for _, _, choice_index in matches:
+                position = self._choice_weapons[choice_index]
+                if position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+
+        return [self._weapons[position] for position in positions[offset:wanted]]
+
+    def best_match(self, query: str) -> Optional[Weapon]:
+        """Get single best matching weapon."""
+        results = self.search(query, limit=1)
+        return results[0] if results else None
@@ -3,6 +3,8 @@ import logging
 from typing import List, Optional
 from database import Database, Weapon, WeaponCategory
 from api_clients import TarkovAPIClient
+from .weapon_search import WeaponSearchIndex
+from .weapon_catalog import WeaponCatalog
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +12,37 @@ logger = logging.getLogger(__name__)
 class WeaponService:
     """Service for weapon operations."""
     
-    def __init__(self, db: Database, api_client: TarkovAPIClient):
+    def __init__(
+        self,
+        db: Database,
+        api_client: TarkovAPIClient,
+        search_index: Optional[WeaponSearchIndex] = None,
+        catalog: Optional[WeaponCatalog] = None
+    ):
         self.db = db
         self.api = api_client
+        # Shared index and views are rebuilt by SyncService after every weapon sync
+        self.search_index = search_index or WeaponSearchIndex()
+        self.catalog = catalog or WeaponCatalog()
+    
+    async def rebuild_search_index(self):
+        """Rebuild weapon search index and catalog views from database (one full load)."""
+        weapons = await self.db.get_all_weapons()
+        self.search_index.build(weapons)
+        self.catalog.build(weapons)
+    
+    async def get_catalog(self) -> WeaponCatalog:
+        """Get precomputed weapon views, loading them once if not built yet."""
+        if not self.catalog.is_built:
+            await self.rebuild_search_index()
+        return self.catalog
     
     async def search_weapons(self, query: str, language: str = "ru") -> List[Weapon]:
         """
-        Search weapons by name using API for full weapon list with localization.
-        Falls back to database if API fails.
+        Search weapons by RU/EN name, alias or abbreviation.
+        
+        Answered from the in-memory search index; the index is loaded from
+        the database only once if it hasn't been built yet.
         
         Args:
             query: Search term
@@ -26,54 +51,29 @@ class WeaponService:
         Returns:
             List of matching weapons
         """
-        # Try to get weapons from API for comprehensive search
-        try:
-            api_weapons = await self.api.get_all_weapons(lang=language)
-            if api_weapons:
-                query_lower = query.lower()
-                matching_weapons = []
-                
-                for api_weapon in api_weapons:
-                    weapon_name = api_weapon.get("name", "").lower()
-                    weapon_short = api_weapon.get("shortName", "").lower()
-                    weapon_normalized = api_weapon.get("normalizedName", "").lower()
-                    
-                    # Check if query matches name, shortName, or normalized name
-                    if (query_lower in weapon_name or 
-                        query_lower in weapon_short or 
-                        query_lower in weapon_normalized):
-                        
-                        # Try to find in database first
-                        db_weapons = await self.db.search_weapons(query, language)
-                        for db_weapon in db_weapons:
-                            # Match by name
-                            if (db_weapon.name_en.lower() == weapon_name or 
-                                db_weapon.name_ru.lower() == weapon_name or
-                                api_weapon.get("id") == str(db_weapon.id)):
-                                matching_weapons.append(db_weapon)
-                                break
-                
-                if matching_weapons:
-                    return matching_weapons[:10]  # Limit to 10 results
-        except Exception as e:
-            logger.error(f"Error searching weapons via API: {e}")
+        if not self.search_index.is_built:
+            await self.rebuild_search_index()
         
-        # Fallback to database search
-        return await self.db.search_weapons(query, language)
+        return self.search_index.search(query, limit=10)
     
     async def get_weapon_by_id(self, weapon_id: int) -> Optional[Weapon]:
         """Get weapon by ID."""
         return await self.db.get_weapon_by_id(weapon_id)
     
+    async def get_all_weapons(self) -> List[Weapon]:
+        """Get all weapons (from precomputed views)."""
+        catalog = await self.get_catalog()
+        return catalog.all()
+    
     async def get_weapons_by_category(self, category: WeaponCategory) -> List[Weapon]:
-        """Get all weapons in a specific category."""
-        all_weapons = await self.db.get_all_weapons()
-        return [w for w in all_weapons if w.category == category]
+        """Get all weapons in a specific category (from precomputed views)."""
+        catalog = await self.get_catalog()
+        return catalog.by_category(category)
     
     async def get_weapons_by_tier(self, tier_rating: str) -> List[Weapon]:
-        """Get weapons by tier rating (S, A, B, C, D)."""
-        all_weapons = await self.db.get_all_weapons()
-        return [w for w in all_weapons if w.tier_rating and w.tier_rating.value == tier_rating]
+        """Get weapons by tier rating (S, A, B, C, D) from precomputed views."""
+        catalog = await self.get_catalog()
+        return catalog.by_tier(tier_rating)
     
     async def get_weapon_stats(self, weapon_id: int) -> dict:
         """
@@ -461,13 +461,8 @@ async def start_bot():
     from aiogram import Bot, Dispatcher
     from aiogram.fsm.storage.memory import MemoryStorage
     from database.config import settings
-    from handlers import common, search, builds, loyalty, tier_list, settings as settings_handler, dynamic_builds, budget_constructor, quest_builds, meta_builds_handler, admin
-    from services.user_service import UserService
-    from services.build_service import BuildService
-    from services.random_build_service import RandomBuildService
-    from services.admin_service import AdminService
-    from api_clients import TarkovAPIClient
-    from services.weapon_service import WeaponService
+    from handlers import common, search, builds, loyalty, tier_list, settings as settings_handler, dynamic_builds, budget_constructor, quest_builds, meta_builds_handler, admin, inline
+    from services import ServiceContainer
     
     # Configure logging
     logging.basicConfig(
@@ -480,8 +475,14 @@ async def start_bot():
     from database import Database
     db = Database("data/eft_helper.db")
     
-    # Initialize API client once (shared across all requests)
-    api_client = TarkovAPIClient()
+    # Remove voice files left over from a previous run (e.g. after a crash)
+    from utils.constants import VOICE_TEMP_DIR
+    from utils.voice_transcriber import cleanup_temp_dir
+    cleanup_temp_dir(VOICE_TEMP_DIR, max_age_seconds=0)
+    
+    # All services are created once and shared across all updates
+    services = ServiceContainer(db)
+    api_client = services.api_client
     
     # v5.1 AI Services
     print("\n🤖 Инициализация AI-ассистента...")
@@ -489,24 +490,48 @@ async def start_bot():
     ai_generation_service = None
     context_builder = None
     news_service = None
+    voice_transcriber = None
     
     try:
         from services import AIAssistant, AIGenerationService, ContextBuilder, NewsService
         
         ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         ollama_model = os.getenv("OLLAMA_MODEL", "qwen3:8b")
+        structured_output = os.getenv("OLLAMA_STRUCTURED_OUTPUT", "1").lower() not in ("0", "false", "no")
+        hybrid_generation = os.getenv("OLLAMA_HYBRID_BUILDS", "1").lower() not in ("0", "false", "no")
         
         print(f"   Ollama: {ollama_url}")
         print(f"   Model: {ollama_model}")
         logger.info(f"Initializing AI services: Ollama at {ollama_url}, model {ollama_model}")
         
         news_service = NewsService()
+        news_service.start_background_refresh()
         print("   ✅ NewsService")
         context_builder = ContextBuilder(api_client, db)
         print("   ✅ ContextBuilder")
-        ai_generation_service = AIGenerationService(api_client, db, ollama_url, ollama_model)
+        ai_generation_service = AIGenerationService(
+            api_client, db, ollama_url, ollama_model, structured_output,
+            build_generator=services.build_generator,
+            hybrid_generation=hybrid_generation
+        )
         print("   ✅ AIGenerationService")
-        ai_assistant = AIAssistant(api_client, db, ai_generation_service, news_service)
+        # Voice transcription worker pool; the model is loaded here so the
+        # first voice message doesn't wait for it
+        from utils.voice_transcriber import VoiceTranscriber
+        from utils.constants import VOICE_CACHE_TTL_HOURS
+        voice_transcriber = VoiceTranscriber(
+            model_size=os.getenv("WHISPER_MODEL", "tiny"),
+            workers=int(os.getenv("WHISPER_WORKERS", "1")),
+            max_queue=int(os.getenv("WHISPER_QUEUE_SIZE", "4")),
+            vad_filter=os.getenv("WHISPER_VAD", "1").lower() not in ("0", "false", "no"),
+            cache_ttl_seconds=VOICE_CACHE_TTL_HOURS * 60 * 60
+        )
+        if await voice_transcriber.preload():
+            print("   ✅ Whisper")
+        ai_assistant = AIAssistant(
+            api_client, db, ai_generation_service, news_service,
+            voice_transcriber=voice_transcriber
+        )
         print("   ✅ AIAssistant")
         
         print("✅ AI-ассистент инициализирован!\n")
@@ -518,8 +543,27 @@ async def start_bot():
     
     # Initialize bot and dispatcher
     bot = Bot(token=settings.BOT_TOKEN)
-    storage = MemoryStorage()
+    if os.getenv("FSM_STORAGE", "sqlite").lower() == "memory":
+        storage = MemoryStorage()
+    else:
+        from database.fsm_storage import SQLiteStorage
+        storage = SQLiteStorage(
+            "data/eft_helper.db",
+            ttl_seconds=int(os.getenv("FSM_STATE_TTL_HOURS", "24")) * 60 * 60
+        )
     dp = Dispatcher(storage=storage)
+    services.fsm_storage = storage
+    
+    # Background broadcast engine (resumes interrupted broadcasts)
+    from services.broadcast_service import BroadcastService
+    broadcast_service = BroadcastService(bot, db)
+    await broadcast_service.resume_unfinished()
+    
+    services.register("broadcast_service", broadcast_service)
+    services.register("ai_assistant", ai_assistant)
+    services.register("ai_generation_service", ai_generation_service)
+    services.register("context_builder", context_builder)
+    services.register("news_service", news_service)
     
     # Register routers
     dp.include_router(common.router)
@@ -533,25 +577,28 @@ async def start_bot():
     dp.include_router(quest_builds.router)
     dp.include_router(meta_builds_handler.router)
     dp.include_router(admin.router)  # Admin panel
+    dp.include_router(inline.router)  # Inline weapon search
     
-    # Middleware to inject db and services into handlers
+    # Middleware to inject shared services into handlers (no per-update construction)
     @dp.update.outer_middleware()
     async def db_middleware(handler, event, data):
-        # Use the shared API client instead of creating a new one
-        data["db"] = db
-        data["user_service"] = UserService(db)
-        data["build_service"] = BuildService(db, api_client)
-        data["random_build_service"] = RandomBuildService(api_client)
-        data["admin_service"] = AdminService(db)
-        data["api_client"] = api_client
-        data["weapon_service"] = WeaponService(db, api_client)
-        # v5.1 AI services
-        data["ai_assistant"] = ai_assistant
-        data["ai_generation_service"] = ai_generation_service
-        data["context_builder"] = context_builder
-        data["news_service"] = news_service
+        data.update(services.handler_data)
         return await handler(event, data)
     
+    # Tracing and handler latency first, so they cover the other inner middlewares
+    dp.message.middleware(services.trace_handler)
+    dp.callback_query.middleware(services.trace_handler)
+    dp.inline_query.middleware(services.trace_handler)
+    dp.message.middleware(services.measure_handler)
+    dp.callback_query.middleware(services.measure_handler)
+    dp.inline_query.middleware(services.measure_handler)
+    # Per-update user context for handlers that take `user`
+    dp.message.middleware(services.inject_user)
+    dp.callback_query.middleware(services.inject_user)
+    dp.message.middleware(services.track_activity)
+    dp.callback_query.middleware(services.track_activity)
+    dp.inline_query.middleware(services.track_activity)
+    
     # Global error handler
     @dp.error()
     async def error_handler(event, **kwargs):
@@ -560,14 +607,30 @@ async def start_bot():
         return True
     
     logger.info("Bot starting...")
+    services.start_background_tasks()
+    
+    # Prometheus metrics (METRICS_PORT=0 disables)
+    metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+    if metrics_port:
+        await services.start_metrics(os.getenv("METRICS_HOST", "127.0.0.1"), metrics_port)
+    
+    # Slow updates are dumped as span trees to JSONL (TRACE_SLOW_MS=0 disables)
+    trace_slow_ms = int(os.getenv("TRACE_SLOW_MS", "5000"))
+    if trace_slow_ms:
+        services.enable_tracing(os.getenv("TRACE_FILE", "logs/slow_traces.jsonl"), trace_slow_ms / 1000)
     
     try:
         # Start polling
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
         # Clean up resources
+        broadcast_service.cancel_all()
         await bot.session.close()
-        await api_client.close()
+        await services.close()
+        if news_service:
+            await news_service.close()
+        if voice_transcriber:
+            voice_transcriber.shutdown()
         logger.info("Bot stopped")
 
 
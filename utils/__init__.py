@@ -1,9 +1,10 @@
 """Utils package for EFT Helper bot."""
-from .formatters import format_build_card, format_price, get_trader_emoji
+from .formatters import format_build_card, load_build_card, format_price, get_trader_emoji
 from .localization_helpers import localize_trader_name, localize_item_name, localize_quest_name
 
 __all__ = [
     "format_build_card", 
+    "load_build_card",
     "format_price", 
     "get_trader_emoji",
     "localize_trader_name",
@@ -0,0 +1,48 @@
+"""Bloom filter for fast "definitely not seen" checks."""
+import hashlib
+import math
+from typing import Hashable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter.
+
+    might_contain() never returns False for an added key; it returns True
+    for a key that was not added with probability ~error_rate while fewer
+    than capacity keys have been added.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Initialize filter.
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false positive rate at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: Hashable):
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: Hashable):
+        """Add key."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, key: Hashable) -> bool:
+        """Check key: False means the key was definitely never added."""
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.might_contain(key)
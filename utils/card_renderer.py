@@ -0,0 +1,449 @@
+"""Build card rendering: per-language compiled templates and a render cache."""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+from database import Build, BuildCategory, Module, UserBuild, Weapon
+from localization import get_text
+from .constants import TRADER_EMOJIS
+from .localization_helpers import localize_trader_name
+
+logger = logging.getLogger(__name__)
+
+CARD_LABELS = {
+    "ru": {
+        "base_weapon": "БАЗОВОЕ ОРУЖИЕ",
+        "category": "Категория",
+        "quest": "Квест",
+        "characteristics": "ХАРАКТЕРИСТИКИ ОРУЖИЯ",
+        "caliber": "Калибр",
+        "tier": "Tier рейтинг",
+        "base_price": "Базовая цена",
+        "flea_price": "Цена на барахолке",
+        "combat": "Боевые характеристики",
+        "ergonomics": "Эргономика",
+        "recoil_v": "Вертикальная отдача",
+        "recoil_h": "Горизонтальная отдача",
+        "recoil_sum": "Сумма отдачи",
+        "fire_rate": "Скорострельность",
+        "range": "Эффективная дальность",
+        "modules": "Модули и запчасти",
+        "required_ll": "Требуется LL",
+        "trader": "Торговец",
+        "flea": "Барахолка",
+        "min_loyalty": "Минимальный уровень лояльности",
+    },
+    "en": {
+        "base_weapon": "BASE WEAPON",
+        "category": "Category",
+        "quest": "Quest",
+        "characteristics": "WEAPON CHARACTERISTICS",
+        "caliber": "Caliber",
+        "tier": "Tier Rating",
+        "base_price": "Base Price",
+        "flea_price": "Flea Market Price",
+        "combat": "Combat Stats",
+        "ergonomics": "Ergonomics",
+        "recoil_v": "Vertical Recoil",
+        "recoil_h": "Horizontal Recoil",
+        "recoil_sum": "Total Recoil",
+        "fire_rate": "Fire Rate",
+        "range": "Effective Range",
+        "modules": "Modules & Parts",
+        "required_ll": "Required LL",
+        "trader": "Trader",
+        "flea": "Flea",
+        "min_loyalty": "Minimum loyalty level",
+    },
+}
+
+# Labels of generated (unsaved) build cards not covered by localization texts
+GENERATED_BUILD_LABELS = {
+    "ru": {
+        "more_modules": "и ещё {count} модулей",
+        "suggestions": "Рекомендации",
+    },
+    "en": {
+        "more_modules": "and {count} more modules",
+        "suggestions": "Suggestions",
+    },
+}
+
+TIER_EMOJIS = {"S": "🏆", "A": "🥇", "B": "🥈", "C": "🥉", "D": "📊"}
+
+SEPARATOR = "=" * 40 + "\n"
+
+
+class CardTemplate:
+    """Build card layout compiled for one language.
+
+    All static label fragments are assembled once, so rendering a card only
+    appends precomputed strings and values to a list and joins it.
+    """
+
+    def __init__(self, language: str):
+        self.language = language
+        labels = CARD_LABELS.get(language, CARD_LABELS["en"])
+
+        self.header = f"{SEPARATOR}🔫 **{labels['base_weapon']}:** **"
+        self.header_end = f"**\n{SEPARATOR}\n"
+        self.categories = {
+            category.value: f"📂 {labels['category']}: {get_text(f'category_{category.value}', language)}\n"
+            for category in BuildCategory
+        }
+        self.quest = f"📜 {labels['quest']}: "
+        self.characteristics = f"\n📊 **{labels['characteristics']}:**\n\n"
+        self.caliber = f"  • {labels['caliber']}: **"
+        self.tier = f"  • {labels['tier']}: "
+        self.base_price = f"  • {labels['base_price']}: "
+        self.flea_price = f"  • 🏪 {labels['flea_price']}: **"
+        self.combat = f"\n⚔️ **{labels['combat']}:**\n"
+        self.ergonomics = f"  • {labels['ergonomics']}: **"
+        self.recoil_v = f"  • {labels['recoil_v']}: **"
+        self.recoil_h = f"  • {labels['recoil_h']}: **"
+        self.recoil_sum = f"  • {labels['recoil_sum']}: **"
+        self.fire_rate = f"  • {labels['fire_rate']}: **"
+        self.range = f"  • {labels['range']}: **"
+        self.modules = f"🔧 **{labels['modules']}:**\n"
+        self.required_ll = f" ({labels['required_ll']} "
+        self.trader_price = f"    💰 {labels['trader']}: "
+        self.flea = f" | 🏪 {labels['flea']}: "
+        self.min_loyalty = f"⭐ {labels['min_loyalty']}: **"
+        self.use_ru_names = language == "ru"
+        self._trader_headers: Dict[str, str] = {}
+
+    def trader_header(self, trader: str) -> str:
+        """Get '<emoji> **<Trader>**' for trader (localized once)."""
+        header = self._trader_headers.get(trader)
+        if header is None:
+            emoji = TRADER_EMOJIS.get(trader, TRADER_EMOJIS.get(trader.lower(), "💼"))
+            header = f"\n{emoji} **{localize_trader_name(trader, self.language)}**"
+            self._trader_headers[trader] = header
+        return header
+
+    def render(self, build: Build, weapon: Weapon, modules: List[Module]) -> str:
+        """Render build card."""
+        ru = self.use_ru_names
+        parts = [self.header, weapon.name_ru if ru else weapon.name_en, self.header_end]
+        append = parts.append
+
+        append(self.categories[build.category.value])
+        if build.quest_name_ru or build.quest_name_en:
+            parts += (self.quest, build.quest_name_ru if ru else build.quest_name_en, "\n")
+        if build.name_ru or build.name_en:
+            parts += ("📝 ", build.name_ru if ru else build.name_en, "\n")
+
+        append(self.characteristics)
+        if weapon.caliber:
+            parts += (self.caliber, weapon.caliber, "**\n")
+        if weapon.tier_rating:
+            tier = weapon.tier_rating.value
+            parts += (self.tier, TIER_EMOJIS.get(tier, "⭐"), " **", tier, "**\n")
+        if weapon.base_price:
+            parts += (self.base_price, f"{weapon.base_price:,} ₽\n")
+        if weapon.flea_price:
+            parts += (self.flea_price, f"{weapon.flea_price:,} ₽**\n")
+
+        append(self.combat)
+        if weapon.ergonomics is not None:
+            ergo_bar = "█" * min(int(weapon.ergonomics / 10), 10)
+            parts += (self.ergonomics, f"{weapon.ergonomics}** {ergo_bar}\n")
+        if weapon.recoil_vertical is not None:
+            parts += (self.recoil_v, f"{weapon.recoil_vertical}**\n")
+            if weapon.recoil_horizontal is not None:
+                parts += (self.recoil_h, f"{weapon.recoil_horizontal}**\n")
+                parts += (self.recoil_sum, f"{weapon.recoil_vertical + weapon.recoil_horizontal}**\n")
+        if weapon.fire_rate is not None:
+            parts += (self.fire_rate, f"{weapon.fire_rate}** RPM\n")
+        if weapon.effective_range is not None:
+            parts += (self.range, f"{weapon.effective_range}m**\n")
+        append("\n")
+
+        if modules:
+            append(self.modules)
+            modules_by_trader: Dict[str, List[Module]] = {}
+            for module in modules:
+                modules_by_trader.setdefault(module.trader, []).append(module)
+
+            for trader in sorted(modules_by_trader):
+                trader_modules = modules_by_trader[trader]
+                max_ll = max(m.loyalty_level for m in trader_modules)
+                parts += (self.trader_header(trader), self.required_ll, f"{max_ll})**:**\n")
+                for module in trader_modules:
+                    append(f"  • {module.name_ru if ru else module.name_en}")
+                    if module.slot_type:
+                        append(f" [{module.slot_type}]")
+                    parts += ("\n", self.trader_price, f"{module.price:,} ₽ (LL{module.loyalty_level})")
+                    if module.flea_price:
+                        parts += (self.flea, f"{module.flea_price:,} ₽")
+                    append("\n")
+            append("\n")
+
+        parts += (
+            "💵 **", get_text("build_total_cost", self.language, cost=f"{build.total_cost:,}"), "**\n",
+            self.min_loyalty, str(build.min_loyalty_level), "**\n",
+        )
+        return "".join(parts)
+
+    def render_user_build_body(self, build: UserBuild, modules: List[Module]) -> str:
+        """Render stats and modules part of a community/user build view."""
+        language = self.language
+        parts = [get_text("build_stats", language), "\n"]
+        if build.ergonomics:
+            parts += (get_text("build_ergonomics", language, value=build.ergonomics), "\n")
+        if build.recoil_vertical:
+            parts += (get_text("build_recoil_v", language, value=build.recoil_vertical), "\n")
+        parts += ("\n💰 ", get_text("build_total_cost", language, cost=build.total_cost), "\n")
+
+        if modules:
+            parts += ("\n", get_text("build_modules_list", language), "\n")
+            ru = self.use_ru_names
+            for module in modules[:10]:  # Limit to 10 modules
+                parts.append(f"  • {module.name_ru if ru else module.name_en}\n")
+        return "".join(parts)
+
+
+class GeneratedBuildTemplate:
+    """Generated build layout compiled for one language.
+
+    Same approach as CardTemplate for builds from BuildGenerator, which
+    carry raw tarkov.dev item dicts instead of database rows.
+    """
+
+    # Modules listed before the rest is summarized
+    MAX_MODULES = 10
+
+    def __init__(self, language: str):
+        self.language = language
+        labels = GENERATED_BUILD_LABELS.get(language, GENERATED_BUILD_LABELS["en"])
+
+        self.title = f"**🎲 {get_text('build_generated', language)}**\n\n"
+        self.tiers = {tier: f"{get_text('build_tier', language, tier=tier)}\n\n" for tier in TIER_EMOJIS}
+        self.characteristics = f"📊 **{get_text('weapon_characteristics', language)}:**\n\n"
+        self.caliber = f"  • {get_text('caliber', language)}: **"
+        self.fire_rate = f"  • {get_text('fire_rate', language)}: **"
+        self.weapon_price = f"  • 🏪 {get_text('weapon_price', language)}: **"
+        self.final_stats = f"⚔️ **{get_text('final_stats', language)}:**\n"
+        self.ergonomics = f"  • {get_text('ergonomics_stat', language)}: **"
+        self.recoil_v = f"  • {get_text('vertical_recoil', language)}: **"
+        self.recoil_h = f"  • {get_text('horizontal_recoil', language)}: **"
+        self.budget = f"💰 **{get_text('budget_title', language)}:**\n"
+        self.spent = f"  • {get_text('spent', language)}: **"
+        self.remaining = f"  • {get_text('remaining', language)}: **"
+        self.no_budget_limit = (
+            f"  • {get_text('budget_title', language)}: {get_text('no_budget_limit', language)}\n\n"
+        )
+        self.modules = f"\n{get_text('build_modules_list', language)}\n"
+        self.more_modules = f"  ... {labels['more_modules']}\n"
+        self.suggestions = f"\n💡 **{labels['suggestions']}:**\n"
+        self._traders: Dict[str, str] = {}
+
+    def trader_name(self, trader: str) -> str:
+        """Get localized trader name (localized once)."""
+        name = self._traders.get(trader)
+        if name is None:
+            name = self._traders[trader] = localize_trader_name(trader, self.language)
+        return name
+
+    @staticmethod
+    def _change(diff: int) -> str:
+        """Stat change against the bare weapon: ' 📈 +3', ' 📉 -12' or '' when unchanged."""
+        if diff == 0:
+            return ""
+        return f" {'📉' if diff < 0 else '📈'} {diff:+d}"
+
+    def render(self, build, budget: int, tier_description: str, suggestions: List[str]) -> str:
+        """
+        Render generated build.
+
+        Args:
+            build: GeneratedBuild
+            budget: Requested budget (0 = no limit)
+            tier_description: Localized description of build.tier_rating
+            suggestions: Improvement suggestions (shown for C/D tiers)
+        """
+        parts = [self.title, "🔫 **", build.weapon_name, "**\n", self.tiers[build.tier_rating.value]]
+        append = parts.append
+        parts += (tier_description, "\n\n", self.characteristics)
+
+        weapon_data = build.weapon_data
+        weapon_props = weapon_data.get("properties", {})
+        if weapon_props.get("caliber"):
+            parts += (self.caliber, weapon_props["caliber"], "**\n")
+        if weapon_props.get("fireRate"):
+            parts += (self.fire_rate, f"{weapon_props['fireRate']}** RPM\n")
+
+        weapon_price = weapon_data.get("avg24hPrice", 0) or 0
+        if weapon_price:
+            parts += (self.weapon_price, f"{weapon_price:,} ₽**\n")
+        for trader_info in weapon_data.get("buyFor", [])[:3]:  # Up to 3 traders
+            vendor = trader_info.get("vendor", {})
+            trader_name = vendor.get("name", "Unknown")
+            if trader_name != "Flea Market":
+                level_text = f" (Lvl {vendor['minLevel']})" if vendor.get("minLevel") else ""
+                price = trader_info.get("price", 0)
+                append(f"  • 🤝 {trader_name}{level_text}: {price:,} {trader_info.get('currency', 'RUB')}\n")
+
+        # Build stats against the bare weapon
+        parts += ("\n", self.final_stats)
+        base_ergo = weapon_props.get("ergonomics", 0)
+        base_recoil_v = weapon_props.get("recoilVertical", 0)
+        base_recoil_h = weapon_props.get("recoilHorizontal", 0)
+        if build.ergonomics:
+            change = self._change(build.ergonomics - base_ergo) if base_ergo else ""
+            ergo_bar = "█" * min(int(build.ergonomics / 10), 10)
+            parts += (self.ergonomics, f"{build.ergonomics}**{change} {ergo_bar}\n")
+        if build.recoil_vertical:
+            change = self._change(build.recoil_vertical - base_recoil_v) if base_recoil_v else ""
+            parts += (self.recoil_v, f"{build.recoil_vertical}**{change}\n")
+        if build.recoil_horizontal:
+            change = self._change(build.recoil_horizontal - base_recoil_h) if base_recoil_h else ""
+            parts += (self.recoil_h, f"{build.recoil_horizontal}**{change}\n")
+        append("\n")
+
+        append(self.budget)
+        if budget and budget > 0:
+            parts += (self.spent, f"{build.total_cost:,} ₽** / {budget:,} ₽\n")
+            parts += (self.remaining, f"{build.remaining_budget:,} ₽**\n\n")
+        else:
+            parts += (self.spent, f"{build.total_cost:,} ₽**\n", self.no_budget_limit)
+
+        if build.available_from:
+            sources = ", ".join(build.available_from)
+            parts += ("\n", get_text("build_available_from", self.language, sources=sources), "\n")
+
+        if build.modules:
+            append(self.modules)
+            for count, (slot_name, module_data) in enumerate(build.modules.items()):
+                if count >= self.MAX_MODULES:
+                    append(self.more_modules.format(count=len(build.modules) - self.MAX_MODULES))
+                    break
+                module_name = module_data.get("shortName") or module_data.get("name", slot_name)
+                append(f"  • {module_name}{self._module_trader(module_data)}\n")
+
+        if suggestions and build.tier_rating.value in ("C", "D"):
+            append(self.suggestions)
+            for suggestion in suggestions[:3]:
+                parts += (suggestion, "\n")
+
+        return "".join(parts)
+
+    def _module_trader(self, module_data: Dict) -> str:
+        """' | <Trader> Lvl<n> (<price>₽)' for the first trader offer, or ''."""
+        for offer in module_data.get("buyFor", []):
+            vendor = offer.get("vendor", {})
+            trader_name = vendor.get("name", "")
+            if trader_name and trader_name != "Flea Market":
+                trader = self.trader_name(trader_name)
+                level = f" Lvl{vendor['minLevel']}" if vendor.get("minLevel") else ""
+                return f" | {trader}{level} ({offer.get('price', 0):,}₽)"
+        return ""
+
+
+_templates: Dict[str, CardTemplate] = {}
+_generated_templates: Dict[str, GeneratedBuildTemplate] = {}
+
+
+def get_card_template(language: str) -> CardTemplate:
+    """Get compiled card template for language (compiled on first use)."""
+    template = _templates.get(language)
+    if template is None:
+        template = _templates[language] = CardTemplate(language)
+    return template
+
+
+def get_generated_build_template(language: str) -> GeneratedBuildTemplate:
+    """Get compiled generated-build template for language (compiled on first use)."""
+    template = _generated_templates.get(language)
+    if template is None:
+        template = _generated_templates[language] = GeneratedBuildTemplate(language)
+    return template
+
+
+def build_content_key(build: Build) -> Hashable:
+    """Cache key for build: database id, or content hash for unsaved builds."""
+    if build.id:
+        return ("build", build.id)
+    content = repr((
+        build.weapon_id, build.category.value, build.name_ru, build.name_en,
+        build.quest_name_ru, build.quest_name_en, build.total_cost,
+        build.min_loyalty_level, tuple(build.modules),
+    ))
+    return ("build_hash", hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest())
+
+
+class BuildCardCache:
+    """LRU cache of rendered cards keyed by (build key, language, price version).
+
+    Weapon and module data only change on sync, so SyncService bumps the
+    price version after every weapon/module sync, which retires all cards
+    rendered with the old prices.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        """
+        Initialize render cache.
+
+        Args:
+            max_entries: Maximum number of cached cards
+        """
+        self.max_entries = max_entries
+        self.price_version = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def bump_price_version(self):
+        """Invalidate all cards after prices/items changed."""
+        self.price_version += 1
+        self._entries.clear()
+        logger.info(f"🃏 Build card cache invalidated (price version {self.price_version})")
+
+    def get(self, key: Hashable, language: str) -> Optional[str]:
+        """Get rendered card or None."""
+        full_key = (key, language, self.price_version)
+        text = self._entries.get(full_key)
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(full_key)
+        self.hits += 1
+        return text
+
+    def set(self, key: Hashable, language: str, text: str):
+        """Store rendered card."""
+        full_key = (key, language, self.price_version)
+        self._entries[full_key] = text
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop all language variants of a card."""
+        for full_key in [k for k in self._entries if k[0] == key]:
+            del self._entries[full_key]
+
+    def render(self, build: Build, weapon: Weapon, modules: List[Module], language: str) -> str:
+        """Get build card from cache, rendering it on miss."""
+        key = build_content_key(build)
+        text = self.get(key, language)
+        if text is None:
+            text = get_card_template(language).render(build, weapon, modules)
+            self.set(key, language, text)
+        return text
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Get cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "price_version": self.price_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+
+# Process-wide card cache (prices are global, so is the cache)
+build_card_cache = BuildCardCache()
@@ -65,3 +65,7 @@ DEFAULT_DB_PATH = "data/eft_helper.db"
 # API URLs
 TARKOV_DEV_API_URL = "https://api.tarkov.dev/graphql"
 TARKOV_MARKET_API_URL = "https://api.tarkov-market.com/api/v1"
+
+# Voice messages: temp download directory and transcription cache lifetime
+VOICE_TEMP_DIR = "/tmp/eft_voice"
+VOICE_CACHE_TTL_HOURS = 24
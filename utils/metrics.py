@@ -0,0 +1,324 @@
+"""Prometheus-style metrics: counters, gauges, histograms and a /metrics endpoint."""
+import functools
+import inspect
+import logging
+import time
+from bisect import bisect_left
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers cached handlers (ms) up to LLM calls (tens of seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Named metric with one value set per label combination."""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Tuple) -> Tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return labels
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        """Add amount to the counter of a label combination."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, *labels) -> float:
+        """Current value of a label combination."""
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (set at scrape time by collectors)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: Optional[float], *labels):
+        """Set value of a label combination (None removes it)."""
+        key = self._key(labels)
+        if value is None:
+            self._values.pop(key, None)
+        else:
+            self._values[key] = value
+
+    def get(self, *labels) -> Optional[float]:
+        """Current value of a label combination."""
+        return self._values.get(labels)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        """Record one observation for a label combination."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[self._key(labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def get_count(self, *labels) -> int:
+        """Number of observations of a label combination."""
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together in the Prometheus text format.
+
+    Recording a value is a dict lookup plus arithmetic, so instrumenting
+    hot paths costs next to nothing. Gauges describing cache sizes and
+    similar state are filled by collectors that run only when /metrics is
+    scraped.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Optional[Awaitable[None]]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} already registered as {existing.type_name}")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Optional[Awaitable[None]]]):
+        """Register a callback (plain or async) that updates gauges right before rendering."""
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        """Run collectors and render all metrics."""
+        for collector in self._collectors:
+            try:
+                result = collector()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
+
+handler_duration = metrics.histogram(
+    "bot_handler_duration_seconds", "Time spent in update handlers", ("handler",)
+)
+handler_errors = metrics.counter(
+    "bot_handler_errors_total", "Update handlers that raised", ("handler",)
+)
+external_call_duration = metrics.histogram(
+    "bot_external_call_duration_seconds", "Duration of tarkov.dev and Ollama requests", ("target",)
+)
+external_call_errors = metrics.counter(
+    "bot_external_call_errors_total", "Failed tarkov.dev and Ollama requests", ("target",)
+)
+db_call_duration = metrics.histogram(
+    "bot_db_call_duration_seconds", "Duration of Database methods", ("method",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+cache_entries = metrics.gauge("bot_cache_entries", "Entries held by in-memory caches", ("cache",))
+cache_hit_rate = metrics.gauge("bot_cache_hit_rate", "Hit rate of in-memory caches", ("cache",))
+pending_writes = metrics.gauge("bot_pending_writes", "Items waiting for a batched database write", ("queue",))
+llm_inflight = metrics.gauge("bot_llm_inflight", "Ollama requests in progress")
+fsm_sessions = metrics.gauge("bot_fsm_sessions", "Live (not expired) FSM sessions in SQLite storage")
+build_sessions_count = metrics.gauge("bot_build_sessions", "Unsaved generated builds held in memory")
+build_sessions_bytes = metrics.gauge("bot_build_sessions_bytes", "Approximate memory held by build sessions")
+
+
+def timed_call(target: str, failed: Optional[Callable[[object], bool]] = None):
+    """
+    Decorator timing an async external call.
+
+    Args:
+        target: Label of the called service
+        failed: Predicate marking a returned value as a failure (for calls
+            that log errors and return None instead of raising)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                external_call_errors.inc(target)
+                raise
+            finally:
+                external_call_duration.observe(time.perf_counter() - start, target)
+            if failed is not None and failed(result):
+                external_call_errors.inc(target)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_methods(obj, histogram: Histogram = db_call_duration):
+    """
+    Time every public coroutine method of an object.
+
+    The bound methods are replaced on the instance only, so other
+    instances of the class (scripts, tests) stay uninstrumented. Each
+    method is recorded under its own name as the histogram label.
+    """
+    def make_wrapper(method, name):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+        return wrapper
+
+    for name in dir(type(obj)):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(getattr(type(obj), name, None)):
+            setattr(obj, name, make_wrapper(getattr(obj, name), name))
+    return obj
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """
+    Serve the registry on http://host:port/metrics.
+
+    Returns:
+        Runner to pass to runner.cleanup() on shutdown
+
+    Raises:
+        OSError: If the address can't be bound (e.g. port in use)
+    """
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(
+            text=await metrics.render(),
+            content_type="text/plain",
+            charset="utf-8"
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError:
+        await runner.cleanup()
+        raise
+    logger.info(f"📈 Metrics endpoint: http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,124 @@
+"""Bounded in-memory cache for short-lived per-user session data."""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCache:
+    """TTL + LRU cache with size accounting.
+
+    Entries expire ttl_seconds after the last access. When max_entries or
+    max_bytes is exceeded the least recently used entries are evicted.
+    Values should be small JSON-serializable references (ids, numbers),
+    their size is estimated from the JSON representation.
+    """
+
+    def __init__(self, ttl_seconds: int = 30 * 60, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize session cache.
+
+        Args:
+            ttl_seconds: Lifetime of an entry after the last access
+            max_entries: Maximum number of live entries
+            max_bytes: Maximum estimated size of all values
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Estimate value size in bytes."""
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        except (TypeError, ValueError):
+            return 0
+
+    def _remove(self, key: Hashable):
+        """Remove entry and update size accounting."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _purge_expired(self):
+        """Drop expired entries from the LRU end."""
+        now = time.monotonic()
+        # TTL is refreshed on access, so LRU order is also expiry order
+        while self._entries:
+            key = next(iter(self._entries))
+            expires_at, _, _ = self._entries[key]
+            if expires_at > now:
+                break
+            self._remove(key)
+
+    def set(self, key: Hashable, value: Any):
+        """Store value for key."""
+        if key in self._entries:
+            self._remove(key)
+
+        size = self._estimate_size(value)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+
+        self._purge_expired()
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get value for key or None if missing/expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries[key] = (now + self.ttl_seconds, size, value)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove and return value for key."""
+        value = self.get(key)
+        if key in self._entries:
+            self._remove(key)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        self._purge_expired()
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get live session count, bytes held and hit/miss counters."""
+        self._purge_expired()
+        return {
+            "sessions": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Generated builds waiting to be saved, keyed by user id (slim references only)
+build_sessions = SessionCache(ttl_seconds=30 * 60, max_entries=10000)
@@ -0,0 +1,200 @@
+"""Lightweight in-process request tracing with slow-trace dumps."""
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """Timed operation inside a trace."""
+
+    __slots__ = ("name", "attrs", "start", "end", "children", "trace", "error")
+
+    def __init__(self, name: str, trace: "_Trace", attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attrs = attrs
+        self.trace = trace
+        self.children: List["Span"] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (up to now if still open)."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """Span tree with times in ms relative to origin."""
+        data = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+class _Trace:
+    """Span budget shared by all spans of one trace."""
+
+    __slots__ = ("max_spans", "spans", "dropped")
+
+    def __init__(self, max_spans: int):
+        self.max_spans = max_spans
+        self.spans = 1
+        self.dropped = 0
+
+
+# Innermost open span of the current task (None outside traced updates)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block as a child of the current span.
+
+    Outside a trace this does nothing beyond one context variable lookup.
+    Tasks started inside the block inherit it as their parent span.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    trace = parent.trace
+    if trace.spans >= trace.max_spans:
+        trace.dropped += 1
+        yield None
+        return
+
+    trace.spans += 1
+    child = Span(name, trace, attrs or None)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator wrapping an async function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await func(*args, **kwargs)
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(obj, prefix: str):
+    """
+    Wrap every public coroutine method of an object in a span.
+
+    Spans are named "<prefix>.<method>". Only this instance is changed.
+    """
+    def make_wrapper(method, span_name):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await method(*args, **kwargs)
+            with span(span_name):
+                return await method(*args, **kwargs)
+        return wrapper
+
+    for name in dir(type(obj)):
+        if name.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(getattr(type(obj), name, None)):
+            setattr(obj, name, make_wrapper(getattr(obj, name), f"{prefix}.{name}"))
+    return obj
+
+
+class Tracer:
+    """Opens one trace per update and dumps slow ones to a JSONL file.
+
+    Every traced update builds its span tree in memory; when the root
+    span took at least slow_threshold seconds the whole tree is appended
+    to path as one JSON line. Nothing is sent anywhere.
+    """
+
+    def __init__(self, path: str, slow_threshold: float = 5.0, max_spans: int = 5000):
+        """
+        Initialize tracer.
+
+        Args:
+            path: JSONL file for slow traces
+            slow_threshold: Root duration in seconds that triggers a dump
+            max_spans: Spans recorded per trace (the rest are counted as dropped)
+        """
+        self.path = path
+        self.slow_threshold = slow_threshold
+        self.max_spans = max_spans
+        self.traces = 0
+        self.slow_traces = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def trace(self, name: str, **attrs):
+        """Open a root span for the current task."""
+        root = Span(name, _Trace(self.max_spans), attrs or None)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = type(e).__name__
+            raise
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(token)
+            self.traces += 1
+            if root.duration >= self.slow_threshold:
+                self.slow_traces += 1
+                self._dump(root)
+
+    def _dump(self, root: Span):
+        """Append a slow trace to the JSONL file."""
+        record = {
+            "trace_id": uuid.uuid4().hex,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(root.duration * 1000, 3),
+            "spans": root.trace.spans,
+            "dropped_spans": root.trace.dropped,
+            "root": root.to_dict(root.start),
+        }
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Could not write slow trace: {e}")
+            return
+        logger.warning(f"🐢 Slow update {root.name}: {record['duration_ms']:.0f} ms, trace in {self.path}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get trace counters."""
+        return {"traces": self.traces, "slow_traces": self.slow_traces}
@@ -1,85 +1,353 @@
 """Voice transcription service using faster-whisper."""
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict
 
 logger = logging.getLogger(__name__)
 
 
+class TranscriberBusyError(Exception):
+    """Raised when the transcription queue is full."""
+
+
+class TranscriptionCache:
+    """TTL cache of finished transcriptions.
+
+    Keys are Telegram file_unique_id values (same for forwarded voice notes)
+    or content hashes of the downloaded audio.
+    """
+
+    def __init__(self, ttl_seconds: int = 24 * 60 * 60, max_entries: int = 1000):
+        """
+        Initialize transcription cache.
+
+        Args:
+            ttl_seconds: How long a transcription stays valid
+            max_entries: Maximum number of cached transcriptions (oldest evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get cached transcription (text and detected language) or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, text: str, language: str):
+        """Store a transcription."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, {"text": text, "language": language})
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def hash_audio_file(audio_file_path: str) -> str:
+    """Get SHA-256 of an audio file (used as cache key fallback)."""
+    digest = hashlib.sha256()
+    with open(audio_file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cleanup_temp_dir(directory: str, max_age_seconds: int = 60 * 60) -> int:
+    """
+    Remove leftover voice files (e.g. after a crash) from the temp directory.
+
+    Args:
+        directory: Temp directory with downloaded voice files
+        max_age_seconds: Only files older than this are removed
+
+    Returns:
+        Number of removed files
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    removed = 0
+    now = time.time()
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and now - entry.stat().st_mtime > max_age_seconds:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Could not remove temp voice file {entry.path}: {e}")
+
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale voice files from {directory}")
+    return removed
+
+
 class VoiceTranscriber:
-    """Transcribes voice messages using faster-whisper."""
-    
-    def __init__(self, model_size: str = "tiny", **kwargs):
+    """Transcribes voice messages using faster-whisper.
+
+    The model is shared by a dedicated worker pool so decoding never runs on
+    the event loop. The number of clips waiting for a worker is bounded; when
+    the queue is full new clips are rejected with TranscriberBusyError.
+    """
+
+    # Number of recent clips kept for latency percentiles
+    METRICS_WINDOW = 100
+
+    def __init__(
+        self,
+        model_size: str = "tiny",
+        workers: int = 1,
+        max_queue: int = 4,
+        vad_filter: bool = True,
+        cpu_threads: int = 0,
+        cache_ttl_seconds: int = 24 * 60 * 60
+    ):
         """
         Initialize voice transcriber.
-        
+
         Args:
             model_size: Whisper model size (tiny, base, small, medium, large)
+            workers: Number of concurrent transcription workers
+            max_queue: Maximum number of clips waiting for a free worker
+            vad_filter: Trim silence with the built-in Silero VAD before decoding
+            cpu_threads: CPU threads per worker (0 = library default)
+            cache_ttl_seconds: Lifetime of cached transcriptions
         """
         self.model_size = model_size
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.vad_filter = vad_filter
+        self.cpu_threads = cpu_threads
         self._model = None
-    
+        self._load_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight = 0
+        self.cache = TranscriptionCache(ttl_seconds=cache_ttl_seconds)
+
+        # Latency metrics
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._samples = deque(maxlen=self.METRICS_WINDOW)
+
     def _load_model(self):
-        """Load faster-whisper model lazily."""
-        if self._model is None:
+        """Load faster-whisper model (thread-safe, once)."""
+        with self._load_lock:
+            if self._model is not None:
+                return
             try:
                 from faster_whisper import WhisperModel
-                logger.info(f"Loading faster-whisper model: {self.model_size}")
-                self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
-                logger.info("faster-whisper model loaded successfully")
+                logger.info(f"Loading faster-whisper model: {self.model_size} (workers: {self.workers})")
+                started = time.perf_counter()
+                self._model = WhisperModel(
+                    self.model_size,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.workers
+                )
+                logger.info(f"faster-whisper model loaded in {time.perf_counter() - started:.1f}s")
             except ImportError:
                 logger.error("faster-whisper not installed. Install with: pip install faster-whisper")
                 raise
             except Exception as e:
                 logger.error(f"Error loading faster-whisper model: {e}")
                 raise
-    
-    async def transcribe(self, audio_file_path: str, language: str = "ru") -> Optional[str]:
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the dedicated transcription thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="whisper"
+            )
+        return self._executor
+
+    async def preload(self) -> bool:
         """
-        Transcribe audio file to text using faster-whisper.
-        
+        Load the model in the worker pool so the first voice message doesn't stall.
+
+        Returns:
+            True if the model is ready, False if faster-whisper is unavailable
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._get_executor(), self._load_model)
+            return True
+        except Exception as e:
+            logger.warning(f"Voice transcription disabled: {e}")
+            return False
+
+    def _transcribe_sync(self, audio_file_path: str, language: str) -> Dict:
+        """
+        Run the full decode in a worker thread.
+
+        faster-whisper returns a lazy segment generator, the actual decoding
+        happens while iterating it, so segments are materialized here.
+        """
+        self._load_model()
+
+        started = time.perf_counter()
+        segments, info = self._model.transcribe(
+            audio_file_path,
+            language=language,
+            beam_size=1,
+            vad_filter=self.vad_filter,
+            vad_parameters={"min_silence_duration_ms": 500} if self.vad_filter else None
+        )
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+
+        return {
+            "text": text,
+            "language": getattr(info, "language", language),
+            "audio_duration": getattr(info, "duration", 0.0) or 0.0,
+            "speech_duration": getattr(info, "duration_after_vad", None),
+            "decode_time": time.perf_counter() - started
+        }
+
+    async def transcribe_with_info(self, audio_file_path: str, language: str = "ru") -> Optional[Dict]:
+        """
+        Transcribe audio file and return text with decode details.
+
         Args:
             audio_file_path: Path to audio file
             language: Expected language (ru/en)
-            
+
         Returns:
-            Transcribed text or None if transcription failed
+            Dict with text, language and timings, or None if transcription failed
+
+        Raises:
+            TranscriberBusyError: If the transcription queue is full
         """
+        if not os.path.exists(audio_file_path):
+            logger.error(f"Audio file not found: {audio_file_path}")
+            return None
+
+        # Backpressure: workers busy + waiting clips must fit into the queue
+        if self._inflight >= self.workers + self.max_queue:
+            self._rejected += 1
+            logger.warning(f"Transcription queue full ({self._inflight} clips), rejecting")
+            raise TranscriberBusyError()
+
+        whisper_lang = "ru" if language == "ru" else "en"
+        queued_at = time.perf_counter()
+        self._inflight += 1
+
+        def run():
+            queue_wait = time.perf_counter() - queued_at
+            result = self._transcribe_sync(audio_file_path, whisper_lang)
+            result["queue_wait"] = queue_wait
+            return result
+
         try:
-            if not os.path.exists(audio_file_path):
-                logger.error(f"Audio file not found: {audio_file_path}")
-                return None
-            
-            # Load model if not loaded
-            if self._model is None:
-                self._load_model()
-            
-            logger.info(f"Transcribing audio file: {audio_file_path}")
-            
-            # Map language codes
-            whisper_lang = "ru" if language == "ru" else "en"
-            
-            # Transcribe (run in executor to avoid blocking)
-            import asyncio
-            segments, info = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self._model.transcribe(audio_file_path, language=whisper_lang)
-            )
-            
-            # Collect all segments
-            transcribed_text = " ".join([segment.text for segment in segments]).strip()
-            
-            if transcribed_text:
-                logger.info(f"Transcription successful: {transcribed_text[:50]}...")
-                return transcribed_text
-            else:
-                logger.warning("Transcription returned empty text")
-                return None
-        
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), run)
         except Exception as e:
+            self._failed += 1
             logger.error(f"Error transcribing audio: {e}", exc_info=True)
             return None
-    
+        finally:
+            self._inflight -= 1
+
+        self._record(result)
+
+        if not result["text"]:
+            logger.warning("Transcription returned empty text")
+            return None
+
+        logger.info(f"Transcription successful: {result['text'][:50]}...")
+        return result
+
+    async def transcribe(self, audio_file_path: str, language: str = "ru") -> Optional[str]:
+        """
+        Transcribe audio file to text using faster-whisper.
+
+        Args:
+            audio_file_path: Path to audio file
+            language: Expected language (ru/en)
+
+        Returns:
+            Transcribed text or None if transcription failed
+
+        Raises:
+            TranscriberBusyError: If the transcription queue is full
+        """
+        result = await self.transcribe_with_info(audio_file_path, language)
+        return result["text"] if result else None
+
+    def _record(self, result: Dict):
+        """Store per-clip latency metrics."""
+        self._completed += 1
+        audio = result["audio_duration"]
+        decode = result["decode_time"]
+        self._samples.append((result["queue_wait"], decode, audio))
+
+        speech = result.get("speech_duration")
+        speech_info = f", speech {speech:.1f}s" if speech is not None else ""
+        logger.info(
+            f"🎤 Clip {audio:.1f}s{speech_info}: queue {result['queue_wait'] * 1000:.0f}ms, "
+            f"decode {decode * 1000:.0f}ms (RTF {decode / audio if audio else 0:.2f})"
+        )
+
+    @staticmethod
+    def _percentile(values, percent: float) -> float:
+        """Nearest-rank percentile of a list of numbers."""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def get_stats(self) -> Dict:
+        """Get transcription latency metrics for recent clips."""
+        waits = [s[0] for s in self._samples]
+        decodes = [s[1] for s in self._samples]
+        audio_total = sum(s[2] for s in self._samples)
+
+        return {
+            "model_loaded": self._model is not None,
+            "workers": self.workers,
+            "inflight": self._inflight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "failed": self._failed,
+            "queue_wait_p50_ms": self._percentile(waits, 50) * 1000,
+            "queue_wait_p95_ms": self._percentile(waits, 95) * 1000,
+            "decode_p50_ms": self._percentile(decodes, 50) * 1000,
+            "decode_p95_ms": self._percentile(decodes, 95) * 1000,
+            "realtime_factor": sum(decodes) / audio_total if audio_total else 0.0,
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses
+        }
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     async def is_available(self) -> bool:
         """Check if faster-whisper is available."""
         try:
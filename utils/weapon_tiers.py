@@ -1,4 +1,5 @@
 """Weapon tier ratings for EFT Helper (v5.3)."""
+from functools import lru_cache
 
 # Weapon tier ratings based on performance, popularity, and meta status
 # S-Tier: Top meta weapons with excellent stats
@@ -125,7 +126,11 @@ WEAPON_TIERS = {
     "PKP": "A",
 }
 
+# Lowercased keys for partial matching, computed once
+_WEAPON_TIERS_LOWER = [(key.lower(), tier) for key, tier in WEAPON_TIERS.items()]
 
+
+@lru_cache(maxsize=2048)
 def get_weapon_tier(weapon_name: str) -> str:
     """
     Get tier rating for a weapon.
@@ -142,8 +147,8 @@ def get_weapon_tier(weapon_name: str) -> str:
     
     # Try partial match (case-insensitive)
     weapon_lower = weapon_name.lower()
-    for key, tier in WEAPON_TIERS.items():
-        if key.lower() in weapon_lower or weapon_lower in key.lower():
+    for key_lower, tier in _WEAPON_TIERS_LOWER:
+        if key_lower in weapon_lower or weapon_lower in key_lower:
             return tier
     
     # Default to B tier